@@ -13,16 +13,24 @@ SMALL_CHART = CHART_SIZE(2)
 
 
 class ChartFactory(metaclass=ABCMeta):
-    def __init__(self, quotes: pd.DataFrame) -> None:
+    def __init__(
+        self,
+        quotes: pd.DataFrame,
+        quotes_range: Optional[Tuple[float, float]] = None,
+    ) -> None:
         assert quotes is not None
 
         self._quotes = quotes
+        self._quotes_range = quotes_range
 
     def quotes_range(self) -> Tuple[float, float]:
-        mn = np.amin(self._quotes.loc[:, "low"])
-        mx = np.amax(self._quotes.loc[:, "high"])
+        if self._quotes_range is None:
+            mn = np.amin(self._quotes.loc[:, "low"])
+            mx = np.amax(self._quotes.loc[:, "high"])
+
+            self._quotes_range = (mn, mx)
 
-        return mn, mx
+        return self._quotes_range
 
     def chart_xrange(self) -> Tuple[float, float]:
         return -0.5, (len(self._quotes) - 1) + 0.5
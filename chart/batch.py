@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from fun.chart.base import CHART_SIZE, MEDIUM_CHART
+from fun.data.source import DAILY, FREQUENCY, HOURLY, MONTHLY, WEEKLY
+from fun.utils import colors, pretty
+
+if TYPE_CHECKING:
+    from fun.chart.preset import CandleSticksPreset
+    from fun.plotter.reference import ReferenceSeriesRegistry
+
+FREQUENCY_NAMES: Dict[FREQUENCY, str] = {
+    HOURLY: "h",
+    DAILY: "d",
+    WEEKLY: "w",
+    MONTHLY: "m",
+}
+
+
+class RenderJob:
+    def __init__(
+        self,
+        symbol: str,
+        frequency: FREQUENCY,
+        dtime: datetime,
+        chart_range: Optional[str] = None,
+        parameters: Optional[Dict[str, str]] = None,
+        chart_size: CHART_SIZE = MEDIUM_CHART,
+        filename: Optional[str] = None,
+    ) -> None:
+        assert frequency in FREQUENCY_NAMES
+
+        self._symbol = symbol
+        self._frequency = frequency
+        self._dtime = dtime
+        self._chart_range = chart_range
+        self._parameters = parameters
+        self._chart_size = chart_size
+        self._filename = filename
+
+    def symbol(self) -> str:
+        return self._symbol
+
+    def frequency(self) -> FREQUENCY:
+        return self._frequency
+
+    def dtime(self) -> datetime:
+        return self._dtime
+
+    def chart_range(self) -> Optional[str]:
+        return self._chart_range
+
+    def parameters(self) -> Optional[Dict[str, str]]:
+        return self._parameters
+
+    def chart_size(self) -> CHART_SIZE:
+        return self._chart_size
+
+    def filename(self) -> str:
+        if self._filename is not None:
+            return self._filename
+
+        chart_range = f"_{self._chart_range}" if self._chart_range is not None else ""
+
+        return (
+            f"{self._symbol}_{FREQUENCY_NAMES[self._frequency]}"
+            f"_{self._dtime.strftime('%Y%m%d')}{chart_range}.png"
+        )
+
+
+class RenderResult:
+    def __init__(
+        self,
+        job: RenderJob,
+        path: Optional[str],
+        seconds: float,
+        error: Optional[str] = None,
+    ) -> None:
+        self._job = job
+        self._path = path
+        self._seconds = seconds
+        self._error = error
+
+    def job(self) -> RenderJob:
+        return self._job
+
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def seconds(self) -> float:
+        return self._seconds
+
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def succeeded(self) -> bool:
+        return self._error is None
+
+
+class BatchReport:
+    def __init__(self, results: List[RenderResult], elapsed: float, processes: int) -> None:
+        self._results = results
+        self._elapsed = elapsed
+        self._processes = processes
+
+    def results(self) -> List[RenderResult]:
+        return self._results
+
+    def succeeded(self) -> List[RenderResult]:
+        return [r for r in self._results if r.succeeded()]
+
+    def failed(self) -> List[RenderResult]:
+        return [r for r in self._results if not r.succeeded()]
+
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    def throughput(self) -> float:
+        if self._elapsed <= 0:
+            return 0.0
+
+        return len(self._results) / self._elapsed
+
+    def to_entity(self) -> Dict[str, str]:
+        return {
+            "jobs": f"{len(self._results)}",
+            "succeeded": f"{len(self.succeeded())}",
+            "failed": f"{len(self.failed())}",
+            "processes": f"{self._processes}",
+            "elapsed": f"{self._elapsed:.2f}s",
+            "throughput": f"{self.throughput():.2f} charts/s",
+        }
+
+    def print(self) -> None:
+        for r in self.failed():
+            error = r.error()
+            reason = error.strip().splitlines()[-1] if error else "unknown error"
+
+            pretty.color_print(colors.PAPER_RED_400, f"{r.job().filename()}: {reason}")
+
+        pretty.color_print(
+            colors.PAPER_LIGHT_GREEN_A200,
+            ", ".join(f"{k}: {v}" for k, v in self.to_entity().items()),
+        )
+
+
+# presets and reference series stay warm in each worker process, so
+# consecutive jobs for the same symbol only slice the already loaded quotes
+_presets: Dict[
+    Tuple[str, FREQUENCY, Optional[str], CHART_SIZE], "CandleSticksPreset"
+] = {}
+_references: Optional["ReferenceSeriesRegistry"] = None
+
+
+def _init_worker() -> None:
+    global _references
+
+    # the preset module pulls in matplotlib, pandas and every plotter, it is
+    # imported here so the first job of each worker does not pay for it, the
+    # registry is shared by all jobs the worker renders
+    import fun.chart.preset  # noqa: F401
+    from fun.plotter.reference import ReferenceSeriesRegistry
+
+    _references = ReferenceSeriesRegistry()
+
+
+def _render_job(job: RenderJob, output: str) -> RenderResult:
+    from fun.chart.preset import CandleSticksPreset
+
+    start = time.perf_counter()
+
+    try:
+        key = (job.symbol(), job.frequency(), job.chart_range(), job.chart_size())
+
+        preset = _presets.get(key, None)
+        if preset is None:
+            preset = CandleSticksPreset(
+                dtime=job.dtime(),
+                symbol=job.symbol(),
+                frequency=job.frequency(),
+                chart_range=job.chart_range(),
+                chart_size=job.chart_size(),
+            )
+            _presets[key] = preset
+        else:
+            preset.time_slice(job.dtime())
+
+        preset.make_controller(job.parameters(), references=_references)
+
+        path = os.path.join(output, job.filename())
+        with open(path, "wb") as f:
+            f.write(preset.render().getvalue())
+
+    except Exception:
+        return RenderResult(
+            job, None, time.perf_counter() - start, error=traceback.format_exc()
+        )
+
+    return RenderResult(job, path, time.perf_counter() - start)
+
+
+def _render_jobs(jobs: List[RenderJob], output: str) -> List[RenderResult]:
+    return [_render_job(job, output) for job in jobs]
+
+
+def render_batch(
+    jobs: List[RenderJob],
+    output: str,
+    processes: Optional[int] = None,
+) -> BatchReport:
+    os.makedirs(output, exist_ok=True)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    # every symbol goes to a single worker to reuse its loaded quotes
+    groups: Dict[str, List[RenderJob]] = {}
+    for job in jobs:
+        groups.setdefault(job.symbol(), []).append(job)
+
+    start = time.perf_counter()
+
+    results: List[RenderResult] = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_render_jobs, group, output): group
+            for group in groups.values()
+        }
+
+        for future in as_completed(futures):
+            try:
+                results.extend(future.result())
+            except Exception:
+                # a crashed worker loses its whole group
+                error = traceback.format_exc()
+                results.extend(RenderResult(job, None, 0.0, error) for job in futures[future])
+
+    return BatchReport(results, time.perf_counter() - start, processes)
+
+
+def read_jobs(path: str) -> List[RenderJob]:
+    frequencies = {v: k for k, v in FREQUENCY_NAMES.items()}
+
+    with open(path, "r") as f:
+        entities = json.load(f)
+
+    return [
+        RenderJob(
+            symbol=e["symbol"],
+            frequency=frequencies[e.get("frequency", "d")],
+            dtime=datetime.strptime(e["date"], "%Y%m%d")
+            if "date" in e
+            else datetime.now(),
+            chart_range=e.get("range", None),
+            parameters=e.get("parameters", None),
+            filename=e.get("filename", None),
+        )
+        for e in entities
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="render static charts in batch")
+    parser.add_argument("jobs", help="json file with a list of chart jobs")
+    parser.add_argument("output", help="output directory for the png files")
+    parser.add_argument("-p", "--processes", type=int, default=None)
+
+    args = parser.parse_args()
+
+    report = render_batch(read_jobs(args.jobs), args.output, processes=args.processes)
+    report.print()
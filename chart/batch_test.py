@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from fun.chart.batch import RenderJob, read_jobs, render_batch
+from fun.data.source import DAILY, HOURLY, MONTHLY, WEEKLY
+from fun.utils.testing import parameterized
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    @parameterized(
+        [
+            {
+                "job": RenderJob("es", DAILY, datetime(2021, 3, 1)),
+                "filename": "es_d_20210301.png",
+            },
+            {
+                "job": RenderJob("nq", HOURLY, datetime(2021, 3, 1), chart_range="5D"),
+                "filename": "nq_h_20210301_5D.png",
+            },
+            {
+                "job": RenderJob("cl", WEEKLY, datetime(2020, 1, 6), filename="a.png"),
+                "filename": "a.png",
+            },
+            {
+                "job": RenderJob("gc", MONTHLY, datetime(2019, 12, 2)),
+                "filename": "gc_m_20191202.png",
+            },
+        ]
+    )
+    def test_filename(self, job, filename):
+        self.assertEqual(job.filename(), filename)
+
+    def test_read_jobs(self):
+        path = os.path.join(self._root, "jobs.json")
+        with open(path, "w") as f:
+            json.dump(
+                [
+                    {"symbol": "es", "frequency": "w", "date": "20210301"},
+                    {"symbol": "nq", "date": "20210302", "parameters": {"Volume": "true"}},
+                ],
+                f,
+            )
+
+        jobs = read_jobs(path)
+
+        self.assertEqual([j.frequency() for j in jobs], [WEEKLY, DAILY])
+        self.assertEqual(jobs[1].dtime(), datetime(2021, 3, 2))
+        self.assertEqual(jobs[1].parameters(), {"Volume": "true"})
+
+    def test_failures(self):
+        jobs = [
+            RenderJob("zzz", DAILY, datetime(2021, 3, 1)),
+            RenderJob("zzz", DAILY, datetime(2021, 3, 2)),
+        ]
+
+        report = render_batch(jobs, os.path.join(self._root, "charts"), processes=1)
+
+        self.assertEqual(len(report.results()), 2)
+        self.assertEqual(len(report.failed()), 2)
+        self.assertTrue(all(r.path() is None for r in report.failed()))
+        self.assertEqual(os.listdir(os.path.join(self._root, "charts")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,90 @@
 from datetime import datetime
-from typing import cast
+from typing import Dict, List, Optional, Tuple, cast
 
+import numpy as np
 import pandas as pd
+from fun.plotter.rolling import RollingStatistics
 from fun.utils import colors, pretty
 
 
+class SlidingExtremes:
+    def __init__(self, lows: np.ndarray, highs: np.ndarray) -> None:
+        assert len(lows) == len(highs)
+
+        self._lows = lows
+        self._highs = highs
+
+        # each stack entry is (index, running low, running high), the top of
+        # the front stack is the first quote of the window and the top of the
+        # back stack is the last one
+        self._front: List[Tuple[int, float, float]] = []
+        self._back: List[Tuple[int, float, float]] = []
+
+    def _push(self, stack: List[Tuple[int, float, float]], i: int) -> None:
+        if len(stack) == 0:
+            stack.append((i, self._lows[i], self._highs[i]))
+        else:
+            _, l, h = stack[-1]
+            stack.append((i, min(l, self._lows[i]), max(h, self._highs[i])))
+
+    def _rebalance(
+        self,
+        source: List[Tuple[int, float, float]],
+        target: List[Tuple[int, float, float]],
+    ) -> None:
+        # move the inner half of source to the empty target so alternating
+        # pops from both ends stay amortized O(1)
+        indexes = [e[0] for e in reversed(source)]
+        half = len(indexes) // 2
+
+        source.clear()
+        for i in reversed(indexes[:half]):
+            self._push(source, i)
+
+        for i in indexes[half:]:
+            self._push(target, i)
+
+    def reset(self, start: int, end: int) -> None:
+        self._front = []
+        self._back = []
+
+        for i in range(start, end + 1):
+            self._push(self._back, i)
+
+    def push_back(self, i: int) -> None:
+        self._push(self._back, i)
+
+    def push_front(self, i: int) -> None:
+        self._push(self._front, i)
+
+    def pop_front(self) -> None:
+        if len(self._front) == 0:
+            self._rebalance(self._back, self._front)
+
+        self._front.pop()
+
+    def pop_back(self) -> None:
+        if len(self._back) == 0:
+            self._rebalance(self._front, self._back)
+
+        self._back.pop()
+
+    def extremes(self) -> Tuple[float, float]:
+        if len(self._front) == 0 and len(self._back) == 0:
+            raise ValueError("empty sliding window")
+
+        if len(self._front) == 0:
+            return self._back[-1][1], self._back[-1][2]
+
+        if len(self._back) == 0:
+            return self._front[-1][1], self._front[-1][2]
+
+        return (
+            min(self._front[-1][1], self._back[-1][1]),
+            max(self._front[-1][2], self._back[-1][2]),
+        )
+
+
 class QuotesCache:
     def __init__(
             self,
@@ -17,8 +97,115 @@ class QuotesCache:
 
         self._quotes = quotes
 
+        self._index = self._quotes.index.to_numpy()
+        self._columns: Dict[str, np.ndarray] = {}
+
+        self._statistics = RollingStatistics(self._quotes)
+
+        self._window_quotes: Optional[pd.DataFrame] = None
+        self._window_index: Optional[pd.DatetimeIndex] = None
+        self._window_columns: Dict[str, np.ndarray] = {}
+
+        self._extremes: Optional[SlidingExtremes] = None
+        self._head_extremes: Dict[int, SlidingExtremes] = {}
+        self._tail_extremes: Dict[int, SlidingExtremes] = {}
+
         self.time_slice(stime, etime)
 
+    def _invalidate_window(self) -> None:
+        self._window_quotes = None
+        self._window_index = None
+        self._window_columns = {}
+
+    def _column(self, column: str) -> Optional[np.ndarray]:
+        values = self._columns.get(column, None)
+        if values is None:
+            if column not in self._quotes.columns:
+                return None
+
+            values = self._quotes.loc[:, column].to_numpy()
+            self._columns[column] = values
+
+        return values
+
+    def _new_extremes(self) -> SlidingExtremes:
+        lows = self._column("low")
+        highs = self._column("high")
+
+        assert lows is not None
+        assert highs is not None
+
+        return SlidingExtremes(lows, highs)
+
+    def _head_bounds(self, n: int) -> Tuple[int, int]:
+        return self._sindex, min(self._sindex + n - 1, self._eindex)
+
+    def _tail_bounds(self, n: int) -> Tuple[int, int]:
+        return max(self._eindex - n + 1, self._sindex), self._eindex
+
+    def _reset_extremes(self) -> None:
+        if self._extremes is not None:
+            self._extremes.reset(self._sindex, self._eindex)
+
+        for n, extremes in self._head_extremes.items():
+            extremes.reset(*self._head_bounds(n))
+
+        for n, extremes in self._tail_extremes.items():
+            extremes.reset(*self._tail_bounds(n))
+
+    def _slide_extremes(self, step: int) -> None:
+        # the window has already moved by step, so the bounds below are the
+        # new ones and the quote leaving each window sits one step behind
+        if self._extremes is not None:
+            if step > 0:
+                self._extremes.push_back(self._eindex)
+                self._extremes.pop_front()
+            else:
+                self._extremes.push_front(self._sindex)
+                self._extremes.pop_back()
+
+        for bounds, trackers in (
+            (self._head_bounds, self._head_extremes),
+            (self._tail_bounds, self._tail_extremes),
+        ):
+            for n, extremes in trackers.items():
+                s, e = bounds(n)
+                if step > 0:
+                    extremes.push_back(e)
+                    extremes.pop_front()
+                else:
+                    extremes.push_front(s)
+                    extremes.pop_back()
+
+    def quotes_range(self) -> Tuple[float, float]:
+        if self._extremes is None:
+            self._extremes = self._new_extremes()
+            self._extremes.reset(self._sindex, self._eindex)
+
+        return self._extremes.extremes()
+
+    def head_range(self, n: int) -> Tuple[float, float]:
+        assert n > 0
+
+        extremes = self._head_extremes.get(n, None)
+        if extremes is None:
+            extremes = self._new_extremes()
+            extremes.reset(*self._head_bounds(n))
+            self._head_extremes[n] = extremes
+
+        return extremes.extremes()
+
+    def tail_range(self, n: int) -> Tuple[float, float]:
+        assert n > 0
+
+        extremes = self._tail_extremes.get(n, None)
+        if extremes is None:
+            extremes = self._new_extremes()
+            extremes.reset(*self._tail_bounds(n))
+            self._tail_extremes[n] = extremes
+
+        return extremes.extremes()
+
     def exstime(self) -> pd.Timestamp:
         return cast(pd.Timestamp, self._quotes.index[0])
 
@@ -40,14 +227,52 @@ class QuotesCache:
     def full_quotes(self) -> pd.DataFrame:
         return self._quotes
 
+    def statistics(self) -> RollingStatistics:
+        return self._statistics
+
     def quotes(self) -> pd.DataFrame:
-        return self._quotes.iloc[self._sindex: self._eindex + 1]
+        if self._window_quotes is None:
+            self._window_quotes = self._quotes.iloc[self._sindex: self._eindex + 1]
+
+        return self._window_quotes
+
+    def index(self) -> pd.DatetimeIndex:
+        if self._window_index is None:
+            self._window_index = self._quotes.index[self._sindex: self._eindex + 1]
+
+        return self._window_index
+
+    def values(self, column: str) -> Optional[np.ndarray]:
+        values = self._window_columns.get(column, None)
+        if values is None:
+            full = self._column(column)
+            if full is None:
+                return None
+
+            values = full[self._sindex: self._eindex + 1]
+            self._window_columns[column] = values
+
+        return values
+
+    def value(self, column: str, x: int, default: Optional[float] = None) -> Optional[float]:
+        values = self.values(column)
+        if values is None:
+            return default
+
+        return cast(float, values[x])
 
     def time_slice(self, stime: datetime, etime: datetime) -> None:
-        s = self._quotes.loc[stime:etime]
+        s = int(np.searchsorted(self._index, pd.Timestamp(stime).to_datetime64(), side="left"))
+        e = int(np.searchsorted(self._index, pd.Timestamp(etime).to_datetime64(), side="right")) - 1
+
+        if s > e:
+            raise ValueError(f"empty quotes between {stime} and {etime}")
 
-        self._sindex = self._quotes.index.get_loc(s.index[0])
-        self._eindex = self._quotes.index.get_loc(s.index[-1])
+        self._sindex = s
+        self._eindex = e
+
+        self._invalidate_window()
+        self._reset_extremes()
 
     def forward(self) -> bool:
         if self._eindex == len(self._quotes) - 1:
@@ -57,6 +282,9 @@ class QuotesCache:
         self._sindex += 1
         self._eindex += 1
 
+        self._invalidate_window()
+        self._slide_extremes(1)
+
         return True
 
     def backward(self) -> bool:
@@ -67,4 +295,7 @@ class QuotesCache:
         self._sindex -= 1
         self._eindex -= 1
 
+        self._invalidate_window()
+        self._slide_extremes(-1)
+
         return True
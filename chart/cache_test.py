@@ -1,10 +1,12 @@
 import unittest
 from datetime import datetime
 
+import numpy as np
+
 from fun.chart.cache import QuotesCache
 from fun.data.source import DAILY, WEEKLY
 from fun.futures.continuous import ContinuousContract
-from fun.utils.testing import parameterized
+from fun.utils.testing import parameterized, random_quotes
 
 
 class TestQuotesCache(unittest.TestCase):
@@ -278,6 +280,134 @@ class TestQuotesCache(unittest.TestCase):
 
         self.assertTrue(original.eq(df.loc[:, columns]).all(axis=1).all())
 
+    @parameterized(
+        [
+            {"start": "20180601", "end": "20190601"},
+            {"start": "20180602", "end": "20190602"},
+            {"start": "20170101", "end": "20180615"},
+            {"start": "20190101", "end": "20300101"},
+            {"start": "20180104", "end": "20180104"},
+        ]
+    )
+    def test_time_slice_bounds(self, start, end):
+        df = random_quotes("20180101", 500)
+
+        s = datetime.strptime(start, "%Y%m%d")
+        e = datetime.strptime(end, "%Y%m%d")
+
+        cache = QuotesCache(df, s, e)
+
+        expected = df.loc[s:e]
+
+        self.assertEqual(cache.stime(), expected.index[0])
+        self.assertEqual(cache.etime(), expected.index[-1])
+
+        self.assertEqual(cache.sindex(), df.index.get_loc(expected.index[0]))
+        self.assertEqual(cache.eindex(), df.index.get_loc(expected.index[-1]))
+
+        self.assertTrue(cache.quotes().equals(expected))
+
+    def test_time_slice_empty(self):
+        df = random_quotes("20180101", 100)
+
+        with self.assertRaises(ValueError):
+            QuotesCache(
+                df,
+                datetime.strptime("20190101", "%Y%m%d"),
+                datetime.strptime("20200101", "%Y%m%d"),
+            )
+
+    def test_window_views(self):
+        df = random_quotes("20180101", 300).drop(columns="open interest")
+
+        cache = QuotesCache(
+            df,
+            datetime.strptime("20180301", "%Y%m%d"),
+            datetime.strptime("20180901", "%Y%m%d"),
+        )
+
+        quotes = cache.quotes()
+        closes = cache.values("close")
+
+        self.assertIs(cache.quotes(), quotes)
+        self.assertIs(cache.values("close"), closes)
+        self.assertIsNone(cache.values("open interest"))
+        self.assertEqual(cache.value("open interest", 0, 0), 0)
+
+        self.assertTrue(np.shares_memory(closes, cache._column("close")))
+        self.assertTrue(np.array_equal(closes, quotes.loc[:, "close"].to_numpy()))
+        self.assertTrue(cache.index().equals(quotes.index))
+
+        for x in (0, len(quotes) // 2, len(quotes) - 1):
+            self.assertEqual(cache.value("high", x), quotes.iloc[x].get("high"))
+
+        self.assertTrue(cache.forward())
+
+        self.assertIsNot(cache.quotes(), quotes)
+        self.assertEqual(cache.value("close", 0), closes[1])
+        self.assertEqual(cache.index()[-1], df.index[cache.eindex()])
+
+        self.assertTrue(cache.backward())
+        self.assertTrue(np.array_equal(cache.values("close"), closes))
+
+    @parameterized(
+        [
+            {"start": "20180301", "end": "20180901", "n": 30},
+            {"start": "20180301", "end": "20180315", "n": 30},
+            {"start": "20180102", "end": "20180102", "n": 1},
+        ]
+    )
+    def test_sliding_extremes(self, start, end, n):
+        df = random_quotes("20180101", 300)
+
+        cache = QuotesCache(
+            df,
+            datetime.strptime(start, "%Y%m%d"),
+            datetime.strptime(end, "%Y%m%d"),
+        )
+
+        def check():
+            quotes = cache.quotes()
+
+            self.assertEqual(
+                cache.quotes_range(),
+                (quotes.loc[:, "low"].min(), quotes.loc[:, "high"].max()),
+            )
+
+            self.assertEqual(
+                cache.head_range(n),
+                (
+                    quotes.iloc[:n].loc[:, "low"].min(),
+                    quotes.iloc[:n].loc[:, "high"].max(),
+                ),
+            )
+
+            self.assertEqual(
+                cache.tail_range(n),
+                (
+                    quotes.iloc[-n:].loc[:, "low"].min(),
+                    quotes.iloc[-n:].loc[:, "high"].max(),
+                ),
+            )
+
+        check()
+
+        rng = np.random.default_rng(1)
+        for step in rng.choice([-1, 1, 1], size=400):
+            if step > 0:
+                cache.forward()
+            else:
+                cache.backward()
+
+            check()
+
+        cache.time_slice(
+            datetime.strptime("20180601", "%Y%m%d"),
+            datetime.strptime("20181001", "%Y%m%d"),
+        )
+
+        check()
+
 
 if __name__ == "__main__":
     unittest.main()
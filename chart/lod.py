@@ -0,0 +1,135 @@
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fun.chart.cache import QuotesCache
+from fun.plotter.rolling import RollingStatistics
+
+# how each column of a bucket is built from its bars, anything else keeps the
+# value of the last bar like close does
+_AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+class DecimatedStatistics:
+    def __init__(self, statistics: RollingStatistics, positions: np.ndarray) -> None:
+        # positions are the rows of the full history that close a bucket,
+        # statistics are still computed on every bar and only sampled there
+        self._statistics = statistics
+        self._positions = positions
+
+        self._values: Dict[Tuple[str, str, int], pd.Series] = {}
+
+    def _decimate(self, key: Tuple[str, str, int], values: pd.Series) -> pd.Series:
+        decimated = self._values.get(key, None)
+        if decimated is None:
+            decimated = values.iloc[self._positions]
+            self._values[key] = decimated
+
+        return decimated
+
+    def quotes(self) -> pd.DataFrame:
+        return self._statistics.quotes()
+
+    def column(self, column: str) -> pd.Series:
+        return self._decimate(("column", column, 0), self._statistics.column(column))
+
+    def mean(self, column: str, n: int) -> pd.Series:
+        return self._decimate(("mean", column, n), self._statistics.mean(column, n))
+
+    def std(self, column: str, n: int) -> pd.Series:
+        return self._decimate(("std", column, n), self._statistics.std(column, n))
+
+
+class QuotesLOD:
+    def __init__(self, cache: QuotesCache, max_bars: int) -> None:
+        assert max_bars > 0
+
+        self._cache = cache
+
+        length = cache.eindex() - cache.sindex() + 1
+
+        self._step = max(int(math.ceil(length / max_bars)), 1)
+
+        # buckets are aligned to the end of the window so the last bucket
+        # always closes on the last quote, only the first one may be partial
+        self._ends = np.arange(length - 1, -1, -self._step)[::-1]
+        self._starts = np.maximum(self._ends - self._step + 1, 0)
+
+        self._quotes: Optional[pd.DataFrame] = None
+        self._statistics: Optional[DecimatedStatistics] = None
+
+    @classmethod
+    def for_width(
+        cls, cache: QuotesCache, pixels: float, bar_pixels: float = 2.0
+    ) -> "QuotesLOD":
+        assert bar_pixels > 0
+
+        return cls(cache, max(int(pixels / bar_pixels), 1))
+
+    def step(self) -> int:
+        return self._step
+
+    def active(self) -> bool:
+        return self._step > 1
+
+    def original(self, x: int) -> int:
+        return int(self._ends[x])
+
+    def quotes(self) -> pd.DataFrame:
+        if self._quotes is None:
+            window = self._cache.quotes()
+
+            columns = {}
+            for column in window.columns:
+                values = window.loc[:, column].to_numpy()
+
+                aggregation = _AGGREGATIONS.get(column, "last")
+                if aggregation == "first":
+                    columns[column] = values[self._starts]
+                elif aggregation == "max":
+                    columns[column] = np.maximum.reduceat(values, self._starts)
+                elif aggregation == "min":
+                    columns[column] = np.minimum.reduceat(values, self._starts)
+                elif aggregation == "sum":
+                    columns[column] = np.add.reduceat(values, self._starts)
+                else:
+                    columns[column] = values[self._ends]
+
+            self._quotes = pd.DataFrame(
+                columns, index=window.index[self._ends], columns=window.columns
+            )
+
+        return self._quotes
+
+    def full_quotes(self) -> pd.DataFrame:
+        return self._cache.full_quotes()
+
+    def statistics(self) -> DecimatedStatistics:
+        if self._statistics is None:
+            self._statistics = DecimatedStatistics(
+                self._cache.statistics(), self._cache.sindex() + self._ends
+            )
+
+        return self._statistics
+
+    def quotes_range(self) -> Tuple[float, float]:
+        return self._cache.quotes_range()
+
+    def head_range(self, n: int) -> Tuple[float, float]:
+        assert n > 0
+
+        quotes = self.quotes().iloc[:n]
+        return np.amin(quotes.loc[:, "low"]), np.amax(quotes.loc[:, "high"])
+
+    def tail_range(self, n: int) -> Tuple[float, float]:
+        assert n > 0
+
+        quotes = self.quotes().iloc[-n:]
+        return np.amin(quotes.loc[:, "low"]), np.amax(quotes.loc[:, "high"])
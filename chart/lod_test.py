@@ -0,0 +1,81 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from fun.chart.cache import QuotesCache
+from fun.chart.lod import QuotesLOD
+from fun.utils.testing import parameterized, random_quotes
+
+
+class TestQuotesLOD(unittest.TestCase):
+    @parameterized(
+        [
+            {"start": "2001-01-01", "end": "2010-01-01", "max_bars": 300},
+            {"start": "2001-01-01", "end": "2010-01-01", "max_bars": 7},
+            {"start": "2003-03-03", "end": "2003-09-01", "max_bars": 1000},
+            {"start": "2004-02-10", "end": "2008-06-01", "max_bars": 1},
+        ]
+    )
+    def test_quotes(self, start, end, max_bars):
+        cache = QuotesCache(
+            random_quotes("2000-01-03", 3000),
+            datetime.fromisoformat(start),
+            datetime.fromisoformat(end),
+        )
+        window = cache.quotes()
+
+        lod = QuotesLOD(cache, max_bars)
+        quotes = lod.quotes()
+
+        self.assertLessEqual(len(quotes), max_bars)
+        self.assertEqual(lod.active(), len(window) > max_bars)
+        self.assertEqual(quotes.index[-1], window.index[-1])
+
+        ends = [lod.original(x) for x in range(len(quotes))]
+        starts = [0] + [e + 1 for e in ends[:-1]]
+
+        for x, (s, e) in enumerate(zip(starts, ends)):
+            stop = e + 1
+            bucket = window.iloc[s:stop]
+            row = quotes.iloc[x]
+
+            self.assertEqual(quotes.index[x], bucket.index[-1])
+            self.assertEqual(row["open"], bucket.iloc[0]["open"])
+            self.assertEqual(row["high"], bucket["high"].max())
+            self.assertEqual(row["low"], bucket["low"].min())
+            self.assertEqual(row["close"], bucket.iloc[-1]["close"])
+            self.assertAlmostEqual(row["volume"], bucket["volume"].sum())
+            self.assertEqual(row["open interest"], bucket.iloc[-1]["open interest"])
+
+        self.assertEqual(lod.quotes_range(), cache.quotes_range())
+        self.assertEqual(
+            lod.head_range(3),
+            (quotes["low"].iloc[:3].min(), quotes["high"].iloc[:3].max()),
+        )
+
+    @parameterized([{"n": 5}, {"n": 20}, {"n": 60}])
+    def test_statistics(self, n):
+        cache = QuotesCache(
+            random_quotes("2000-01-03", 3000),
+            datetime(2002, 1, 1),
+            datetime(2009, 1, 1),
+        )
+
+        lod = QuotesLOD(cache, 200)
+        quotes = lod.quotes()
+
+        for decimated, values in (
+            (lod.statistics().mean("close", n), cache.statistics().mean("close", n)),
+            (lod.statistics().std("close", n), cache.statistics().std("close", n)),
+            (lod.statistics().column("close"), cache.statistics().column("close")),
+        ):
+            start, end = quotes.index[0], quotes.index[-1]
+            sliced = decimated.loc[start:end]
+
+            self.assertTrue(sliced.index.equals(quotes.index))
+            self.assertTrue(np.array_equal(sliced.to_numpy(), values.loc[quotes.index].to_numpy()))
+
+
+if __name__ == "__main__":
+    unittest.main()
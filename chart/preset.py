@@ -1,16 +1,19 @@
+import copy
 import io
-import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABCMeta, abstractmethod
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, cast
 
 import pandas as pd
 
 from fun.chart.base import CHART_SIZE, MEDIUM_CHART
 from fun.chart.cache import QuotesCache
+from fun.chart.lod import QuotesLOD
+from fun.chart.profile import RenderProfile
 from fun.chart.setting import Setting
-from fun.chart.static import TradingChart
+from fun.chart.static import DPI, TradingChart, figure_size
 from fun.chart.theme import MagicalTheme, Theme
 from fun.data.barchart import Barchart
 from fun.data.source import (
@@ -37,10 +40,11 @@ from fun.plotter.indicator import BollingerBand, SimpleMovingAverage
 from fun.plotter.level import Level
 from fun.plotter.plotter import Plotter
 from fun.plotter.quote import LastQuote
+from fun.plotter.reference import ReferenceSeriesRegistry
 from fun.plotter.study import (
     NoteMarker,
+    NotesIndex,
     StudyZone,
-    read_notes,
 )
 from fun.plotter.volatility import VolatilityRealBodyContraction, VolatilitySummary
 from fun.plotter.volume import Volume
@@ -79,6 +83,9 @@ class CandleSticksPreset:
 
         self._controller = None
         self._chart = None
+        self._lod: Optional[QuotesLOD] = None
+
+        self._notes_stale = True
 
     def _time_range(self, dtime: datetime) -> Tuple[datetime, datetime]:
 
@@ -327,56 +334,33 @@ class CandleSticksPreset:
 
     def _read_note(self, dt: str) -> Optional[str]:
 
-        root = os.path.join(
-            os.getenv("HOME"),
-            "Documents",
-            "TRADING_NOTES",
-            "notes",
-        )
-
-        notes_root = None
-        for r in os.listdir(root):
-            pattern = r"[&_,|]"
-
-            targets = re.split(pattern, r)
-            targets = list(map(lambda x: x.strip(), targets))
-
-            if self._symbol.lower() in targets:
-                path = os.path.join(root, r)
-                if os.path.exists(path):
-                    notes_root = path
-                break
-
-        if notes_root is None:
+        index = NotesIndex.for_symbol(self._symbol)
+        if index is None:
             return None
 
+        # files are checked at most once per render, lookups are dict hits
+        if self._notes_stale:
+            index.refresh()
+            self._notes_stale = False
+
         notes = ["\n"]
         max_lenght = 0
 
-        def append_notes(filename, note_dt, pattern, content):
-            nonlocal notes
-            nonlocal max_lenght
-            nonlocal dt
-
-            if dt == note_dt.strftime("%Y%m%dT%H:%M"):
-                for c in content.split("\n"):
-                    lc = len(c.strip())
-                    max_lenght = max(lc, max_lenght)
+        filenames: List[str] = []
+        for filename, _ in index.notes(self._frequency).get(
+            datetime.strptime(dt, "%Y%m%dT%H:%M"), []
+        ):
+            if filename in filenames:
+                continue
 
-                notes.append(f"{filename.replace('.txt', '')}\n\n{content.strip()}")
+            filenames.append(filename)
 
-                return True
+            content = index.content(filename)
+            for c in content.split("\n"):
+                lc = len(c.strip())
+                max_lenght = max(lc, max_lenght)
 
-        read_notes(
-            notes_root,
-            self._frequency,
-            lambda filename, note_dt, pattern, content: append_notes(
-                filename=filename,
-                note_dt=note_dt,
-                pattern=pattern,
-                content=content,
-            ),
-        )
+            notes.append(f"{filename.replace('.txt', '')}\n\n{content.strip()}")
 
         if len(notes) > 0:
             notes.append("\n")
@@ -405,15 +389,15 @@ class CandleSticksPreset:
         return self._setting
 
     def last_quote(self) -> Dict[str, Any]:
-        df = self._cache.quotes().iloc[-1]
+        x = len(self._cache.index()) - 1
         return {
-            "date": self._cache.quotes().index[-1].strftime("%Y%m%d"),
-            "open": df.get("open"),
-            "high": df.get("high"),
-            "low": df.get("low"),
-            "close": df.get("close"),
-            "volume": df.get("volume", 0),
-            "interest": df.get("open interest", 0),
+            "date": self._cache.index()[x].strftime("%Y%m%d"),
+            "open": self._cache.value("open", x),
+            "high": self._cache.value("high", x),
+            "low": self._cache.value("low", x),
+            "close": self._cache.value("close", x),
+            "volume": self._cache.value("volume", x, 0),
+            "interest": self._cache.value("open interest", x, 0),
         }
 
     def time_slice(self, dtime: datetime, chart_range: Optional[str] = None) -> None:
@@ -457,6 +441,7 @@ class CandleSticksPreset:
         self,
         parameters: Optional[Dict[str, str]],
         preset_key: str = "Preset",
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
         if parameters is None:
             self._controller = KushamiNekoController(
@@ -465,6 +450,7 @@ class CandleSticksPreset:
                 frequency=self._frequency,
                 chart_size=self._chart_size,
                 parameters=parameters,
+                references=references,
             )
 
             self._theme = self._controller.get_theme()
@@ -480,6 +466,7 @@ class CandleSticksPreset:
                 frequency=self._frequency,
                 chart_size=self._chart_size,
                 parameters=parameters,
+                references=references,
             )
         elif preset == "Magical":
             self._controller = MagicalController(
@@ -488,6 +475,7 @@ class CandleSticksPreset:
                 frequency=self._frequency,
                 chart_size=self._chart_size,
                 parameters=parameters,
+                references=references,
             )
 
         assert self._controller is not None
@@ -495,9 +483,17 @@ class CandleSticksPreset:
         self._theme = self._controller.get_theme()
         self._setting = self._controller.get_setting()
 
-    def render(self, additional_plotters: Optional[List[Plotter]] = None) -> io.BytesIO:
+    def render(
+        self,
+        additional_plotters: Optional[List[Plotter]] = None,
+        profile: bool = False,
+        profile_callback: Optional[Callable[[RenderProfile], None]] = None,
+        lod: bool = False,
+    ) -> io.BytesIO:
         buf = io.BytesIO()
 
+        self._notes_stale = True
+
         plotters = []
 
         if self._controller is None:
@@ -507,23 +503,58 @@ class CandleSticksPreset:
 
         assert self._controller is not None
 
-        plotters.extend(self._controller.get_plotters())
+        controller = self._controller
+        quotes = self._cache.quotes()
+
+        # with more bars than the figure has pixels the plotters draw buckets
+        # of consecutive bars instead, inspect maps them back to the bars
+        self._lod = None
+        if lod:
+            view = QuotesLOD.for_width(
+                self._cache, figure_size(self._chart_size)[0] * DPI
+            )
+            if view.active():
+                self._lod = view
+                controller = controller.with_cache(view)
+                quotes = view.quotes()
+
+        render_profile: Optional[RenderProfile] = None
+        if profile or profile_callback is not None:
+            render_profile = RenderProfile()
+
+        if render_profile is None:
+            plotters.extend(controller.get_plotters())
+        else:
+            with render_profile.measure("plotters"):
+                plotters.extend(controller.get_plotters())
 
         if additional_plotters is not None and len(additional_plotters) > 0:
             plotters.extend(additional_plotters)
 
         self._chart = TradingChart(
-            quotes=self._cache.quotes(),
+            quotes=quotes,
             theme=self._theme,
             setting=self._setting,
+            quotes_range=self._cache.quotes_range(),
         )
 
-        self._chart.render(buf, plotters=plotters)
+        self._chart.render(
+            buf,
+            plotters=plotters,
+            profile=render_profile if render_profile is not None else False,
+            profile_callback=profile_callback,
+        )
 
         buf.seek(0)
 
         return buf
 
+    def profile(self) -> Optional[RenderProfile]:
+        if self._chart is None:
+            return None
+
+        return self._chart.profile()
+
     def inspect(
         self,
         x: float,
@@ -544,22 +575,25 @@ class CandleSticksPreset:
 
         nx, ny = n
 
-        df = self._cache.quotes()
+        if self._lod is not None:
+            nx = self._lod.original(nx)
+
+        dates = self._cache.index()
 
         info = {
-            "date(CT)": self._cache.quotes().index[nx].strftime("%Y-%m-%d"),
+            "date(CT)": dates[nx].strftime("%Y-%m-%d"),
         }
 
-        ja = self._cache.quotes().index[nx]
+        ja = dates[nx]
 
         if self._frequency == HOURLY:
-            info["time(CT)"] = self._cache.quotes().index[nx].strftime("%H:%M")
+            info["time(CT)"] = dates[nx].strftime("%H:%M")
 
             offset = 15
-            if self._cache.quotes().index[nx].month in range(3, 11):
+            if dates[nx].month in range(3, 11):
                 offset = 14
 
-            ja = self._cache.quotes().index[nx] + timedelta(hours=offset)
+            ja = dates[nx] + timedelta(hours=offset)
 
             info["date(JA)"] = ja.strftime("%Y-%m-%d")
             info["time(JA)"] = ja.strftime("%H:%M")
@@ -579,12 +613,12 @@ class CandleSticksPreset:
             # ] = f"{ja:02d}:{self._cache.quotes().index[nx].strftime('%M')}"
 
         info["price"] = f"{ny:,.{quote_decimals}f}"
-        info["open"] = f"{df.iloc[nx].get('open'):,.{quote_decimals}f}"
-        info["high"] = f"{df.iloc[nx].get('high'):,.{quote_decimals}f}"
-        info["low"] = f"{df.iloc[nx].get('low'):,.{quote_decimals}f}"
-        info["close"] = f"{df.iloc[nx].get('close'):,.{quote_decimals}f}"
-        info["volume"] = f"{df.iloc[nx].get('volume', 0):,.0f}"
-        info["interest"] = f"{df.iloc[nx].get('open interest', 0):,.0f}"
+        info["open"] = f"{self._cache.value('open', nx):,.{quote_decimals}f}"
+        info["high"] = f"{self._cache.value('high', nx):,.{quote_decimals}f}"
+        info["low"] = f"{self._cache.value('low', nx):,.{quote_decimals}f}"
+        info["close"] = f"{self._cache.value('close', nx):,.{quote_decimals}f}"
+        info["volume"] = f"{self._cache.value('volume', nx, 0):,.0f}"
+        info["interest"] = f"{self._cache.value('open interest', nx, 0):,.0f}"
 
         # info = {
         # "date": self._cache.quotes().index[nx].strftime("%Y-%m-%d"),
@@ -597,18 +631,18 @@ class CandleSticksPreset:
         # "interest": f"{df.iloc[nx].get('open interest', 0):,.0f}",
         # }
 
-        note = self._read_note(self._cache.quotes().index[nx].strftime("%Y%m%dT%H:%M"))
+        note = self._read_note(dates[nx].strftime("%Y%m%dT%H:%M"))
 
         if ax is None or ay is None:
             if nx != 0:
-                base = self._cache.quotes().iloc[nx - 1].get("close")
+                base = self._cache.value("close", nx - 1)
                 info[
                     "diff($)"
-                ] = f"{df.iloc[nx].get('close') - base:,.{quote_decimals}f}"
+                ] = f"{self._cache.value('close', nx) - base:,.{quote_decimals}f}"
 
                 info[
                     "diff(%)"
-                ] = f"{((df.iloc[nx].get('close') - base) / base) * 100.0:,.{diff_decimals}f}"
+                ] = f"{((self._cache.value('close', nx) - base) / base) * 100.0:,.{diff_decimals}f}"
 
         else:
             an = self._chart.to_data_coordinates(ax, ay)
@@ -616,19 +650,33 @@ class CandleSticksPreset:
 
             ax, ay = an
 
-            base_date = self._cache.quotes().index[ax]
+            if self._lod is not None:
+                ax = self._lod.original(ax)
+
+            base_date = dates[ax]
 
             info["diff(B)"] = f"{nx-ax}"
-            info["diff(D)"] = f"{(df.index[nx] - base_date).days}"
-            info["diff(W)"] = f"{(df.index[nx] - base_date).days / 7:.2f}"
-            info["diff(M)"] = f"{(df.index[nx] - base_date).days / 30:.2f}"
+            info["diff(D)"] = f"{(dates[nx] - base_date).days}"
+            info["diff(W)"] = f"{(dates[nx] - base_date).days / 7:.2f}"
+            info["diff(M)"] = f"{(dates[nx] - base_date).days / 30:.2f}"
             info["diff($)"] = f"{ny - ay:,.{quote_decimals}f}"
             info["diff(%)"] = f"{((ny - ay) / ay) * 100.0:,.{diff_decimals}f}"
 
         return info, note
 
 
+class PlotterSpec:
+    def __init__(self, plotter: Callable[..., Plotter], **kwargs: Any) -> None:
+        self._plotter = plotter
+        self._kwargs = kwargs
+
+    def build(self) -> Plotter:
+        return self._plotter(**self._kwargs)
+
+
 class PresetController(metaclass=ABCMeta):
+    _loader_workers = 4
+
     def __init__(
         self,
         cache: QuotesCache,
@@ -636,8 +684,9 @@ class PresetController(metaclass=ABCMeta):
         frequency: FREQUENCY,
         chart_size: CHART_SIZE,
         parameters: Optional[Dict[str, str]],
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
-        self._cache = cache
+        self._cache: Union[QuotesCache, QuotesLOD] = cache
         self._symbol = symbol
         self._frequency = frequency
 
@@ -646,6 +695,16 @@ class PresetController(metaclass=ABCMeta):
 
         self._parameters = parameters
 
+        self._references = (
+            references if references is not None else ReferenceSeriesRegistry()
+        )
+
+    def with_cache(self, cache: Union[QuotesCache, QuotesLOD]) -> "PresetController":
+        controller = copy.copy(self)
+        controller._cache = cache
+
+        return controller
+
     def get_setting(self) -> Setting:
         return self._setting
 
@@ -654,72 +713,95 @@ class PresetController(metaclass=ABCMeta):
         raise NotImplementedError
 
     @abstractmethod
-    def get_plotters(self) -> List[Plotter]:
+    def get_plotter_specs(self) -> List[PlotterSpec]:
         raise NotImplementedError
 
+    def get_plotters(self) -> List[Plotter]:
+        specs = self.get_plotter_specs()
+        if len(specs) == 0:
+            return []
+
+        # plotters read their data in the constructor, so building them on a
+        # pool overlaps the file reads of independent overlays, they are not
+        # kept across renders since notes and records can change in between
+        with ThreadPoolExecutor(
+            max_workers=min(len(specs), self._loader_workers)
+        ) as executor:
+            return list(executor.map(lambda spec: spec.build(), specs))
+
 
 class KushamiNekoController(PresetController):
     def get_theme(self) -> Theme:
         return Theme()
 
-    def get_plotters(
-        self,
-    ) -> List[Plotter]:
-        plotters = [
-            BackgroundTimeRangeMark(
+    def get_plotter_specs(self) -> List[PlotterSpec]:
+        specs = [
+            PlotterSpec(
+                BackgroundTimeRangeMark,
                 quotes=self._cache.quotes(),
                 frequency=self._frequency,
             ),
-            LastQuote(
+            PlotterSpec(
+                LastQuote,
                 quotes=self._cache.quotes(),
                 frequency=self._frequency,
                 font_color=self.get_theme().get_color("text"),
                 font_properties=self.get_theme().get_font(
                     self._setting.text_fontsize(multiplier=1.5)
                 ),
+                quotes_range=self._cache.quotes_range(),
+                head_quotes_range=self._cache.head_range(30),
             ),
         ]
 
         if self._parameters is not None:
 
             if self._parameters.get("CandleSticks", "").lower() == "true":
-                plotters.append(
-                    CandleSticks(
+                specs.append(
+                    PlotterSpec(
+                        CandleSticks,
                         quotes=self._cache.quotes(),
                         shadow_width=self._setting.shadow_width(),
                         body_width=self._setting.body_width(),
                         color_up=self.get_theme().get_color("up"),
                         color_down=self.get_theme().get_color("down"),
                         color_unchanged=self.get_theme().get_color("unchanged"),
+                        quotes_range=self._cache.quotes_range(),
                     ),
                 )
 
             if self._parameters.get("MovingAverages", "").lower() == "true":
-                plotters.extend(
+                specs.extend(
                     [
-                        SimpleMovingAverage(
+                        PlotterSpec(
+                            SimpleMovingAverage,
                             n=5,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("sma0"),
                             line_alpha=self.get_theme().get_alpha("sma"),
                             line_width=self._setting.linewidth() * 1.5,
                         ),
-                        SimpleMovingAverage(
+                        PlotterSpec(
+                            SimpleMovingAverage,
                             n=20,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("sma1"),
                             line_alpha=self.get_theme().get_alpha("sma"),
                             line_width=self._setting.linewidth() * 1.5,
                         ),
-                        SimpleMovingAverage(
+                        PlotterSpec(
+                            SimpleMovingAverage,
                             n=60,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("sma2"),
                             line_alpha=self.get_theme().get_alpha("sma"),
                             line_width=self._setting.linewidth() * 1.5,
@@ -728,12 +810,14 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("MovingAverages10", "").lower() == "true":
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=10,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color("sma6"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth() * 1.5,
@@ -741,8 +825,9 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("StudyZone", "").lower() == "true":
-                plotters.append(
-                    StudyZone(
+                specs.append(
+                    PlotterSpec(
+                        StudyZone,
                         symbol=self._symbol,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
@@ -751,8 +836,9 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("Studies", "").lower() == "true":
-                plotters.append(
-                    NoteMarker(
+                specs.append(
+                    PlotterSpec(
+                        NoteMarker,
                         symbol=self._symbol,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
@@ -760,20 +846,24 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("InterestRates", "").lower() == "true":
-                plotters.append(
-                    InterestRatesSummary(
+                specs.append(
+                    PlotterSpec(
+                        InterestRatesSummary,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
+                        references=self._references,
                     ),
                 )
 
             if self._parameters.get("MovingAverages100", "").lower() == "true":
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=100,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color("sma3"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth(),
@@ -781,12 +871,14 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("MovingAverages125", "").lower() == "true":
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=125,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color("sma3"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth(),
@@ -794,12 +886,14 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("MovingAverages300", "").lower() == "true":
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=300,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color("sma4"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth(),
@@ -807,12 +901,14 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("MovingAverages250", "").lower() == "true":
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=250,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color("sma4"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth(),
@@ -820,44 +916,52 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("BollingerBands", "").lower() == "true":
-                plotters.extend(
+                specs.extend(
                     [
-                        BollingerBand(
+                        PlotterSpec(
+                            BollingerBand,
                             n=20,
                             m=1.5,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("bb0"),
                             line_alpha=self.get_theme().get_alpha("bb"),
                             line_width=self._setting.linewidth(),
                         ),
-                        BollingerBand(
+                        PlotterSpec(
+                            BollingerBand,
                             n=20,
                             m=2.0,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("bb1"),
                             line_alpha=self.get_theme().get_alpha("bb"),
                             line_width=self._setting.linewidth(),
                         ),
-                        BollingerBand(
+                        PlotterSpec(
+                            BollingerBand,
                             n=20,
                             m=2.5,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("bb2"),
                             line_alpha=self.get_theme().get_alpha("bb"),
                             line_width=self._setting.linewidth(),
                         ),
-                        BollingerBand(
+                        PlotterSpec(
+                            BollingerBand,
                             n=20,
                             m=3.0,
                             quotes=self._cache.full_quotes(),
                             slice_start=self._cache.quotes().index[0],
                             slice_end=self._cache.quotes().index[-1],
+                            statistics=self._cache.statistics(),
                             line_color=self.get_theme().get_color("bb3"),
                             line_alpha=self.get_theme().get_alpha("bb"),
                             line_width=self._setting.linewidth(),
@@ -866,19 +970,23 @@ class KushamiNekoController(PresetController):
                 )
 
             if self._parameters.get("Volume", "").lower() == "true":
-                plotters.append(
-                    Volume(
+                specs.append(
+                    PlotterSpec(
+                        Volume,
                         quotes=self._cache.quotes(),
                         body_width=self._setting.body_width(),
                         color_up=self.get_theme().get_color("up"),
                         color_down=self.get_theme().get_color("down"),
                         color_unchanged=self.get_theme().get_color("unchanged"),
+                        quotes_range=self._cache.quotes_range(),
+                        tail_quotes_range=self._cache.tail_range(30),
                     ),
                 )
 
             if self._parameters.get("TradingLevel", "").lower() == "true":
-                plotters.append(
-                    Level(
+                specs.append(
+                    PlotterSpec(
+                        Level,
                         full_quotes=self._cache.full_quotes(),
                         quotes=self._cache.quotes(),
                         symbol=self._symbol,
@@ -886,6 +994,10 @@ class KushamiNekoController(PresetController):
                         font_properties=self.get_theme().get_font(
                             self._setting.text_fontsize(multiplier=1.5)
                         ),
+                        quotes_range=self._cache.quotes_range(),
+                        tail_quotes_range=self._cache.tail_range(30),
+                        references=self._references,
+                        statistics=self._cache.statistics(),
                     )
                 )
 
@@ -904,8 +1016,9 @@ class KushamiNekoController(PresetController):
                     op = self._parameters.get("VixOp", "").strip()
 
                     if reference != "" and op != "":
-                        plotters.append(
-                            VolatilityZone(
+                        specs.append(
+                            PlotterSpec(
+                                VolatilityZone,
                                 quotes=self._cache.quotes(),
                                 dtime=datetime.strptime(reference, "%Y%m%d"),
                                 op=op,
@@ -925,8 +1038,9 @@ class KushamiNekoController(PresetController):
                 )
 
                 if op != "":
-                    plotters.append(
-                        EntryZone(
+                    specs.append(
+                        PlotterSpec(
+                            EntryZone,
                             quotes=self._cache.quotes(),
                             frequency=self._frequency,
                             operation=op,
@@ -936,36 +1050,43 @@ class KushamiNekoController(PresetController):
                     )
 
             if self._parameters.get("EWRelativeStrength", "").lower() == "true":
-                plotters.append(
-                    EqualWeightedRelativeStrength(
+                specs.append(
+                    PlotterSpec(
+                        EqualWeightedRelativeStrength,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         symbol=self._symbol,
+                        references=self._references,
                     )
                 )
 
             if self._parameters.get("AdvanceDecline", "").lower() == "true":
-                plotters.append(
-                    AdvanceDeclineLine(
+                specs.append(
+                    PlotterSpec(
+                        AdvanceDeclineLine,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         symbol=self._symbol,
+                        references=self._references,
                     )
                 )
 
             if self._parameters.get("AdvanceDeclineVolume", "").lower() == "true":
-                plotters.append(
-                    AdvanceDeclineLine(
+                specs.append(
+                    PlotterSpec(
+                        AdvanceDeclineLine,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         symbol=self._symbol,
                         volume_diff=True,
+                        references=self._references,
                     )
                 )
 
             if self._parameters.get("DistributionDays", "").lower() == "true":
-                plotters.append(
-                    DistributionsDay(
+                specs.append(
+                    PlotterSpec(
+                        DistributionsDay,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         font_color=self.get_theme().get_color("text"),
@@ -975,54 +1096,66 @@ class KushamiNekoController(PresetController):
                         info_font_properties=self.get_theme().get_font(
                             self._setting.text_fontsize(multiplier=1.5)
                         ),
+                        quotes_range=self._cache.quotes_range(),
+                        tail_quotes_range=self._cache.tail_range(30),
                     )
                 )
 
             if self._parameters.get("VolatilityBodySize", "").lower() == "true":
-                plotters.append(
-                    VolatilityRealBodyContraction(
+                specs.append(
+                    PlotterSpec(
+                        VolatilityRealBodyContraction,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         symbol=self._symbol,
+                        references=self._references,
                     )
                 )
 
             if self._parameters.get("VolatilitySummary", "").lower() == "true":
-                plotters.append(
-                    VolatilitySummary(
+                specs.append(
+                    PlotterSpec(
+                        VolatilitySummary,
                         quotes=self._cache.quotes(),
                         frequency=self._frequency,
                         symbol=self._symbol,
+                        references=self._references,
                     )
                 )
 
-        return plotters
+        return specs
 
 
 class MagicalController(PresetController):
     def get_theme(self) -> Theme:
         return MagicalTheme()
 
-    def get_plotters(self) -> List[Plotter]:
-        plotters = [
-            BackgroundTimeRangeMark(
+    def get_plotter_specs(self) -> List[PlotterSpec]:
+        specs = [
+            PlotterSpec(
+                BackgroundTimeRangeMark,
                 quotes=self._cache.quotes(),
                 frequency=self._frequency,
             ),
-            CandleSticks(
+            PlotterSpec(
+                CandleSticks,
                 quotes=self._cache.quotes(),
                 shadow_width=self._setting.shadow_width(),
                 body_width=self._setting.body_width(),
                 color_up=self.get_theme().get_color("up"),
                 color_down=self.get_theme().get_color("down"),
                 color_unchanged=self.get_theme().get_color("unchanged"),
+                quotes_range=self._cache.quotes_range(),
             ),
-            LastQuote(
+            PlotterSpec(
+                LastQuote,
                 quotes=self._cache.quotes(),
                 font_color=self.get_theme().get_color("text"),
                 font_properties=self.get_theme().get_font(
                     self._setting.text_fontsize(multiplier=1.5)
                 ),
+                quotes_range=self._cache.quotes_range(),
+                head_quotes_range=self._cache.head_range(30),
             ),
         ]
 
@@ -1034,16 +1167,18 @@ class MagicalController(PresetController):
                     continue
 
                 n = int(match.group(1))
-                plotters.append(
-                    SimpleMovingAverage(
+                specs.append(
+                    PlotterSpec(
+                        SimpleMovingAverage,
                         n=n,
                         quotes=self._cache.full_quotes(),
                         slice_start=self._cache.quotes().index[0],
                         slice_end=self._cache.quotes().index[-1],
+                        statistics=self._cache.statistics(),
                         line_color=self.get_theme().get_color(f"sma{n}"),
                         line_alpha=self.get_theme().get_alpha("sma"),
                         line_width=self._setting.linewidth(),
                     ),
                 )
 
-        return plotters
+        return specs
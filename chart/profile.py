@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+
+class RenderTiming:
+    def __init__(self, phase: str, wall_time: float, cpu_time: float) -> None:
+        self._phase = phase
+        self._wall_time = wall_time
+        self._cpu_time = cpu_time
+
+    def phase(self) -> str:
+        return self._phase
+
+    def wall_time(self) -> float:
+        return self._wall_time
+
+    def cpu_time(self) -> float:
+        return self._cpu_time
+
+    def to_entity(self) -> Dict[str, str]:
+        return {
+            "phase": self._phase,
+            "wall_time": f"{self._wall_time * 1000.0:.3f}ms",
+            "cpu_time": f"{self._cpu_time * 1000.0:.3f}ms",
+        }
+
+
+class RenderProfile:
+    def __init__(self) -> None:
+        self._timings: List[RenderTiming] = []
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+
+        try:
+            yield
+        finally:
+            self._timings.append(
+                RenderTiming(
+                    phase=phase,
+                    wall_time=time.perf_counter() - wall,
+                    cpu_time=time.process_time() - cpu,
+                )
+            )
+
+    def timings(self) -> List[RenderTiming]:
+        return self._timings
+
+    def wall_time(self) -> float:
+        return sum(t.wall_time() for t in self._timings)
+
+    def cpu_time(self) -> float:
+        return sum(t.cpu_time() for t in self._timings)
+
+    def summary(self) -> Dict[str, Tuple[int, float, float]]:
+        phases: Dict[str, Tuple[int, float, float]] = {}
+
+        for t in self._timings:
+            count, wall, cpu = phases.get(t.phase(), (0, 0.0, 0.0))
+            phases[t.phase()] = (count + 1, wall + t.wall_time(), cpu + t.cpu_time())
+
+        return phases
+
+    def to_entity(self) -> List[Dict[str, str]]:
+        return [
+            {
+                "phase": phase,
+                "count": f"{count}",
+                "wall_time": f"{wall * 1000.0:.3f}ms",
+                "cpu_time": f"{cpu * 1000.0:.3f}ms",
+            }
+            for phase, (count, wall, cpu) in sorted(
+                self.summary().items(), key=lambda x: x[1][1], reverse=True
+            )
+        ]
@@ -0,0 +1,508 @@
+import argparse
+import http.client
+import json
+import re
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple, cast
+
+from fun.chart.base import CHART_SIZE, LARGE_CHART, MEDIUM_CHART
+from fun.chart.batch import FREQUENCY_NAMES
+from fun.chart.preset import CandleSticksPreset
+from fun.plotter.reference import ReferenceSeriesRegistry
+from fun.utils import colors, pretty
+
+CHART_SIZES: Dict[str, CHART_SIZE] = {
+    "medium": MEDIUM_CHART,
+    "large": LARGE_CHART,
+}
+
+
+class ChartSession:
+    def __init__(self, preset: CandleSticksPreset) -> None:
+        self._preset = preset
+
+        # the registry keeps the reference series of one chart window, a
+        # shared one would be emptied by every render of another session
+        self._references = ReferenceSeriesRegistry()
+
+        # the preset is stateful, everything using it holds the preset lock
+        self._preset_lock = threading.Lock()
+
+        # bumped whenever the chart window moves so renders of the old window
+        # are never shared with requests made after the move, moves and the
+        # renders registered for a version hold the session lock
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def preset(self) -> CandleSticksPreset:
+        return self._preset
+
+    def references(self) -> ReferenceSeriesRegistry:
+        return self._references
+
+    def lock(self) -> threading.Lock:
+        return self._lock
+
+    def preset_lock(self) -> threading.Lock:
+        return self._preset_lock
+
+    def version(self) -> int:
+        return self._version
+
+    def moved(self) -> None:
+        self._version += 1
+
+    def window(self) -> Dict[str, Any]:
+        return {
+            "stime": self._preset.stime().isoformat(),
+            "etime": self._preset.etime().isoformat(),
+        }
+
+
+class ChartService:
+    def __init__(
+        self,
+        workers: int = 4,
+        preset_factory: Callable[..., CandleSticksPreset] = CandleSticksPreset,
+    ) -> None:
+        assert workers > 0
+
+        self._preset_factory = preset_factory
+
+        self._sessions: Dict[str, ChartSession] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, int, str], "Future[bytes]"] = {}
+
+    def add_session(self, preset: CandleSticksPreset) -> str:
+        sid = uuid.uuid4().hex
+
+        with self._lock:
+            self._sessions[sid] = ChartSession(preset)
+
+        return sid
+
+    def create_session(
+        self,
+        symbol: str,
+        frequency: str,
+        date: Optional[str] = None,
+        chart_range: Optional[str] = None,
+        chart_size: str = "medium",
+    ) -> str:
+        frequencies = {v: k for k, v in FREQUENCY_NAMES.items()}
+        if frequency not in frequencies:
+            raise ValueError(f"invalid frequency: {frequency}")
+
+        if chart_size not in CHART_SIZES:
+            raise ValueError(f"invalid chart size: {chart_size}")
+
+        dtime = datetime.strptime(date, "%Y%m%d") if date else datetime.now()
+
+        preset = self._preset_factory(
+            dtime=dtime,
+            symbol=symbol,
+            frequency=frequencies[frequency],
+            chart_range=chart_range,
+            chart_size=CHART_SIZES[chart_size],
+        )
+
+        return self.add_session(preset)
+
+    def close_session(self, sid: str) -> None:
+        with self._lock:
+            self._sessions.pop(sid)
+
+    def has_session(self, sid: str) -> bool:
+        with self._lock:
+            return sid in self._sessions
+
+    def session(self, sid: str) -> ChartSession:
+        with self._lock:
+            return self._sessions[sid]
+
+    def _render(self, session: ChartSession, parameters: Optional[Dict[str, str]]) -> bytes:
+        with session.preset_lock():
+            session.preset().make_controller(parameters, references=session.references())
+            return session.preset().render().getvalue()
+
+    def _done(self, key: Tuple[str, int, str]) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def render(self, sid: str, parameters: Optional[Dict[str, str]] = None) -> bytes:
+        session = self.session(sid)
+
+        # a move can not slip in between reading the version and registering
+        # the render, the session lock is not held while rendering so equal
+        # requests still find the render in flight
+        with session.lock():
+            key = (sid, session.version(), json.dumps(parameters, sort_keys=True))
+
+            with self._lock:
+                future = self._inflight.get(key, None)
+                if future is None:
+                    future = self._executor.submit(self._render, session, parameters)
+                    self._inflight[key] = future
+                    future.add_done_callback(lambda _: self._done(key))
+
+        return future.result()
+
+    def inspect(
+        self,
+        sid: str,
+        x: float,
+        y: float,
+        ax: Optional[float] = None,
+        ay: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        session = self.session(sid)
+
+        with session.preset_lock():
+            info, note = session.preset().inspect(x, y, ax=ax, ay=ay)
+
+        return {"info": info, "note": note}
+
+    def _move(self, sid: str, move: Callable[[CandleSticksPreset], bool]) -> Dict[str, Any]:
+        session = self.session(sid)
+
+        with session.lock(), session.preset_lock():
+            moved = move(session.preset())
+            if moved:
+                session.moved()
+
+            return {"moved": moved, **session.window()}
+
+    def forward(self, sid: str) -> Dict[str, Any]:
+        return self._move(sid, lambda p: p.forward())
+
+    def backward(self, sid: str) -> Dict[str, Any]:
+        return self._move(sid, lambda p: p.backward())
+
+    def time_slice(
+        self, sid: str, date: str, chart_range: Optional[str] = None
+    ) -> Dict[str, Any]:
+        dtime = datetime.strptime(date, "%Y%m%d")
+
+        def move(preset: CandleSticksPreset) -> bool:
+            preset.time_slice(dtime, chart_range)
+            return True
+
+        return self._move(sid, move)
+
+    def last_quote(self, sid: str) -> Dict[str, Any]:
+        session = self.session(sid)
+
+        with session.preset_lock():
+            return session.preset().last_quote()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def _json_default(o: Any) -> Any:
+    # numpy scalars from the quotes cache
+    if hasattr(o, "item"):
+        return o.item()
+
+    return str(o)
+
+
+class ChartRequestHandler(BaseHTTPRequestHandler):
+    service: ChartService
+
+    _route = re.compile(r"^/sessions(?:/([0-9a-f]+)(?:/([a-z_]+))?)?/?$")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        if length == 0:
+            return {}
+
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("request body should be a json object")
+
+        return body
+
+    def _send(self, status: int, content: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _send_json(self, status: int, entity: Any) -> None:
+        self._send(
+            status,
+            json.dumps(entity, default=_json_default).encode("utf-8"),
+            "application/json",
+        )
+
+    def _dispatch(self, method: str) -> None:
+        m = self._route.match(self.path)
+        if m is None:
+            self._send_json(404, {"error": f"unknown path: {self.path}"})
+            return
+
+        sid, action = m.group(1), m.group(2)
+
+        if sid is not None and not self.service.has_session(sid):
+            self._send_json(404, {"error": f"unknown session: {sid}"})
+            return
+
+        try:
+            entity = self._handle(method, sid, action)
+        except KeyError as e:
+            self._send_json(400, {"error": f"missing field: {e}"})
+            return
+        except ValueError as e:
+            self._send_json(400, {"error": f"{e}"})
+            return
+        except Exception as e:
+            pretty.color_print(colors.PAPER_RED_400, f"{self.path}: {e}")
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        if entity is None:
+            self._send_json(404, {"error": f"unknown route: {method} {self.path}"})
+        elif isinstance(entity, bytes):
+            self._send(200, entity, "image/png")
+        else:
+            self._send_json(200, entity)
+
+    def _handle(
+        self, method: str, sid: Optional[str], action: Optional[str]
+    ) -> Optional[Any]:
+        body = self._body() if method == "POST" else {}
+
+        if sid is None:
+            if method != "POST":
+                return None
+
+            sid = self.service.create_session(
+                symbol=body["symbol"],
+                frequency=body.get("frequency", "d"),
+                date=body.get("date", None),
+                chart_range=body.get("range", None),
+                chart_size=body.get("size", "medium"),
+            )
+            return {"session": sid}
+
+        if action is None:
+            if method != "DELETE":
+                return None
+
+            self.service.close_session(sid)
+            return {"session": sid}
+
+        if method == "GET" and action == "last_quote":
+            return self.service.last_quote(sid)
+
+        if method != "POST":
+            return None
+
+        if action == "render":
+            return self.service.render(sid, body.get("parameters", None))
+        elif action == "inspect":
+            return self.service.inspect(
+                sid,
+                float(body["x"]),
+                float(body["y"]),
+                ax=body.get("ax", None),
+                ay=body.get("ay", None),
+            )
+        elif action == "forward":
+            return self.service.forward(sid)
+        elif action == "backward":
+            return self.service.backward(sid)
+        elif action == "time_slice":
+            return self.service.time_slice(sid, body["date"], body.get("range", None))
+
+        return None
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+
+class ChartServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        service: Optional[ChartService] = None,
+    ) -> None:
+        self._service = service if service is not None else ChartService()
+
+        handler = type(
+            "ChartRequestHandler", (ChartRequestHandler,), {"service": self._service}
+        )
+
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+
+        self._thread: Optional[threading.Thread] = None
+
+    def service(self) -> ChartService:
+        return self._service
+
+    def address(self) -> Tuple[str, int]:
+        host, port = cast(Tuple[str, int], self._server.server_address[:2])
+        return host, port
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def start(self) -> None:
+        assert self._thread is None
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self._service.shutdown()
+
+    def __enter__(self) -> "ChartServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+
+class ChartServiceError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class ChartClient:
+    def __init__(self, host: str, port: int, timeout: float = 60.0) -> None:
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+
+    def _request(
+        self, method: str, path: str, body: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bytes, str]:
+        conn = http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+        try:
+            headers = {}
+            content = None
+            if body is not None:
+                content = json.dumps(body).encode("utf-8")
+                headers["Content-Type"] = "application/json"
+
+            conn.request(method, path, body=content, headers=headers)
+            res = conn.getresponse()
+            data = res.read()
+
+            if res.status != 200:
+                raise ChartServiceError(res.status, json.loads(data).get("error", ""))
+
+            return data, res.getheader("Content-Type", "")
+
+        finally:
+            conn.close()
+
+    def _json(
+        self, method: str, path: str, body: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        data, _ = self._request(method, path, body)
+
+        entity: Dict[str, Any] = json.loads(data)
+        return entity
+
+    def create_session(
+        self,
+        symbol: str,
+        frequency: str = "d",
+        date: Optional[str] = None,
+        chart_range: Optional[str] = None,
+        chart_size: str = "medium",
+    ) -> str:
+        body = {"symbol": symbol, "frequency": frequency, "size": chart_size}
+        if date is not None:
+            body["date"] = date
+        if chart_range is not None:
+            body["range"] = chart_range
+
+        sid: str = self._json("POST", "/sessions", body)["session"]
+        return sid
+
+    def close_session(self, sid: str) -> None:
+        self._json("DELETE", f"/sessions/{sid}")
+
+    def render(self, sid: str, parameters: Optional[Dict[str, str]] = None) -> bytes:
+        data, _ = self._request(
+            "POST", f"/sessions/{sid}/render", {"parameters": parameters}
+        )
+        return data
+
+    def inspect(
+        self,
+        sid: str,
+        x: float,
+        y: float,
+        ax: Optional[float] = None,
+        ay: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        return self._json(
+            "POST", f"/sessions/{sid}/inspect", {"x": x, "y": y, "ax": ax, "ay": ay}
+        )
+
+    def forward(self, sid: str) -> Dict[str, Any]:
+        return self._json("POST", f"/sessions/{sid}/forward")
+
+    def backward(self, sid: str) -> Dict[str, Any]:
+        return self._json("POST", f"/sessions/{sid}/backward")
+
+    def time_slice(
+        self, sid: str, date: str, chart_range: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return self._json(
+            "POST", f"/sessions/{sid}/time_slice", {"date": date, "range": chart_range}
+        )
+
+    def last_quote(self, sid: str) -> Dict[str, Any]:
+        return self._json("GET", f"/sessions/{sid}/last_quote")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="serve static charts over http")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("-w", "--workers", type=int, default=4)
+
+    args = parser.parse_args()
+
+    server = ChartServer(args.host, args.port, ChartService(workers=args.workers))
+
+    host, port = server.address()
+    pretty.color_print(colors.PAPER_LIGHT_GREEN_A200, f"serving charts on {host}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,207 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fun.data.source import DAILY
+from fun.chart.server import ChartClient, ChartServer, ChartService, ChartServiceError
+from fun.utils.testing import parameterized
+
+
+class _Source:
+    def __init__(self):
+        self.reads = 0
+
+    def source_file(self, symbol):
+        return None
+
+    def read(self, start, end, symbol, frequency):
+        self.reads += 1
+
+        index = pd.date_range("2020-01-01", "2021-12-31", freq="B")
+        return pd.DataFrame({"close": np.arange(len(index), dtype=float)}, index=index)
+
+
+class _Preset:
+    source = _Source()
+
+    def __init__(self, dtime, symbol, frequency, chart_range=None, chart_size=None):
+        self._dtime = dtime
+        self._parameters = None
+        self._references = None
+        self.renders = 0
+        self.series = []
+
+    def make_controller(self, parameters, references=None):
+        self._parameters = parameters
+        self._references = references
+
+    def render(self):
+        self.renders += 1
+
+        if self._references is not None:
+            index = pd.date_range(self.stime(), self.etime(), freq="B")
+            quotes = pd.DataFrame({"close": np.zeros(len(index))}, index=index)
+
+            self.series.append(
+                self._references.series(
+                    src=self.source, symbol="vix", frequency=DAILY, quotes=quotes
+                )
+            )
+
+        time.sleep(0.2)
+
+        buf = f"{self._dtime:%Y%m%d} {sorted((self._parameters or {}).items())}"
+        return _Buffer(buf.encode("utf-8"))
+
+    def inspect(self, x, y, ax=None, ay=None):
+        return {"price": f"{y:.2f}"}, None
+
+    def forward(self):
+        self._dtime += timedelta(days=1)
+        return True
+
+    def backward(self):
+        return False
+
+    def time_slice(self, dtime, chart_range=None):
+        self._dtime = dtime
+
+    def stime(self):
+        return self._dtime - timedelta(days=30)
+
+    def etime(self):
+        return self._dtime
+
+    def last_quote(self):
+        return {"date": f"{self._dtime:%Y%m%d}", "close": 1.5}
+
+
+class _Buffer:
+    def __init__(self, content):
+        self._content = content
+
+    def getvalue(self):
+        return self._content
+
+
+class TestChartServer(unittest.TestCase):
+    def setUp(self):
+        self._server = ChartServer(service=ChartService(workers=2, preset_factory=_Preset))
+        self._server.start()
+
+        self._client = ChartClient(*self._server.address())
+        self._sid = self._client.create_session("es", "d", date="20210301")
+        self._preset = self._server.service().session(self._sid).preset()
+
+    def tearDown(self):
+        self._server.stop()
+
+    def _concurrent_renders(self, parameters):
+        results = [None] * len(parameters)
+
+        def render(i):
+            results[i] = self._client.render(self._sid, parameters[i])
+
+        threads = [threading.Thread(target=render, args=(i,)) for i in range(len(parameters))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        return results
+
+    @parameterized(
+        [
+            {"parameters": [{"Volume": "true"}] * 6, "renders": 1},
+            {"parameters": [None] * 4, "renders": 1},
+            {"parameters": [{"Volume": "true"}, {"Volume": "false"}] * 3, "renders": 2},
+        ]
+    )
+    def test_coalescing(self, parameters, renders):
+        self._preset.renders = 0
+
+        results = self._concurrent_renders(parameters)
+
+        self.assertEqual(self._preset.renders, renders)
+        for p, r in zip(parameters, results):
+            self.assertEqual(
+                r, f"20210301 {sorted((p or {}).items())}".encode("utf-8")
+            )
+
+    def test_render_after_move(self):
+        self._preset.renders = 0
+
+        first = threading.Thread(target=self._client.render, args=(self._sid,))
+        first.start()
+
+        while self._preset.renders == 0:
+            time.sleep(0.01)
+
+        # the move waits for the render in flight, the render after it can
+        # not share the one of the old window
+        self.assertTrue(self._client.forward(self._sid)["moved"])
+        self.assertTrue(self._client.render(self._sid).startswith(b"20210302"))
+
+        first.join()
+        self.assertEqual(self._preset.renders, 2)
+
+    def test_navigation(self):
+        self.assertEqual(self._client.last_quote(self._sid), {"date": "20210301", "close": 1.5})
+
+        window = self._client.forward(self._sid)
+        self.assertTrue(window["moved"])
+        self.assertEqual(window["etime"], datetime(2021, 3, 2).isoformat())
+
+        self.assertFalse(self._client.backward(self._sid)["moved"])
+
+        self._client.time_slice(self._sid, "20200115")
+        self.assertTrue(self._client.render(self._sid).startswith(b"20200115"))
+
+        self.assertEqual(
+            self._client.inspect(self._sid, 0.5, 10.0), {"info": {"price": "10.00"}, "note": None}
+        )
+
+    def test_errors(self):
+        with self.assertRaises(ChartServiceError) as e:
+            self._client.last_quote("0123abcd")
+        self.assertEqual(e.exception.status, 404)
+
+        with self.assertRaises(ChartServiceError) as e:
+            self._client.create_session("es", "x")
+        self.assertEqual(e.exception.status, 400)
+
+        with self.assertRaises(ChartServiceError) as e:
+            self._client.create_session("es", "d", chart_size="small")
+        self.assertEqual(e.exception.status, 400)
+
+        self._client.close_session(self._sid)
+
+        with self.assertRaises(ChartServiceError) as e:
+            self._client.render(self._sid)
+        self.assertEqual(e.exception.status, 404)
+
+    def test_session_references(self):
+        service = self._server.service()
+
+        other = self._client.create_session("nq", "d", date="20200601")
+        preset = service.session(other).preset()
+
+        self.assertIsNot(
+            service.session(self._sid).references(), service.session(other).references()
+        )
+
+        for sid in (self._sid, other, self._sid, other):
+            self._client.render(sid)
+
+        # renders of one session keep the window series of the other
+        self.assertIs(self._preset.series[0], self._preset.series[1])
+        self.assertIs(preset.series[0], preset.series[1])
+        self.assertEqual(len(self._preset.series[0].positions()), 21)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,41 @@
 import io
-from typing import List, Optional, Tuple, Union
+import threading
+from contextlib import nullcontext
+from typing import Callable, ContextManager, List, Optional, Tuple, Union
 
 import matplotlib
 import matplotlib.pyplot as plt
 import pandas as pd
 from fun.chart import base
-from fun.chart.base import LARGE_CHART, MEDIUM_CHART, SMALL_CHART
+from fun.chart.base import LARGE_CHART, MEDIUM_CHART
+from fun.chart.profile import RenderProfile
 from fun.chart.setting import Setting
 from fun.chart.theme import Theme
 from fun.chart.ticker import StepTicker, Ticker, TimeTicker
 from fun.plotter.plotter import Plotter
 from matplotlib import axes, figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 matplotlib.use("agg")
 
+DPI = 100
+
+# figures are kept out of pyplot, but matplotlib still shares its mathtext
+# parser and font caches between them, so drawing is done by one thread at
+# a time
+_DRAW_LOCK = threading.Lock()
+
+
+def figure_size(
+    chart_size: base.CHART_SIZE, figsize: Tuple[float, float] = (16.0, 9.0)
+) -> Tuple[float, float]:
+    if chart_size == MEDIUM_CHART:
+        return (figsize[0] * 1.2, figsize[1] * 1.2)
+    elif chart_size == LARGE_CHART:
+        return (figsize[0] * 2.0, figsize[1] * 2.0)
+
+    return (figsize[0] * 1.0, figsize[1] * 1.0)
+
 
 class TradingChart(base.ChartFactory):
     def __init__(
@@ -23,22 +45,16 @@ class TradingChart(base.ChartFactory):
         scale: str = "log",
         setting: Setting = Setting(chart_size=LARGE_CHART),
         figsize: Tuple[float, float] = (16.0, 9.0),
+        quotes_range: Optional[Tuple[float, float]] = None,
     ) -> None:
 
         assert quotes is not None
         assert setting is not None
         assert setting.chart_size() in (LARGE_CHART, MEDIUM_CHART)
 
-        super().__init__(quotes)
-
-        if setting.chart_size() == SMALL_CHART:
-            self._figsize = (figsize[0] * 1.0, figsize[1] * 1.0)
-        elif setting.chart_size() == MEDIUM_CHART:
-            self._figsize = (figsize[0] * 1.2, figsize[1] * 1.2)
-        elif setting.chart_size() == LARGE_CHART:
-            self._figsize = (figsize[0] * 2.0, figsize[1] * 2.0)
+        super().__init__(quotes, quotes_range=quotes_range)
 
-        assert self._figsize is not None
+        self._figsize = figure_size(setting.chart_size(), figsize)
 
         self._theme = theme
         self._scale = scale
@@ -48,6 +64,8 @@ class TradingChart(base.ChartFactory):
         self._figure: Optional[figure.Figure] = None
         self._ax: Optional[axes.Axes] = None
 
+        self._profile: Optional[RenderProfile] = None
+
     def _setup_xticks(self, ax: axes.Axes, ticker: Ticker) -> None:
         loc, labels = ticker.ticks()
         ax.set_xticks(loc)
@@ -88,6 +106,35 @@ class TradingChart(base.ChartFactory):
 
         ax.yaxis.tick_right()
 
+    def _new_figure(self, interactive: bool) -> Tuple[figure.Figure, axes.Axes]:
+        if interactive:
+            return plt.subplots(
+                figsize=self._figsize,
+                facecolor=self._theme.get_color("background"),
+                tight_layout=False,
+            )
+
+        # kept out of pyplot, whose figure registry is global
+        fig = figure.Figure(
+            figsize=self._figsize,
+            facecolor=self._theme.get_color("background"),
+            tight_layout=False,
+        )
+        FigureCanvasAgg(fig)
+
+        ax: axes.Axes = fig.add_subplot()
+
+        return fig, ax
+
+    def _measure(self, phase: str) -> ContextManager[None]:
+        if self._profile is None:
+            return nullcontext()
+
+        return self._profile.measure(phase)
+
+    def profile(self) -> Optional[RenderProfile]:
+        return self._profile
+
     def to_data_coordinates(self, x: float, y: float) -> Optional[Tuple[float, float]]:
         if self._figure is None or self._ax is None:
             return None
@@ -102,24 +149,22 @@ class TradingChart(base.ChartFactory):
 
         return (nx, ny)
 
-    def render(
+    def _draw(
         self,
-        output: Optional[Union[str, io.BytesIO]] = None,
-        plotters: Optional[List[Plotter]] = None,
-        interactive: bool = False,
+        output: Optional[Union[str, io.BytesIO]],
+        plotters: Optional[List[Plotter]],
+        interactive: bool,
     ) -> None:
+        with self._measure("figure"):
+            fig, ax = self._new_figure(interactive)
 
-        fig, ax = plt.subplots(
-            figsize=self._figsize,
-            facecolor=self._theme.get_color("background"),
-            tight_layout=False,
-        )
+            ax.set_yscale(self._scale)
 
-        ax.set_yscale(self._scale)
+            self._setup_general(fig, ax)
 
-        self._setup_general(fig, ax)
-        self._setup_xticks(ax, TimeTicker(self._quotes))
-        self._setup_yticks(ax, StepTicker(*self.chart_yrange()))
+        with self._measure("ticks"):
+            self._setup_xticks(ax, TimeTicker(self._quotes))
+            self._setup_yticks(ax, StepTicker(*self.chart_yrange()))
 
         self._figure = fig
         self._ax = ax
@@ -129,20 +174,44 @@ class TradingChart(base.ChartFactory):
 
         if plotters is not None and len(plotters) > 0:
             for p in plotters:
-                p.plot(ax)
+                with self._measure(f"plot:{type(p).__name__}"):
+                    p.plot(ax)
 
-        ax.autoscale_view()
+        with self._measure("tight_layout"):
+            ax.autoscale_view()
 
-        plt.tight_layout()
+            fig.tight_layout()
 
         if interactive:
             plt.show()
+            plt.close(fig)
         else:
             assert output is not None
-            plt.savefig(
-                output,
-                dpi=100,
-                facecolor=self._theme.get_color("background"),
-            )
+            with self._measure("savefig"):
+                fig.savefig(
+                    output,
+                    dpi=DPI,
+                    facecolor=self._theme.get_color("background"),
+                )
+
+    def render(
+        self,
+        output: Optional[Union[str, io.BytesIO]] = None,
+        plotters: Optional[List[Plotter]] = None,
+        interactive: bool = False,
+        profile: Union[bool, RenderProfile] = False,
+        profile_callback: Optional[Callable[[RenderProfile], None]] = None,
+    ) -> None:
+
+        if isinstance(profile, RenderProfile):
+            self._profile = profile
+        elif profile or profile_callback is not None:
+            self._profile = RenderProfile()
+        else:
+            self._profile = None
+
+        with _DRAW_LOCK:
+            self._draw(output, plotters, interactive)
 
-        plt.close(fig)
+        if self._profile is not None and profile_callback is not None:
+            profile_callback(self._profile)
@@ -1,10 +1,17 @@
 import io
+import threading
 import unittest
 from datetime import datetime
 
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from fun.chart.profile import RenderProfile
 from fun.chart.static import TradingChart
 from fun.data.source import DAILY, WEEKLY
 from fun.futures.continuous import ContinuousContract
+from fun.plotter.candlesticks import CandleSticks
 from fun.utils.testing import parameterized
 
 
@@ -121,6 +128,93 @@ class TestStaticTradingChart(unittest.TestCase):
 
             self.assertTrue(original.eq(df).all(axis=1).all())
 
+    @staticmethod
+    def _quotes():
+        index = pd.date_range("2019-01-01", periods=120, freq="B")
+        close = 100.0 + np.cumsum(np.random.default_rng(0).normal(size=len(index)))
+
+        return pd.DataFrame(
+            {
+                "open": close - 0.5,
+                "high": close + 1.0,
+                "low": close - 1.0,
+                "close": close,
+                "volume": np.full(len(index), 1000.0),
+            },
+            index=index,
+        )
+
+    @staticmethod
+    def _candlesticks(df):
+        return CandleSticks(
+            quotes=df,
+            shadow_width=1.0,
+            body_width=4.0,
+            color_up="g",
+            color_down="r",
+            color_unchanged="w",
+        )
+
+    def test_render_profile(self):
+        df = self._quotes()
+
+        chart = TradingChart(quotes=df)
+
+        candlesticks = self._candlesticks(df)
+
+        self.assertIsNone(chart.profile())
+
+        chart.render(io.BytesIO(), plotters=[candlesticks])
+        self.assertIsNone(chart.profile())
+
+        reports = []
+        chart.render(
+            io.BytesIO(),
+            plotters=[candlesticks],
+            profile_callback=reports.append,
+        )
+
+        profile = chart.profile()
+        self.assertIsInstance(profile, RenderProfile)
+        self.assertEqual(reports, [profile])
+
+        self.assertEqual(
+            [t.phase() for t in profile.timings()],
+            ["figure", "ticks", "plot:CandleSticks", "tight_layout", "savefig"],
+        )
+
+        for t in profile.timings():
+            self.assertGreaterEqual(t.wall_time(), 0.0)
+            self.assertGreaterEqual(t.cpu_time(), 0.0)
+
+        self.assertEqual(len(profile.to_entity()), 5)
+
+    def test_concurrent_render(self):
+        df = self._quotes()
+
+        def render():
+            buf = io.BytesIO()
+            TradingChart(quotes=df).render(buf, plotters=[self._candlesticks(df)])
+            return buf.getvalue()
+
+        expected = render()
+
+        results = [b""] * 8
+
+        def run(i):
+            results[i] = render()
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(results))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, [expected] * len(results))
+
+        # charts are never registered with pyplot
+        self.assertEqual(plt.get_fignums(), [])
+
 
 if __name__ == "__main__":
     unittest.main()
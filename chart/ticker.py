@@ -35,48 +35,49 @@ class TimeTicker(Ticker):
 
         assert frequency is not None
 
-        loc: List[float] = []
-        labels: List[str] = []
+        index = self._quotes.index
 
-        if frequency == DAILY:
-            dates = self._quotes.index.strftime("%Y-%b")
-            labels = np.unique(dates)
-            loc = [np.argwhere(dates == l).min() for l in labels]
-
-        elif frequency == WEEKLY:
-            dates = self._quotes.index.strftime("%Y-%b")
-            labels = np.unique(dates)
-            loc = [np.argwhere(dates == l).min() for l in labels]
+        loc: np.ndarray
 
-            func = np.vectorize(
-                lambda x: x.split("-")[0] if "Jan" in x else x.split("-")[1]
+        if frequency in (DAILY, WEEKLY):
+            loc = self._boundaries(
+                (index.year.to_numpy() * 12) + index.month.to_numpy()
             )
-            labels = func(labels)
 
         elif frequency == MONTHLY:
-            dates = self._quotes.index.strftime("%Y")
-            labels = np.unique(dates)
-            loc = [np.argwhere(dates == l).min() for l in labels]
+            loc = self._boundaries(index.year.to_numpy())
 
         elif frequency == HOURLY:
-            pattern = "%y-%m-%d\n%H:%M"
-            dates = self._quotes.index.strftime(pattern)
-
-            labels = self._quotes.index[
-                (self._quotes.index.hour == 17)
-                | (self._quotes.index.hour == 6)
-                | (self._quotes.index.hour == 0)
-                | (self._quotes.index.hour == 11)
-            ].strftime(pattern)
-            loc = [np.argwhere(dates == l).min() for l in labels]
+            loc = np.flatnonzero(np.isin(index.hour.to_numpy(), (17, 6, 0, 11)))
 
         else:
             raise NotImplementedError
 
-        aloc = np.array(loc)
-        condition = aloc >= 4
+        loc = loc[loc >= 4]
+        dates = index[loc]
+
+        labels: np.ndarray
+
+        if frequency == DAILY:
+            labels = dates.strftime("%Y-%b").to_numpy()
+
+        elif frequency == WEEKLY:
+            labels = np.where(
+                dates.month == 1,
+                dates.strftime("%Y").to_numpy(),
+                dates.strftime("%b").to_numpy(),
+            )
+
+        elif frequency == MONTHLY:
+            labels = dates.strftime("%Y").to_numpy()
+
+        else:
+            labels = dates.strftime("%y-%m-%d\n%H:%M").to_numpy()
+
+        return loc, labels
 
-        return np.extract(condition, aloc), np.extract(condition, labels)
+    def _boundaries(self, keys: np.ndarray) -> np.ndarray:
+        return np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
 
 
 class StepTicker(Ticker):
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fun.chart.ticker import TimeTicker
+from fun.utils.testing import parameterized
+
+
+def _string_ticks(index: pd.DatetimeIndex, pattern: str):
+    dates = index.strftime(pattern)
+    labels = np.unique(dates)
+    loc = np.array([np.argwhere(dates == l).min() for l in labels])
+
+    condition = loc >= 4
+
+    return np.extract(condition, loc), np.extract(condition, labels)
+
+
+class TestTimeTicker(unittest.TestCase):
+    @parameterized(
+        [
+            {"start": "2019-01-01", "periods": 250, "freq": "B", "pattern": "%Y-%b"},
+            {"start": "2019-01-03", "periods": 30, "freq": "B", "pattern": "%Y-%b"},
+            {"start": "1990-01-01", "periods": 360, "freq": "MS", "pattern": "%Y"},
+            {"start": "1990-03-01", "periods": 240, "freq": "MS", "pattern": "%Y"},
+        ]
+    )
+    def test_boundary_ticks(self, start, periods, freq, pattern):
+        index = pd.date_range(start, periods=periods, freq=freq)
+        quotes = pd.DataFrame({"close": np.arange(periods)}, index=index)
+
+        loc, labels = TimeTicker(quotes).ticks()
+        expected_loc, expected_labels = _string_ticks(index, pattern)
+
+        order = np.argsort(expected_loc)
+
+        self.assertTrue(np.array_equal(loc, expected_loc[order]))
+        self.assertTrue(np.array_equal(labels, expected_labels[order]))
+
+    def test_weekly_ticks(self):
+        index = pd.date_range("2016-01-04", periods=200, freq="W-MON")
+        quotes = pd.DataFrame({"close": np.arange(200)}, index=index)
+
+        loc, labels = TimeTicker(quotes).ticks()
+
+        expected_loc, expected_labels = _string_ticks(index, "%Y-%b")
+        order = np.argsort(expected_loc)
+
+        self.assertTrue(np.array_equal(loc, expected_loc[order]))
+
+        for l, e in zip(labels, expected_labels[order]):
+            year, month = e.split("-")
+            self.assertEqual(l, year if month == "Jan" else month)
+
+    def test_hourly_ticks(self):
+        index = pd.date_range("2020-03-02", periods=24 * 8, freq="h")
+        quotes = pd.DataFrame({"close": np.arange(len(index))}, index=index)
+
+        loc, labels = TimeTicker(quotes).ticks()
+
+        expected = [
+            i
+            for i, d in enumerate(index)
+            if d.hour in (17, 6, 0, 11) and i >= 4
+        ]
+
+        self.assertTrue(np.array_equal(loc, expected))
+        self.assertTrue(
+            np.array_equal(labels, index[expected].strftime("%y-%m-%d\n%H:%M"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import os
 import re
 from datetime import datetime, timedelta
+from typing import Optional
 
 import pandas as pd
 from fun.data.source import DAILY, DataSource, FREQUENCY, HOURLY, MONTHLY, WEEKLY
@@ -61,6 +62,9 @@ class BarchartOnDemand(DataSource):
         else:
             raise ValueError(f"invalid frequency: {freq}")
 
+    def source_file(self, symbol: str) -> Optional[str]:
+        return None
+
     def _read_data(self, start: datetime, end: datetime, symbol: str) -> pd.DataFrame:
 
         df = pd.read_csv(self._datafeed(self._url(start, end, symbol, DAILY)))
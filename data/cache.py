@@ -0,0 +1,73 @@
+import os
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+from fun.data.source import FREQUENCY, DataSource
+
+T = TypeVar("T")
+
+
+class _Entry(Generic[T]):
+    def __init__(self, value: T, mtime: Optional[float]) -> None:
+        self._value = value
+
+        self._mtime = mtime
+        self._loaded = time.time()
+
+    def value(self) -> T:
+        return self._value
+
+    def mtime(self) -> Optional[float]:
+        return self._mtime
+
+    def loaded(self) -> float:
+        return self._loaded
+
+    def touch(self) -> None:
+        self._loaded = time.time()
+
+
+class SourceCache(Generic[T]):
+    def __init__(
+        self,
+        load: Callable[[DataSource, str, FREQUENCY], T],
+        ttl: timedelta = timedelta(minutes=5),
+    ) -> None:
+        # whatever load builds from a source is kept by source, symbol and
+        # frequency, within ttl it is used as is and after that for as long
+        # as the source file keeps its mtime
+        self._load = load
+        self._ttl = ttl.total_seconds()
+
+        self._entries: Dict[Tuple[str, str, FREQUENCY], _Entry[T]] = {}
+
+    def _mtime(self, src: DataSource, symbol: str) -> Optional[float]:
+        path = src.source_file(symbol)
+        if path is None:
+            return None
+
+        return os.path.getmtime(path)
+
+    def get(self, src: DataSource, symbol: str, frequency: FREQUENCY) -> T:
+        key = (type(src).__name__, symbol, frequency)
+
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            if time.time() - entry.loaded() < self._ttl:
+                return entry.value()
+
+            mtime = self._mtime(src, symbol)
+            if mtime is not None and mtime == entry.mtime():
+                entry.touch()
+                return entry.value()
+
+        mtime = self._mtime(src, symbol)
+
+        entry = _Entry(self._load(src, symbol, frequency), mtime)
+        self._entries[key] = entry
+
+        return entry.value()
+
+    def clear(self) -> None:
+        self._entries = {}
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from datetime import timedelta
+
+from fun.data.cache import SourceCache
+from fun.data.source import DAILY
+from fun.utils.testing import parameterized
+
+
+class _Source:
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def source_file(self, symbol):
+        return self._path
+
+
+class TestSourceCache(unittest.TestCase):
+    def setUp(self):
+        handle, self._path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self._path)
+
+    @parameterized(
+        [
+            {"ttl": timedelta(minutes=5), "modified": False, "loads": 1},
+            {"ttl": timedelta(minutes=5), "modified": True, "loads": 1},
+            {"ttl": timedelta(seconds=0), "modified": False, "loads": 1},
+            {"ttl": timedelta(seconds=0), "modified": True, "loads": 2},
+        ]
+    )
+    def test_invalidation(self, ttl, modified, loads):
+        loaded = []
+
+        def load(src, symbol, frequency):
+            loaded.append((symbol, frequency))
+            return object()
+
+        src = _Source(self._path)
+        cache = SourceCache(load, ttl=ttl)
+
+        first = cache.get(src, "spx", DAILY)
+
+        if modified:
+            mtime = os.path.getmtime(self._path)
+            os.utime(self._path, (mtime + 10, mtime + 10))
+
+        second = cache.get(src, "spx", DAILY)
+
+        self.assertEqual(loaded, [("spx", DAILY)] * loads)
+        self.assertEqual(first is second, loads == 1)
+
+    def test_no_source_file(self):
+        # without a file to check, an entry is loaded again once ttl passes
+        src = _Source(None)
+        cache = SourceCache(lambda *_: object(), ttl=timedelta(seconds=0))
+
+        self.assertIsNot(cache.get(src, "spx", DAILY), cache.get(src, "spx", DAILY))
+
+        cache = SourceCache(lambda *_: object())
+
+        first = cache.get(src, "spx", DAILY)
+        self.assertIs(cache.get(src, "spx", DAILY), first)
+
+        cache.clear()
+        self.assertIsNot(cache.get(src, "spx", DAILY), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
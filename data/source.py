@@ -3,7 +3,7 @@ import os
 import re
 from abc import ABCMeta, abstractmethod
 from datetime import datetime, timedelta
-from typing import NewType
+from typing import NewType, Optional
 
 import numpy as np
 import pandas as pd
@@ -90,6 +90,10 @@ class DataSource(metaclass=ABCMeta):
 
         return path
 
+    def source_file(self, symbol: str) -> Optional[str]:
+        now = datetime.now()
+        return self._localfile(self._url(now, now, symbol, DAILY))
+
     def _preload(self, freq: FREQUENCY) -> timedelta:
         preload = 30
 
@@ -204,6 +208,9 @@ class AlphaVantage(DataSource):
         else:
             raise ValueError(f"invalid frequency: {freq}")
 
+    def source_file(self, symbol: str) -> Optional[str]:
+        return None
+
     def _read_data(self, start: datetime, end: datetime, symbol: str) -> pd.DataFrame:
         df = pd.read_csv(self._datafeed(self._url(start, end, symbol, DAILY)))
         return df
@@ -373,6 +380,9 @@ class CoinAPI(DataSource):
     ) -> str:
         raise NotImplementedError()
 
+    def source_file(self, symbol: str) -> Optional[str]:
+        return self._localfile(os.path.join("coinapi", symbol))
+
     def _read_data(self, start: datetime, end: datetime, symbol: str) -> pd.DataFrame:
 
         root = self._localfile(os.path.join("coinapi", symbol))
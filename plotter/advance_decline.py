@@ -1,9 +1,10 @@
-from datetime import datetime
+from typing import Optional
 
 import pandas as pd
 from fun.data.cumulative import BarchartCumulativeSum
 from fun.data.source import FREQUENCY
 from fun.plotter.plotter import LinePlotter
+from fun.plotter.reference import ReferenceSeriesRegistry
 from fun.utils import colors
 from matplotlib import axes
 
@@ -36,6 +37,7 @@ class AdvanceDeclineLine(AdvanceDeclineSource, LinePlotter):
             line_color: str = colors.PAPER_AMBER_A100,
             line_alpha: float = 0.5,
             line_width: float = 2.5,
+            references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
 
         AdvanceDeclineSource.__init__(self, symbol=symbol, volume_diff=volume_diff)
@@ -50,38 +52,37 @@ class AdvanceDeclineLine(AdvanceDeclineSource, LinePlotter):
 
         self._height_ratio = height_ratio
 
+        self._ad = None
         if self._ad_symbol is not None and self._src is not None:
-            self._ad_quotes = self._src.read(
-                    start=datetime.strptime("19000101", "%Y%m%d"),
-                    end=datetime.now(),
+            if references is None:
+                references = ReferenceSeriesRegistry()
+
+            self._ad = references.series(
+                    src=self._src,
                     symbol=self._ad_symbol,
                     frequency=self._frequency,
-            ).loc[self._quotes.index[0]: self._quotes.index[-1]]
+                    quotes=self._quotes,
+            )
 
     def plot(self, ax: axes.Axes) -> None:
-        if self._ad_symbol is None or self._ad_quotes is None:
+        if self._ad is None or self._ad.empty():
             return
 
         mn, mx = ax.get_ylim()
 
         top = ((mx - mn) * self._height_ratio) + mn
 
-        rs_max = self._ad_quotes.loc[:, "close"].max()
-        rs_min = self._ad_quotes.loc[:, "close"].min()
+        ad = self._ad.values("close")
 
-        self._ad_quotes.loc[:, "close"] -= rs_min
-        self._ad_quotes.loc[:, "close"] /= rs_max - rs_min
+        rs_max = ad.max()
+        rs_min = ad.min()
 
-        self._ad_quotes.loc[:, "close"] *= top - mn
-        self._ad_quotes.loc[:, "close"] += mn
+        ad = (ad - rs_min) / (rs_max - rs_min)
+        ad = ad * (top - mn) + mn
 
         ax.plot(
-                [
-                    i
-                    for i, d in enumerate(self._quotes.index)
-                    if d in self._ad_quotes.index
-                ],
-                self._ad_quotes.loc[[d for d in self._ad_quotes.index if d in self._quotes.index], "close"],
+                self._ad.positions(),
+                ad,
                 color=self._line_color,
                 alpha=self._line_alpha,
                 linewidth=self._line_width,
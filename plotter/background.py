@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 from fun.data.source import DAILY, FREQUENCY, MONTHLY, WEEKLY, HOURLY
 from fun.plotter.plotter import Plotter
-from matplotlib import axes
+from matplotlib import axes, patches
+from matplotlib.collections import PatchCollection
 
 
 class BackgroundTimeRangeMark(Plotter):
@@ -28,77 +30,48 @@ class BackgroundTimeRangeMark(Plotter):
             self._daily_range(ax)
 
     def _time_range(self, ax: axes.Axes, range_type: str) -> None:
-        anchor_x = 0
-
         assert range_type in ("d", "m", "y")
 
-        if range_type == "m":
-            current = self._quotes.index[0].to_pydatetime().month
-        elif range_type == "y":
-            current = self._quotes.index[0].to_pydatetime().year
-        # elif range_type == "d":
-        # current = self._quotes.index[0].to_pydatetime().day
-        # current = 16
+        length = len(self._quotes)
+        if length == 0:
+            return
 
-        plotting = self._from_start
-
-        mn, mx = ax.get_ylim()
+        index = self._quotes.index
 
-        for i, x in enumerate(self._quotes.index):
-
-            if range_type == "m":
-                cursor = x.to_pydatetime().month
-            elif range_type == "y":
-                cursor = x.to_pydatetime().year
-            elif range_type == "d":
-                cursor = x.to_pydatetime().hour
+        # every toggle starts a new segment, segments alternate between marked
+        # and unmarked starting from self._from_start
+        if range_type == "m":
+            toggles = np.flatnonzero(np.diff(index.month.to_numpy())) + 1
+        elif range_type == "y":
+            toggles = np.flatnonzero(np.diff(index.year.to_numpy())) + 1
+        elif range_type == "d":
+            toggles = np.flatnonzero(index.hour.to_numpy() == 17)
 
-            if range_type in ("m", "y"):
-                if cursor != current:
-                    plotting = not plotting
-                    current = cursor
+        starts = np.concatenate(([0], toggles))
+        ends = np.concatenate((toggles, [length - 1]))
 
-                    if plotting is False:
-                        ax.bar(
-                            anchor_x,
-                            width=i - anchor_x,
-                            bottom=mn,
-                            height=mx - mn,
-                            align="edge",
-                            color=self._color,
-                            alpha=self._alpha,
-                        )
-                    else:
-                        anchor_x = i
+        widths = ends - starts
+        if range_type == "d":
+            # session marks stop one bar before the next 17:00 bar
+            widths[:-1] -= 1
 
-            else:
-                if cursor == 17:
-                    plotting = not plotting
+        marked = (np.arange(len(starts)) % 2 == 0) == self._from_start
+        if not marked.any():
+            return
 
-                    if plotting is False:
-                        ax.bar(
-                            anchor_x,
-                            width=i - 1 - anchor_x,
-                            # width=i - anchor_x,
-                            bottom=mn,
-                            height=mx - mn,
-                            align="edge",
-                            color=self._color,
-                            alpha=self._alpha,
-                        )
-                    else:
-                        anchor_x = i
+        mn, mx = ax.get_ylim()
 
-        if plotting is True:
-            ax.bar(
-                anchor_x,
-                width=(len(self._quotes) - 1) - anchor_x,
-                bottom=mn,
-                height=mx - mn,
-                align="edge",
-                color=self._color,
+        ax.add_collection(
+            PatchCollection(
+                [
+                    patches.Rectangle(xy=(s, mn), width=w, height=mx - mn)
+                    for s, w in zip(starts[marked], widths[marked])
+                ],
+                facecolor=self._color,
+                edgecolor="none",
                 alpha=self._alpha,
             )
+        )
 
     def _daily_range(self, ax: axes.Axes) -> None:
         self._time_range(ax, "d")
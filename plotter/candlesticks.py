@@ -1,6 +1,8 @@
+from typing import Optional, Tuple
+
 import numpy as np
 import pandas as pd
-from fun.plotter.plotter import Plotter
+from fun.plotter.plotter import Plotter, quotes_range
 from matplotlib import axes, patches
 from matplotlib.collections import PatchCollection
 
@@ -14,8 +16,10 @@ class CandleSticks(Plotter):
             color_up: str,
             color_down: str,
             color_unchanged: str,
+            quotes_range: Optional[Tuple[float, float]] = None,
     ):
         self._quotes = quotes
+        self._quotes_range = quotes_range
         self._shadow_width = shadow_width
         self._body_width = body_width
 
@@ -27,8 +31,11 @@ class CandleSticks(Plotter):
 
     def _minimum_height(self) -> float:
         ratio = 0.001
-        mn = np.amin(self._quotes.loc[:, "low"])
-        mx = np.amax(self._quotes.loc[:, "high"])
+        mn, mx = (
+            self._quotes_range
+            if self._quotes_range is not None
+            else quotes_range(self._quotes)
+        )
         r = mx - mn
 
         return r * ratio
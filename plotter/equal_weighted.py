@@ -1,9 +1,10 @@
-from datetime import datetime
+from typing import Optional
 
 import pandas as pd
 from fun.data.barchart import Barchart
 from fun.data.source import FREQUENCY, Yahoo
 from fun.plotter.plotter import LinePlotter
+from fun.plotter.reference import ReferenceSeriesRegistry
 from fun.utils import colors
 from matplotlib import axes
 
@@ -37,6 +38,7 @@ class EqualWeightedRelativeStrength(EqualWeightedSource, LinePlotter):
         line_color: str = colors.PAPER_LIGHT_GREEN_A100,
         line_alpha: float = 0.5,
         line_width: float = 2.5,
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
 
         EqualWeightedSource.__init__(self, symbol=symbol)
@@ -51,16 +53,20 @@ class EqualWeightedRelativeStrength(EqualWeightedSource, LinePlotter):
 
         self._height_ratio = height_ratio
 
+        self._ew = None
         if self._ew_symbol is not None and self._src is not None:
-            self._ew_quotes = self._src.read(
-                start=datetime.strptime("19000101", "%Y%m%d"),
-                end=datetime.now(),
+            if references is None:
+                references = ReferenceSeriesRegistry()
+
+            self._ew = references.series(
+                src=self._src,
                 symbol=self._ew_symbol,
                 frequency=self._frequency,
-            ).loc[self._quotes.index[0] : self._quotes.index[-1]]
+                quotes=self._quotes,
+            )
 
     def plot(self, ax: axes.Axes) -> None:
-        if self._ew_symbol is None or self._ew_quotes is None:
+        if self._ew is None or self._ew.empty():
             return
 
         mn, mx = ax.get_ylim()
@@ -68,21 +74,18 @@ class EqualWeightedRelativeStrength(EqualWeightedSource, LinePlotter):
         top = ((mx - mn) * self._height_ratio) + mn
 
         rs = (
-            self._ew_quotes.loc[:, "close"]
-            / self._quotes.loc[self._ew_quotes.index, "close"]
+            self._ew.values("close")
+            / self._quotes.loc[:, "close"].to_numpy()[self._ew.positions()]
         )
 
         rs_max = rs.max()
         rs_min = rs.min()
 
-        rs -= rs_min
-        rs /= rs_max - rs_min
-
-        rs *= top - mn
-        rs += mn
+        rs = (rs - rs_min) / (rs_max - rs_min)
+        rs = rs * (top - mn) + mn
 
         ax.plot(
-            [i for i, d in enumerate(self._quotes.index) if d in self._ew_quotes.index],
+            self._ew.positions(),
             rs,
             color=self._line_color,
             alpha=self._line_alpha,
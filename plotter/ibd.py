@@ -1,10 +1,11 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, NewType, Optional
+from typing import List, NewType, Optional, Tuple
 
 import numpy as np
 import pandas as pd
-from fun.data.source import DAILY, FREQUENCY, Yahoo
-from fun.plotter.plotter import TextPlotter
+from fun.data.cache import SourceCache
+from fun.data.source import DAILY, FREQUENCY, DataSource, Yahoo
+from fun.plotter.plotter import TextPlotter, quotes_range
 from fun.utils import colors, pretty
 from matplotlib import axes, font_manager as fm
 
@@ -14,20 +15,54 @@ DISTRIBUTION = DAY_ACTION(1)
 NEUTRAL = DAY_ACTION(2)
 
 
-class DistributionsDay(TextPlotter):
-    _dataframes = None
+class DayActions:
+    def __init__(self, quotes: pd.DataFrame) -> None:
+        self._index = quotes.index
+
+        close = quotes.loc[:, "close"].to_numpy(dtype=float)
+        volume = quotes.loc[:, "volume"].to_numpy(dtype=float)
+
+        valid = (close[1:] > 0) & (close[:-1] > 0) & (volume[1:] > 0) & (volume[:-1] > 0)
+
+        self._move = np.full(len(close), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self._move[1:] = np.where(
+                valid, ((close[1:] - close[:-1]) / close[:-1]) * 100.0, np.nan
+            )
+
+        self._volume_increase = np.zeros(len(volume), dtype=bool)
+        self._volume_increase[1:] = valid & (volume[1:] > volume[:-1])
+
+    def index(self) -> pd.DatetimeIndex:
+        return self._index
+
+    def move(self) -> np.ndarray:
+        return self._move
+
+    def volume_increase(self) -> np.ndarray:
+        return self._volume_increase
+
 
-    @classmethod
-    def _get_dataframes(cls) -> Optional[Dict[str, pd.DataFrame]]:
-        return cls._dataframes
+class DayActionsCache(SourceCache[DayActions]):
+    def __init__(self, ttl: timedelta = timedelta(minutes=5)) -> None:
+        super().__init__(self._read, ttl=ttl)
 
-    @classmethod
-    def _init_dataframes(cls) -> None:
-        cls._dataframes = {}
+    @staticmethod
+    def _read(src: DataSource, symbol: str, frequency: FREQUENCY) -> DayActions:
+        pretty.color_print(colors.PAPER_AMBER_300, f"reading {symbol.upper()}")
 
-    @classmethod
-    def _add_dataframe(cls, key: str, dataframe: pd.DataFrame) -> None:
-        cls._dataframes[key] = dataframe
+        return DayActions(
+            src.read(
+                start=datetime.strptime("19000101", "%Y%m%d"),
+                end=datetime.utcnow() + timedelta(days=2),
+                symbol=symbol,
+                frequency=frequency,
+            )
+        )
+
+
+class DistributionsDay(TextPlotter):
+    _cache = DayActionsCache()
 
     def __init__(
             self,
@@ -45,19 +80,24 @@ class DistributionsDay(TextPlotter):
             font_src: Optional[str] = None,
             font_properties: Optional[fm.FontProperties] = None,
             info_font_properties: Optional[fm.FontProperties] = None,
+            quotes_range: Optional[Tuple[float, float]] = None,
+            tail_quotes_range: Optional[Tuple[float, float]] = None,
     ) -> None:
         assert quotes is not None
 
         super().__init__(
-                font_color=font_color,
-                font_size=font_size,
-                font_src=font_src,
-                font_properties=font_properties,
+            font_color=font_color,
+            font_size=font_size,
+            font_src=font_src,
+            font_properties=font_properties,
         )
 
         self._quotes = quotes
         self._frequency = frequency
 
+        self._quotes_range = quotes_range
+        self._tail_quotes_range = tail_quotes_range
+
         self._reference_symbols = reference_symbols
 
         self._distribution_threshold = distribution_threshold
@@ -75,154 +115,124 @@ class DistributionsDay(TextPlotter):
         self._days_pass_invalid_threshold = days_pass_invalid_threshold
         self._distribution_invalid_threshold = distribution_invalid_threshold
 
-        src = Yahoo()
+        self._src: DataSource = Yahoo()
 
-        if self._get_dataframes() is None or (
-                self._get_dataframes() is not None and len(self._get_dataframes().keys()) == 0):
+        self._actions = {
+            symbol: self._cache.get(self._src, symbol, self._frequency)
+            for symbol in self._reference_symbols
+        }
 
-            print("init dataframes")
+    def _distributions(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        keys = list(self._actions.keys())
 
-            if self._get_dataframes() is None:
-                self._init_dataframes()
+        distributions = np.zeros((len(keys), len(self._quotes.index)), dtype=bool)
 
-            for symbol in self._reference_symbols:
-                self._add_dataframe(
-                        symbol,
-                        src.read(
-                                start=datetime.strptime("19000101", "%Y%m%d"),
-                                end=datetime.utcnow() + timedelta(days=2),
-                                symbol=symbol,
-                                frequency=self._frequency,
-                        ).loc[self._quotes.index[0]: self._quotes.index[-1]],
-                )
+        for i, key in enumerate(keys):
+            actions = self._actions[key]
 
-    def plot(self, ax: axes.Axes) -> None:
-        if self._frequency != DAILY:
-            return
+            rows = actions.index().get_indexer(self._quotes.index)
+            found = rows >= 0
 
-        assert ax is not None
-        assert self._get_dataframes() is not None
-
-        counts = {}
-
-        for x in range(len(self._quotes.index)):
-            if x == 0:
-                continue
-
-            labels = []
-            action = NEUTRAL
-            color = self._invalid_distribution_color
-            for key, quotes in self._get_dataframes().items():
-                index = self._quotes.index[x]
-                if index not in quotes.index:
-                    pretty.color_print(
-                            colors.PAPER_AMBER_300, f"skip {index} in {key}",
-                    )
-                    continue
-
-                current_close = quotes.loc[index, "close"]
-                current_volume = quotes.loc[index, "volume"]
-
-                index = self._quotes.index[x - 1]
-                if index not in quotes.index:
-                    pretty.color_print(
-                            colors.PAPER_AMBER_300, f"skip {index} in {key}",
-                    )
-                    continue
-
-                previous_close = quotes.loc[index, "close"]
-                previous_volume = quotes.loc[index, "volume"]
+            missing = len(rows) - np.count_nonzero(found)
+            if missing > 0:
+                pretty.color_print(
+                    colors.PAPER_AMBER_300, f"skip {missing} quotes in {key}",
+                )
 
-                if current_close <= 0 or previous_close <= 0:
-                    continue
+            rows = rows[found]
 
-                if current_volume <= 0 or previous_volume <= 0:
-                    continue
+            # comparisons against nan are false, so invalid sessions never count
+            distributions[i, found] = (
+                actions.move()[rows] < self._distribution_threshold
+            ) & actions.volume_increase()[rows]
 
-                move = ((current_close - previous_close) / previous_close) * 100.0
+        days = (self._quotes.index[-1] - self._quotes.index).days.to_numpy()
+        recent = days < self._days_pass_invalid_threshold
 
-                if (
-                        move < self._distribution_threshold
-                        and current_volume > previous_volume
-                ):
-                    action = DISTRIBUTION
+        return keys, distributions, distributions & recent
 
-                    for k in key:
-                        if k.upper() not in labels:
-                            labels.append(k.upper())
-                            break
+    def plot(self, ax: axes.Axes) -> None:
+        if self._frequency != DAILY:
+            return
 
-                    if (
-                            self._quotes.index[-1] - self._quotes.index[x]
-                    ).days < self._days_pass_invalid_threshold:
+        assert ax is not None
 
-                        color = self._distribution_color
-                        if key in counts:
-                            counts[key] += 1
-                        else:
-                            counts[key] = 1
+        mn, mx = (
+            self._quotes_range
+            if self._quotes_range is not None
+            else quotes_range(self._quotes)
+        )
 
-            if action != NEUTRAL:
-                highs = self._quotes.loc[:, "high"]
-                lows = self._quotes.loc[:, "low"]
+        keys, distributions, valid_distributions = self._distributions()
 
-                mx = highs.max()
-                mn = lows.min()
-                mr = mx - mn
+        counts = dict(zip(keys, valid_distributions.sum(axis=1)))
 
-                middle = (mx + mn) / 2.0
+        highs = self._quotes.loc[:, "high"].to_numpy()
+        lows = self._quotes.loc[:, "low"].to_numpy()
 
-                h = highs.iloc[x]
-                l = lows.iloc[x]
-                m = (h + l) / 2.0
+        mr = mx - mn
+        middle = (mx + mn) / 2.0
+        offset = mr * 0.0075
 
-                offset = mr * 0.0075
+        for x in np.flatnonzero(distributions.any(axis=0)).tolist():
+            labels: List[str] = []
+            for i in np.flatnonzero(distributions[:, x]):
+                for k in keys[i]:
+                    if k.upper() not in labels:
+                        labels.append(k.upper())
+                        break
 
-                y = l - offset if m < middle else h + offset
-                va = "top" if m < middle else "bottom"
+            color = (
+                self._distribution_color
+                if valid_distributions[:, x].any()
+                else self._invalid_distribution_color
+            )
 
-                arrow = "↑" if action == FOLLOW_THROUGH else "↓"
+            h = highs[x]
+            l = lows[x]
+            m = (h + l) / 2.0
 
-                labels.append(arrow)
+            y = l - offset if m < middle else h + offset
+            va = "top" if m < middle else "bottom"
 
-                text = "\n".join(labels)
+            labels.append("↓")
 
-                ax.text(
-                        x,
-                        y,
-                        text,
-                        color=color,
-                        fontproperties=self._font_properties,
-                        ha="center",
-                        va=va,
-                )
+            ax.text(
+                x,
+                y,
+                "\n".join(labels),
+                color=color,
+                fontproperties=self._font_properties,
+                ha="center",
+                va=va,
+            )
 
         if len(self._quotes) > 1:
             text = "\n".join(
-                    f"{k.upper()}: {counts.get(k, 0)}" for k in self._reference_symbols
+                f"{k.upper()}: {counts.get(k, 0)}" for k in self._reference_symbols
             )
 
-            h = np.amax(self._quotes.loc[:, "high"])
-            l = np.amin(self._quotes.loc[:, "low"])
-
-            lh = np.amax(self._quotes.iloc[-30:].loc[:, "high"])
-            ll = np.amin(self._quotes.iloc[-30:].loc[:, "low"])
+            ll, lh = (
+                self._tail_quotes_range
+                if self._tail_quotes_range is not None
+                else quotes_range(self._quotes.iloc[-30:])
+            )
 
             y: float
             va: str
-            if abs(l - ll) > abs(h - lh):
-                y = np.amin(self._quotes.loc[:, "low"])
+            if abs(mn - ll) > abs(mx - lh):
+                y = mn
                 va = "bottom"
             else:
-                y = np.amax(self._quotes.loc[:, "high"])
+                y = mx
                 va = "top"
 
             ax.text(
-                    len(self._quotes.index) - self._xoffset,
-                    y,
-                    text,
-                    color=self._font_color,
-                    fontproperties=self._info_font_properties,
-                    ha="right",
-                    va=va,
+                len(self._quotes.index) - self._xoffset,
+                y,
+                text,
+                color=self._font_color,
+                fontproperties=self._info_font_properties,
+                ha="right",
+                va=va,
             )
@@ -0,0 +1,142 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fun.data.source import DAILY
+from fun.plotter.ibd import DayActions, DistributionsDay
+from fun.utils.testing import parameterized, random_quotes
+
+
+class _Cache:
+    def __init__(self, references):
+        self._actions = {k: DayActions(v) for k, v in references.items()}
+
+    def get(self, src, symbol, frequency):
+        return self._actions[symbol]
+
+
+class _DistributionsDay(DistributionsDay):
+    pass
+
+
+def _reference(quotes, references, threshold, days):
+    # the plain loop over each quote the vectorized masks have to match
+    last = quotes.index[-1]
+
+    distributions = []
+    for symbol, reference in references.items():
+        closes = reference.loc[:, "close"].tolist()
+        volumes = reference.loc[:, "volume"].tolist()
+        positions = {d: i for i, d in enumerate(reference.index)}
+
+        flags = []
+        for d in quotes.index:
+            i = positions.get(d, None)
+            if i is None or i == 0:
+                flags.append(False)
+                continue
+
+            c0, c1 = closes[i - 1], closes[i]
+            v0, v1 = volumes[i - 1], volumes[i]
+
+            if c0 <= 0 or c1 <= 0 or v0 <= 0 or v1 <= 0:
+                flags.append(False)
+                continue
+
+            move = (c1 - c0) / c0 * 100.0
+            flags.append(move < threshold and v1 > v0)
+
+        distributions.append(flags)
+
+    recent = [(last - d).days < days for d in quotes.index]
+    valid = [[f and r for f, r in zip(flags, recent)] for flags in distributions]
+
+    return distributions, valid
+
+
+class TestDayActions(unittest.TestCase):
+    def test_flags(self):
+        index = pd.date_range("2020-01-01", periods=6, freq="B")
+        quotes = pd.DataFrame(
+            {
+                "close": [100.0, 99.0, 99.5, 98.0, 0.0, 97.0],
+                "volume": [10.0, 20.0, 30.0, 10.0, 50.0, 60.0],
+            },
+            index=index,
+        )
+
+        actions = DayActions(quotes)
+
+        self.assertTrue(
+            np.allclose(
+                actions.move(),
+                [np.nan, -1.0, 0.5050505, -1.5075377, np.nan, np.nan],
+                equal_nan=True,
+            )
+        )
+        self.assertEqual(
+            actions.volume_increase().tolist(),
+            [False, True, True, False, False, False],
+        )
+
+
+class TestDistributionsDay(unittest.TestCase):
+    def setUp(self):
+        self._quotes = random_quotes("2020-01-01", 60)
+
+        spx = random_quotes("2019-12-01", 100)
+        spx.loc[:, "close"] = 100.0 + np.cumsum(
+            np.random.default_rng(1).normal(size=100)
+        )
+        spx.loc[:, "volume"] = np.random.default_rng(2).integers(1, 4, size=100)
+
+        # a missing session, a bad close and a bad volume in the reference
+        compq = spx.copy()
+        compq.loc[:, "close"] = compq.loc[:, "close"].to_numpy()[::-1]
+        compq = compq.drop(self._quotes.index[10])
+        compq.iloc[40, compq.columns.get_loc("close")] = 0.0
+        compq.iloc[50, compq.columns.get_loc("volume")] = 0.0
+
+        self._references = {"spx": spx, "compq": compq}
+
+    @parameterized(
+        [
+            {"threshold": -0.2, "days": 35},
+            {"threshold": 0.0, "days": 35},
+            {"threshold": 0.0, "days": 36},
+            {"threshold": -1.0, "days": 10},
+            {"threshold": 0.5, "days": 100},
+        ]
+    )
+    def test_distributions(self, threshold, days):
+        _DistributionsDay._cache = _Cache(self._references)
+
+        plotter = _DistributionsDay(
+            self._quotes,
+            DAILY,
+            reference_symbols=list(self._references.keys()),
+            distribution_threshold=threshold,
+            days_pass_invalid_threshold=days,
+        )
+
+        keys, distributions, valid = plotter._distributions()
+
+        expected_distributions, expected_valid = _reference(
+            self._quotes, self._references, threshold, days
+        )
+
+        self.assertEqual(keys, list(self._references.keys()))
+        self.assertEqual(distributions.tolist(), expected_distributions)
+        self.assertEqual(valid.tolist(), expected_valid)
+        self.assertEqual(
+            valid.sum(axis=1).tolist(), [sum(flags) for flags in expected_valid]
+        )
+
+        # the recent window only ever drops distributions
+        self.assertTrue((distributions | ~valid).all())
+        self.assertGreater(distributions.sum(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
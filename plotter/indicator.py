@@ -5,6 +5,7 @@ from typing import List, NewType, Optional, Union
 import numpy as np
 import pandas as pd
 from fun.plotter.plotter import LinePlotter
+from fun.plotter.rolling import BODY, SHADOW, RollingStatistics
 from matplotlib import axes
 
 
@@ -17,6 +18,7 @@ class Indicator(LinePlotter):
         line_color: str = "k",
         line_alpha: float = 1.0,
         line_width: float = 10.0,
+        statistics: Optional[RollingStatistics] = None,
     ) -> None:
         assert quotes is not None
 
@@ -30,6 +32,10 @@ class Indicator(LinePlotter):
         self._slice_start = slice_start
         self._slice_end = slice_end
 
+        self._statistics = (
+            statistics if statistics is not None else RollingStatistics(quotes)
+        )
+
     @abstractmethod
     def _calculate(self) -> Union[pd.Series, List[pd.Series]]:
         raise NotImplementedError
@@ -71,6 +77,7 @@ class SimpleMovingAverage(Indicator):
         line_color: str = "k",
         line_alpha: float = 1.0,
         line_width: float = 10.0,
+        statistics: Optional[RollingStatistics] = None,
     ) -> None:
         super().__init__(
             quotes=quotes,
@@ -79,12 +86,13 @@ class SimpleMovingAverage(Indicator):
             line_color=line_color,
             line_alpha=line_alpha,
             line_width=line_width,
+            statistics=statistics,
         )
 
         self._n = n
 
     def _calculate(self) -> pd.Series:
-        return self._quotes.loc[:, "close"].rolling(self._n).mean()
+        return self._statistics.mean("close", self._n)
 
 
 class BollingerBand(Indicator):
@@ -98,6 +106,7 @@ class BollingerBand(Indicator):
         line_color: str = "k",
         line_alpha: float = 1.0,
         line_width: float = 10.0,
+        statistics: Optional[RollingStatistics] = None,
     ) -> None:
         super().__init__(
             quotes=quotes,
@@ -106,6 +115,7 @@ class BollingerBand(Indicator):
             line_color=line_color,
             line_alpha=line_alpha,
             line_width=line_width,
+            statistics=statistics,
         )
 
         self._n = n
@@ -114,11 +124,12 @@ class BollingerBand(Indicator):
     def _calculate(
         self,
     ) -> List[pd.DataFrame]:
-        mean = self._quotes.loc[:, "close"].rolling(self._n).mean()
+        mean = self._statistics.mean("close", self._n)
+        std = self._statistics.std("close", self._n)
 
         return [
-            mean + (self._quotes.loc[:, "close"].rolling(self._n).std() * self._m),
-            mean + (self._quotes.loc[:, "close"].rolling(self._n).std() * -self._m),
+            mean + (std * self._m),
+            mean + (std * -self._m),
         ]
 
 
@@ -169,6 +180,7 @@ class CandleRange(Indicator):
         line_color: str = "k",
         line_alpha: float = 1.0,
         line_width: float = 10.0,
+        statistics: Optional[RollingStatistics] = None,
     ) -> None:
 
         super().__init__(
@@ -178,6 +190,7 @@ class CandleRange(Indicator):
             line_color=line_color,
             line_alpha=line_alpha,
             line_width=line_width,
+            statistics=statistics,
         )
 
         assert moving_average >= 0
@@ -189,19 +202,18 @@ class CandleRange(Indicator):
     def _calculate(
         self,
     ) -> pd.Series:
-        height: pd.Series
+        column: str
 
         if self._range_type == BODY_RANGE:
-            height = self._quotes.loc[:, "open"] - self._quotes.loc[:, "close"]
-            height = height.abs()
+            column = BODY
 
         elif self._range_type == SHADOW_RANGE:
-            height = self._quotes.loc[:, "high"] - self._quotes.loc[:, "low"]
+            column = SHADOW
 
         else:
             raise ValueError("invalid range type")
 
         if self._moving_average != 0:
-            height = height.rolling(self._moving_average).mean()
+            return self._statistics.mean(column, self._moving_average)
 
-        return height
+        return self._statistics.column(column)
@@ -1,13 +1,13 @@
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 
-import numpy as np
 import pandas as pd
 from matplotlib import axes
 from matplotlib import font_manager as fm
 
 from fun.data.source import FREQUENCY
-from fun.plotter.plotter import Plotter
+from fun.plotter.plotter import Plotter, quotes_range
+from fun.plotter.reference import ReferenceSeriesRegistry
+from fun.plotter.rolling import RollingStatistics
 from fun.plotter.volatility import VolatilitySource
 from fun.utils import colors
 
@@ -28,6 +28,10 @@ class Level(VolatilitySource, Plotter):
         font_size: float = 10.0,
         font_src: Optional[str] = None,
         font_properties: Optional[fm.FontProperties] = None,
+        quotes_range: Optional[Tuple[float, float]] = None,
+        tail_quotes_range: Optional[Tuple[float, float]] = None,
+        references: Optional[ReferenceSeriesRegistry] = None,
+        statistics: Optional[RollingStatistics] = None,
     ) -> None:
         assert full_quotes is not None
         assert quotes is not None
@@ -46,9 +50,16 @@ class Level(VolatilitySource, Plotter):
 
         self._full_quotes = full_quotes
 
+        self._statistics = (
+            statistics if statistics is not None else RollingStatistics(full_quotes)
+        )
+
         self._quotes = quotes
         self._frequency = frequency
 
+        self._quotes_range = quotes_range
+        self._tail_quotes_range = tail_quotes_range
+
         self._x_offset = x_offset
 
         # self._yellow_threshold = yellow_threshold
@@ -58,22 +69,27 @@ class Level(VolatilitySource, Plotter):
         self._color_yellow = color_yellow
         self._color_red = color_red
 
-        self._vix_quotes = None
-        if self._vix_symbol is not None and self._src is not None:
-            self._vix_quotes = self._src.read(
-                start=datetime.strptime("19000101", "%Y%m%d"),
-                end=datetime.now(),
-                symbol=self._vix_symbol,
-                frequency=self._frequency,
-            ).loc[self._quotes.index[0] : self._quotes.index[-1]]
+        self._vix = self._read_vix(self._quotes, self._frequency, references)
+
+    def _last(self, values: pd.Series) -> float:
+        start, end = self._quotes.index[0], self._quotes.index[-1]
+
+        last: float = values.loc[start:end].iloc[-1]
+        return last
 
     def plot(self, ax: axes.Axes) -> None:
 
-        h = np.amax(self._quotes.loc[:, "high"])
-        l = np.amin(self._quotes.loc[:, "low"])
+        l, h = (
+            self._quotes_range
+            if self._quotes_range is not None
+            else quotes_range(self._quotes)
+        )
 
-        lh = np.amax(self._quotes.iloc[-30:].loc[:, "high"])
-        ll = np.amin(self._quotes.iloc[-30:].loc[:, "low"])
+        ll, lh = (
+            self._tail_quotes_range
+            if self._tail_quotes_range is not None
+            else quotes_range(self._quotes.iloc[-30:])
+        )
 
         mn, mx = ax.get_ylim()
 
@@ -112,22 +128,10 @@ class Level(VolatilitySource, Plotter):
         ending: str = "",
     ) -> None:
 
-        ma = (
-            self._full_quotes.loc[:, "close"]
-            .rolling(n)
-            .mean()
-            .loc[self._quotes.index[0] : self._quotes.index[-1]]
-            .iloc[-1]
-        )
+        ma = self._last(self._statistics.mean("close", n))
         c = self._quotes.iloc[-1].get("close")
 
-        std = (
-            self._full_quotes.loc[:, "close"]
-            .rolling(n)
-            .std()
-            .loc[self._quotes.index[0] : self._quotes.index[-1]]
-            .iloc[-1]
-        )
+        std = self._last(self._statistics.std("close", n))
 
         m = (c - ma) / std
 
@@ -161,13 +165,7 @@ class Level(VolatilitySource, Plotter):
         ending: str = "",
     ) -> None:
 
-        ma = (
-            self._full_quotes.loc[:, "close"]
-            .rolling(n)
-            .mean()
-            .loc[self._quotes.index[0] : self._quotes.index[-1]]
-            .iloc[-1]
-        )
+        ma = self._last(self._statistics.mean("close", n))
         c = self._quotes.iloc[-1].get("close")
 
         if c < ma:
@@ -203,13 +201,13 @@ class Level(VolatilitySource, Plotter):
         starting: str = "",
         ending: str = "",
     ) -> None:
-        if self._vix_symbol is None or self._vix_quotes is None:
+        if self._vix_symbol is None or self._vix is None:
             return
 
-        if len(self._vix_quotes.index) == 0:
+        if len(self._vix.quotes().index) == 0:
             return
 
-        value = self._vix_quotes.iloc[-1].get("close", None)
+        value = self._vix.quotes().iloc[-1].get("close", None)
         if value is None:
             return
 
@@ -1,9 +1,15 @@
 from abc import ABCMeta, abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from matplotlib import axes, font_manager as fm
 
 
+def quotes_range(quotes: pd.DataFrame) -> Tuple[float, float]:
+    return np.amin(quotes.loc[:, "low"]), np.amax(quotes.loc[:, "high"])
+
+
 class Plotter(metaclass=ABCMeta):
     @abstractmethod
     def plot(self, ax: axes.Axes) -> None:
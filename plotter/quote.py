@@ -1,8 +1,7 @@
-from typing import Optional
+from typing import Optional, Tuple
 
-import numpy as np
 import pandas as pd
-from fun.plotter.plotter import TextPlotter
+from fun.plotter.plotter import TextPlotter, quotes_range
 from matplotlib import axes, font_manager as fm
 from fun.data.source import FREQUENCY, HOURLY
 
@@ -18,6 +17,8 @@ class LastQuote(TextPlotter):
         font_size: float = 10.0,
         font_src: Optional[str] = None,
         font_properties: Optional[fm.FontProperties] = None,
+        quotes_range: Optional[Tuple[float, float]] = None,
+        head_quotes_range: Optional[Tuple[float, float]] = None,
     ) -> None:
         assert quotes is not None
 
@@ -31,6 +32,9 @@ class LastQuote(TextPlotter):
         self._quotes = quotes
         self._frequency = frequency
 
+        self._quotes_range = quotes_range
+        self._head_quotes_range = head_quotes_range
+
         self._decimals = decimals
 
         self._x_offset = x_offset
@@ -64,11 +68,17 @@ class LastQuote(TextPlotter):
 
             text = "\n".join(info)
 
-            h = np.amax(self._quotes.loc[:, "high"])
-            l = np.amin(self._quotes.loc[:, "low"])
+            l, h = (
+                self._quotes_range
+                if self._quotes_range is not None
+                else quotes_range(self._quotes)
+            )
 
-            lh = np.amax(self._quotes.iloc[:30].loc[:, "high"])
-            ll = np.amin(self._quotes.iloc[:30].loc[:, "low"])
+            ll, lh = (
+                self._head_quotes_range
+                if self._head_quotes_range is not None
+                else quotes_range(self._quotes.iloc[:30])
+            )
 
             mn, mx = ax.get_ylim()
 
@@ -1,12 +1,12 @@
-from datetime import datetime
+from typing import Optional
 
-import numpy as np
 import pandas as pd
 from matplotlib import axes
 
 from fun.data.barchart import Barchart
 from fun.data.source import FREQUENCY
 from fun.plotter.plotter import Plotter
+from fun.plotter.reference import ReferenceSeriesRegistry
 from fun.utils import colors
 
 
@@ -21,6 +21,7 @@ class InterestRatesSummary(Plotter):
         line_color_long: str = colors.PAPER_INDIGO_400,
         line_alpha: float = 0.5,
         line_width: float = 2.5,
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
 
         self._quotes = quotes
@@ -35,105 +36,52 @@ class InterestRatesSummary(Plotter):
         self._line_alpha = line_alpha
         self._line_width = line_width
 
+        if references is None:
+            references = ReferenceSeriesRegistry()
+
         src = Barchart()
 
-        self._short_rates = src.read(
-            start=datetime.strptime("19000101", "%Y%m%d"),
-            end=datetime.now(),
-            symbol="ustm3",
-            frequency=self._frequency,
-        ).loc[self._quotes.index[0] : self._quotes.index[-1]]
-
-        self._medium_rates = src.read(
-            start=datetime.strptime("19000101", "%Y%m%d"),
-            end=datetime.now(),
-            symbol="usty2",
-            frequency=self._frequency,
-        ).loc[self._quotes.index[0] : self._quotes.index[-1]]
-
-        self._long_rates = src.read(
-            start=datetime.strptime("19000101", "%Y%m%d"),
-            end=datetime.now(),
-            symbol="usty10",
-            frequency=self._frequency,
-        ).loc[self._quotes.index[0] : self._quotes.index[-1]]
+        self._short_rates = references.series(
+            src=src, symbol="ustm3", frequency=self._frequency, quotes=self._quotes
+        )
+
+        self._medium_rates = references.series(
+            src=src, symbol="usty2", frequency=self._frequency, quotes=self._quotes
+        )
+
+        self._long_rates = references.series(
+            src=src, symbol="usty10", frequency=self._frequency, quotes=self._quotes
+        )
 
     def plot(self, ax: axes.Axes) -> None:
+        rates = [
+            (r, c)
+            for r, c in (
+                (self._short_rates, self._line_color_short),
+                (self._medium_rates, self._line_color_medium),
+                (self._long_rates, self._line_color_long),
+            )
+            if not r.empty()
+        ]
+
+        if len(rates) == 0:
+            return
+
         mn, mx = ax.get_ylim()
 
         top = ((mx - mn) * self._height_ratio) + mn
 
-        rates_max = max(
-            max(
-                self._short_rates.loc[:, "close"].max(),
-                self._medium_rates.loc[:, "close"].max(),
-            ),
-            self._long_rates.loc[:, "close"].max(),
-        )
-
-        rates_min = min(
-            min(
-                self._short_rates.loc[:, "close"].min(),
-                self._medium_rates.loc[:, "close"].min(),
-            ),
-            self._long_rates.loc[:, "close"].min(),
-        )
+        rates_max = max(r.values("close").max() for r, _ in rates)
+        rates_min = min(r.values("close").min() for r, _ in rates)
 
-        self._short_rates -= rates_min
-        self._medium_rates -= rates_min
-        self._long_rates -= rates_min
-
-        self._short_rates /= rates_max - rates_min
-        self._medium_rates /= rates_max - rates_min
-        self._long_rates /= rates_max - rates_min
-
-        self._short_rates *= top - mn
-        self._medium_rates *= top - mn
-        self._long_rates *= top - mn
-
-        self._short_rates += mn
-        self._medium_rates += mn
-        self._long_rates += mn
-
-        ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._short_rates.index
-            ],
-            self._short_rates.loc[
-                [d for d in self._short_rates.index if d in self._quotes.index], "close"
-            ],
-            color=self._line_color_short,
-            alpha=self._line_alpha,
-            linewidth=self._line_width,
-        )
+        for r, c in rates:
+            values = (r.values("close") - rates_min) / (rates_max - rates_min)
+            values = values * (top - mn) + mn
 
-        ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._medium_rates.index
-            ],
-            self._medium_rates.loc[
-                [d for d in self._medium_rates.index if d in self._quotes.index],
-                "close",
-            ],
-            color=self._line_color_medium,
-            alpha=self._line_alpha,
-            linewidth=self._line_width,
-        )
-
-        ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._long_rates.index
-            ],
-            self._long_rates.loc[
-                [d for d in self._long_rates.index if d in self._quotes.index], "close"
-            ],
-            color=self._line_color_long,
-            alpha=self._line_alpha,
-            linewidth=self._line_width,
-        )
+            ax.plot(
+                r.positions(),
+                values,
+                color=c,
+                alpha=self._line_alpha,
+                linewidth=self._line_width,
+            )
@@ -5,6 +5,7 @@ import numpy as np
 import pandas as pd
 from fun.data.source import FREQUENCY, WEEKLY, DAILY
 from fun.plotter.plotter import TextPlotter
+from fun.trading.table import TransactionTable
 from fun.trading.transaction import FuturesTransaction
 from fun.trading.agent import TradingAgent
 from fun.utils import colors
@@ -55,9 +56,7 @@ class LeverageRecords(TextPlotter):
             return
 
         dates = self._quotes.index
-        ops = np.add.accumulate(
-            [float(f"{r.operation()}{r.leverage()}") for r in self._records]
-        )
+        ops = TransactionTable(self._records).net()
 
         ops_s = -1
         ops_e = -1
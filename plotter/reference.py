@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from fun.data.cache import SourceCache
+from fun.data.source import FREQUENCY, DataSource
+
+
+class ReferenceSeries:
+    def __init__(self, quotes: pd.DataFrame, index: pd.DatetimeIndex) -> None:
+        # quotes is the reference series sliced to the chart window, positions
+        # and rows map every reference quote that also exists on the chart to
+        # its x coordinate and its row in quotes
+        self._quotes = quotes
+
+        positions: np.ndarray = index.get_indexer(quotes.index)
+        rows = np.flatnonzero(positions >= 0)
+
+        self._positions = positions[rows]
+        self._rows = rows
+
+        self._values: Dict[str, np.ndarray] = {}
+
+    def quotes(self) -> pd.DataFrame:
+        return self._quotes
+
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    def values(self, column: str) -> np.ndarray:
+        values = self._values.get(column, None)
+        if values is None:
+            values = self._quotes.loc[:, column].to_numpy(dtype=float)[self._rows]
+            self._values[column] = values
+
+        return values
+
+    def empty(self) -> bool:
+        return len(self._positions) == 0
+
+
+def _read_full(src: DataSource, symbol: str, frequency: FREQUENCY) -> pd.DataFrame:
+    return src.read(
+        start=datetime.strptime("19000101", "%Y%m%d"),
+        end=datetime.now(),
+        symbol=symbol,
+        frequency=frequency,
+    )
+
+
+class ReferenceSeriesRegistry:
+    def __init__(self, ttl: timedelta = timedelta(minutes=5)) -> None:
+        self._full_quotes = SourceCache(_read_full, ttl=ttl)
+
+        self._window: Optional[Tuple[pd.Timestamp, pd.Timestamp, int]] = None
+        # each series is kept with the full quotes it was sliced from, so a
+        # reload of those quotes also rebuilds the series
+        self._series: Dict[
+            Tuple[str, str, FREQUENCY], Tuple[pd.DataFrame, ReferenceSeries]
+        ] = {}
+
+        # plotters may be built concurrently, a lock per symbol makes them
+        # share one read instead of racing to load the same file
+        self._lock = threading.Lock()
+        self._locks: Dict[Tuple[str, str, FREQUENCY], threading.Lock] = {}
+
+    def series(
+        self,
+        src: DataSource,
+        symbol: str,
+        frequency: FREQUENCY,
+        quotes: pd.DataFrame,
+    ) -> ReferenceSeries:
+        assert len(quotes) > 0
+
+        window = (quotes.index[0], quotes.index[-1], len(quotes))
+        key = (type(src).__name__, symbol, frequency)
+
+        with self._lock:
+            if window != self._window:
+                self._window = window
+                self._series = {}
+
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            df = self._full_quotes.get(src, symbol, frequency)
+
+            with self._lock:
+                cached = self._series.get(key, None) if window == self._window else None
+
+            if cached is not None and cached[0] is df:
+                return cached[1]
+
+            start, end = quotes.index[0], quotes.index[-1]
+
+            series = ReferenceSeries(df.loc[start:end], quotes.index)
+
+            with self._lock:
+                if window == self._window:
+                    self._series[key] = (df, series)
+
+        return series
@@ -0,0 +1,96 @@
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from fun.data.source import DAILY
+from fun.plotter.reference import ReferenceSeriesRegistry
+from fun.utils.testing import parameterized
+
+
+class _Source:
+    def __init__(self, df: pd.DataFrame) -> None:
+        self._df = df
+        self.reads = 0
+
+    def source_file(self, symbol):
+        return None
+
+    def read(self, start, end, symbol, frequency):
+        self.reads += 1
+        time.sleep(0.01)
+        return self._df.copy()
+
+
+class TestReferenceSeriesRegistry(unittest.TestCase):
+    @parameterized(
+        [
+            {"start": "2019-01-01", "periods": 120, "skip": 3},
+            {"start": "2019-06-03", "periods": 30, "skip": 5},
+            {"start": "2020-12-01", "periods": 10, "skip": 2},
+        ]
+    )
+    def test_alignment(self, start, periods, skip):
+        index = pd.date_range(start, periods=periods, freq="B")
+        quotes = pd.DataFrame({"close": np.arange(periods, dtype=float)}, index=index)
+
+        rindex = pd.date_range("2018-01-01", "2021-12-31", freq="B")
+        rindex = rindex[~rindex.isin(index[::skip])]
+        ref = pd.DataFrame({"close": np.arange(len(rindex), dtype=float)}, index=rindex)
+
+        series = ReferenceSeriesRegistry().series(
+            src=_Source(ref), symbol="vix", frequency=DAILY, quotes=quotes
+        )
+
+        expected_x = [i for i, d in enumerate(quotes.index) if d in ref.index]
+        expected_y = ref.loc[[d for d in ref.index if d in quotes.index], "close"]
+
+        self.assertTrue(np.array_equal(series.positions(), expected_x))
+        self.assertTrue(np.array_equal(series.values("close"), expected_y.to_numpy()))
+
+    def test_shared_reads(self):
+        index = pd.date_range("2019-01-01", periods=60, freq="B")
+        quotes = pd.DataFrame({"close": np.arange(60, dtype=float)}, index=index)
+
+        src = _Source(quotes.copy())
+        references = ReferenceSeriesRegistry()
+
+        first = references.series(src=src, symbol="vix", frequency=DAILY, quotes=quotes)
+        second = references.series(src=src, symbol="vix", frequency=DAILY, quotes=quotes)
+
+        self.assertIs(first, second)
+        self.assertEqual(src.reads, 1)
+
+        moved = references.series(
+            src=src, symbol="vix", frequency=DAILY, quotes=quotes.iloc[1:]
+        )
+
+        self.assertIsNot(moved, first)
+        self.assertEqual(src.reads, 1)
+        self.assertTrue(np.array_equal(moved.positions(), np.arange(59)))
+
+    def test_concurrent_reads(self):
+        index = pd.date_range("2019-01-01", periods=60, freq="B")
+        quotes = pd.DataFrame({"close": np.arange(60, dtype=float)}, index=index)
+
+        src = _Source(quotes.copy())
+        references = ReferenceSeriesRegistry()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            series = list(
+                executor.map(
+                    lambda _: references.series(
+                        src=src, symbol="vix", frequency=DAILY, quotes=quotes
+                    ),
+                    range(8),
+                )
+            )
+
+        self.assertEqual(src.reads, 1)
+        self.assertTrue(all(s is series[0] for s in series))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import math
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BODY = "body"
+SHADOW = "shadow"
+
+_DERIVED: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    BODY: lambda q: (q.loc[:, "open"] - q.loc[:, "close"]).abs(),
+    SHADOW: lambda q: q.loc[:, "high"] - q.loc[:, "low"],
+}
+
+_STATISTICS: Dict[str, Callable[[Any], pd.Series]] = {
+    "mean": lambda r: r.mean(),
+    "std": lambda r: r.std(),
+}
+
+
+class _Buffer:
+    def __init__(self, values: np.ndarray, name: Any) -> None:
+        # values past length are room for appended bars, the storage is only
+        # copied when it runs out, which keeps appends amortized O(1)
+        self._values = values
+        self._length = len(values)
+        self._name = name
+
+    def name(self) -> Any:
+        return self._name
+
+    def values(self) -> np.ndarray:
+        return self._values[: self._length]
+
+    def append(self, values: np.ndarray) -> None:
+        length = self._length
+        end = length + len(values)
+
+        if end > len(self._values):
+            grown = np.empty(
+                max(end, 2 * len(self._values)), dtype=self._values.dtype
+            )
+            grown[:length] = self._values[:length]
+            self._values = grown
+
+        self._values[length:end] = values
+        self._length = end
+
+
+class _Window:
+    def __init__(self, values: np.ndarray, n: int) -> None:
+        # sums over the last n values taken around a shift close to them, so
+        # the variance does not cancel out for prices far from zero
+        self._n = n
+
+        start = max(len(values) - n, 0)
+
+        tail = values[start:]
+        finite = tail[~np.isnan(tail)]
+
+        self._shift = float(finite[0]) if len(finite) > 0 else 0.0
+        self._count = len(tail)
+        self._nans = len(tail) - len(finite)
+        self._sum = math.fsum(finite - self._shift)
+        self._squares = math.fsum((finite - self._shift) ** 2)
+
+    def _add(self, x: float, sign: int) -> None:
+        if math.isnan(x):
+            self._nans += sign
+        else:
+            self._sum += sign * (x - self._shift)
+            self._squares += sign * (x - self._shift) ** 2
+
+    def push(self, x: float, leaving: Optional[float]) -> None:
+        self._add(x, 1)
+
+        if leaving is None:
+            self._count += 1
+        else:
+            self._add(leaving, -1)
+
+    def _full(self) -> bool:
+        return self._count >= self._n and self._nans == 0
+
+    def mean(self) -> float:
+        if not self._full():
+            return math.nan
+
+        return self._shift + self._sum / self._n
+
+    def std(self) -> float:
+        if not self._full() or self._n < 2:
+            return math.nan
+
+        variance = (self._squares - self._sum * self._sum / self._n) / (self._n - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+_WINDOWED: Dict[str, Callable[[_Window], float]] = {
+    "mean": lambda w: w.mean(),
+    "std": lambda w: w.std(),
+}
+
+
+class RollingStatistics:
+    def __init__(self, quotes: pd.DataFrame) -> None:
+        assert quotes is not None
+
+        self._reset(quotes)
+
+    def _reset(self, quotes: pd.DataFrame) -> None:
+        self._quotes = quotes
+
+        self._columns: Dict[str, _Buffer] = {}
+        self._statistics: Dict[Tuple[str, str, int], _Buffer] = {}
+        self._windows: Dict[Tuple[str, int], _Window] = {}
+
+        # series handed out since the last extend, by column or statistic key
+        self._series: Dict[Any, pd.Series] = {}
+
+    def quotes(self) -> pd.DataFrame:
+        return self._quotes
+
+    def _wrap(self, key: Any, buffer: _Buffer) -> pd.Series:
+        series = self._series.get(key, None)
+        if series is None:
+            series = pd.Series(
+                buffer.values(),
+                index=self._quotes.index,
+                name=buffer.name(),
+                copy=False,
+            )
+            self._series[key] = series
+
+        return series
+
+    def _column(self, column: str) -> _Buffer:
+        buffer = self._columns.get(column, None)
+        if buffer is None:
+            derive = _DERIVED.get(column, None)
+            if derive is not None:
+                values = derive(self._quotes)
+            else:
+                values = self._quotes.loc[:, column]
+
+            buffer = _Buffer(values.to_numpy(), values.name)
+            self._columns[column] = buffer
+
+        return buffer
+
+    def column(self, column: str) -> pd.Series:
+        return self._wrap(column, self._column(column))
+
+    def _statistic(self, statistic: str, column: str, n: int) -> pd.Series:
+        assert n > 0
+
+        key = (statistic, column, n)
+
+        buffer = self._statistics.get(key, None)
+        if buffer is None:
+            values = _STATISTICS[statistic](self.column(column).rolling(n))
+            buffer = _Buffer(values.to_numpy(), values.name)
+            self._statistics[key] = buffer
+
+            if (column, n) not in self._windows:
+                self._windows[(column, n)] = _Window(
+                    self._column(column).values(), n
+                )
+
+        return self._wrap(key, buffer)
+
+    def mean(self, column: str, n: int) -> pd.Series:
+        return self._statistic("mean", column, n)
+
+    def std(self, column: str, n: int) -> pd.Series:
+        return self._statistic("std", column, n)
+
+    def extend(self, quotes: pd.DataFrame) -> None:
+        # quotes are the known ones with bars appended, only their first and
+        # last known bars are checked, anything else starts over
+        length = len(self._quotes)
+
+        if len(quotes) < length or (
+            length > 0
+            and (
+                quotes.index[0] != self._quotes.index[0]
+                or quotes.index[length - 1] != self._quotes.index[-1]
+            )
+        ):
+            self._reset(quotes)
+            return
+
+        appended = quotes.iloc[length:]
+
+        self._quotes = quotes
+        self._series = {}
+
+        if len(appended) == 0:
+            return
+
+        for column, buffer in self._columns.items():
+            derive = _DERIVED.get(column, None)
+            tail = derive(appended) if derive is not None else appended.loc[:, column]
+
+            buffer.append(tail.to_numpy())
+
+        # every appended bar moves each window by one value
+        for (column, n), window in self._windows.items():
+            values = self._columns[column].values()
+
+            computed: Dict[str, List[float]] = {
+                statistic: [] for statistic in _WINDOWED
+            }
+            for i in range(length, len(values)):
+                window.push(values[i], values[i - n] if i >= n else None)
+
+                for statistic, value in _WINDOWED.items():
+                    computed[statistic].append(value(window))
+
+            for statistic, new in computed.items():
+                kept = self._statistics.get((statistic, column, n), None)
+                if kept is not None:
+                    kept.append(np.array(new, dtype=np.float64))
@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from fun.plotter.rolling import BODY, SHADOW, RollingStatistics
+from fun.utils.testing import parameterized, random_quotes
+
+
+class TestRollingStatistics(unittest.TestCase):
+    @parameterized(
+        [
+            {"column": "close", "n": 20},
+            {"column": "close", "n": 300},
+            {"column": BODY, "n": 5},
+            {"column": SHADOW, "n": 10},
+        ]
+    )
+    def test_statistics(self, column, n):
+        quotes = random_quotes("2000-01-03", 500)
+        statistics = RollingStatistics(quotes)
+
+        if column == BODY:
+            values = (quotes.loc[:, "open"] - quotes.loc[:, "close"]).abs()
+        elif column == SHADOW:
+            values = quotes.loc[:, "high"] - quotes.loc[:, "low"]
+        else:
+            values = quotes.loc[:, column]
+
+        pd.testing.assert_series_equal(
+            statistics.mean(column, n), values.rolling(n).mean()
+        )
+        pd.testing.assert_series_equal(statistics.std(column, n), values.rolling(n).std())
+
+        self.assertIs(statistics.mean(column, n), statistics.mean(column, n))
+
+    @parameterized(
+        [
+            {"start": 400, "steps": [1, 1, 1, 5]},
+            {"start": 10, "steps": [1, 30, 200]},
+            {"start": 499, "steps": [1]},
+        ]
+    )
+    def test_extend(self, start, steps):
+        quotes = random_quotes("2000-01-03", start + sum(steps))
+
+        statistics = RollingStatistics(quotes.iloc[:start])
+        for n in (20, 60):
+            statistics.mean("close", n)
+            statistics.std("close", n)
+        statistics.mean(BODY, 5)
+
+        end = start
+        for step in steps:
+            end += step
+            statistics.extend(quotes.iloc[:end])
+
+        for n in (20, 60):
+            np.testing.assert_allclose(
+                statistics.mean("close", n).to_numpy(),
+                quotes.loc[:, "close"].rolling(n).mean().to_numpy(),
+            )
+            np.testing.assert_allclose(
+                statistics.std("close", n).to_numpy(),
+                quotes.loc[:, "close"].rolling(n).std().to_numpy(),
+            )
+
+        np.testing.assert_allclose(
+            statistics.mean(BODY, 5).to_numpy(),
+            (quotes.loc[:, "open"] - quotes.loc[:, "close"]).abs().rolling(5).mean(),
+        )
+
+        self.assertTrue(statistics.mean("close", 20).index.equals(quotes.index))
+
+    def test_extend_in_place(self):
+        quotes = random_quotes("2000-01-03", 300)
+
+        statistics = RollingStatistics(quotes.iloc[:200])
+        statistics.mean("close", 20)
+
+        # the first append grows the storage, the next ones fill it in place
+        statistics.extend(quotes.iloc[:201])
+        grown = statistics.mean("close", 20).to_numpy()
+
+        for end in range(202, 301):
+            statistics.extend(quotes.iloc[:end])
+
+        extended = statistics.mean("close", 20).to_numpy()
+
+        self.assertTrue(np.shares_memory(grown, extended))
+        np.testing.assert_allclose(
+            extended, quotes.loc[:, "close"].rolling(20).mean().to_numpy()
+        )
+
+    def test_extend_reset(self):
+        quotes = random_quotes("2000-01-03", 100)
+
+        statistics = RollingStatistics(quotes)
+        statistics.mean("close", 20)
+
+        shifted = quotes.iloc[1:]
+        statistics.extend(shifted)
+
+        pd.testing.assert_series_equal(
+            statistics.mean("close", 20), shifted.loc[:, "close"].rolling(20).mean()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,12 @@ import json
 import os
 import re
 from datetime import datetime, timedelta
-from typing import Optional, Callable
+from typing import Callable, Dict, List, Match, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from matplotlib import axes
+from matplotlib import axes, patches
+from matplotlib.collections import PatchCollection
 from matplotlib import font_manager as fm
 
 from fun.data.source import FREQUENCY, DAILY, WEEKLY, HOURLY
@@ -13,15 +15,54 @@ from fun.plotter.plotter import Plotter, TextPlotter
 from fun.utils import colors, pretty
 
 
+# note_regex = r"^([$#%@&]*)\s*(Entry|Exit|Study):*\s*(\d{4}-*\d{2}-*\d{2})(?:[T\s](\d{2}:\d{2})\s*[~-]\s*(\d{2}:\d{2}))*$"
+NOTE_REGEX = re.compile(
+    r"^\s*([$#%@&]*)\s*(Entry|Exit|Study):*\s*(\d{4}-*\d{2}-*\d{2})(?:[T\s](\d{2}:\d{2})\s*[~-]\s*(\d{2}:\d{2}))*\s*(?:\s*@\s*([\d'.]+)\s*\$\s*([LSXlsx]\d+))*$",
+    re.MULTILINE,
+)
+
+
+def _parse_note(m: Tuple[str, ...], frequency: FREQUENCY) -> Tuple[datetime, str]:
+    pattern = m[0].strip()
+    # op = m[1].strip()
+    date = m[2].strip().replace("-", "")
+    time = m[3].strip()
+    # price = m[5].strip()
+    leverage = m[6].strip()
+
+    pattern = "&" if pattern == "" else pattern
+    if leverage != "":
+        if frequency == HOURLY:
+            pattern = f"{leverage[:1]}\n{leverage[1:]}"
+        else:
+            pattern = "&"
+
+    if time != "":
+        dt = datetime.strptime(f"{date}T{time}", "%Y%m%dT%H:%M")
+    else:
+        dt = datetime.strptime(date, "%Y%m%d")
+
+    if frequency == HOURLY:
+        pass
+
+    elif frequency == DAILY or frequency == WEEKLY:
+        if dt.hour > 16:
+            dt = dt + timedelta(days=1)
+
+        dt = dt.replace(hour=0, minute=0, second=0)
+
+        if frequency == WEEKLY:
+            dt = dt - timedelta(days=dt.weekday())
+
+    return dt, pattern
+
+
 def read_notes(
     notes_root: str,
     frequency: FREQUENCY,
     func: Callable[[str, datetime, str, str], bool],
 ):
 
-    # note_regex = r"^([$#%@&]*)\s*(Entry|Exit|Study):*\s*(\d{4}-*\d{2}-*\d{2})(?:[T\s](\d{2}:\d{2})\s*[~-]\s*(\d{2}:\d{2}))*$"
-    note_regex = r"^\s*([$#%@&]*)\s*(Entry|Exit|Study):*\s*(\d{4}-*\d{2}-*\d{2})(?:[T\s](\d{2}:\d{2})\s*[~-]\s*(\d{2}:\d{2}))*\s*(?:\s*@\s*([\d'.]+)\s*\$\s*([LSXlsx]\d+))*$"
-
     fs = os.listdir(notes_root)
     fs.sort()
 
@@ -29,43 +70,262 @@ def read_notes(
         with open(os.path.join(notes_root, f)) as nf:
             content = nf.read()
 
-            regex = re.compile(note_regex, re.MULTILINE)
-            match = regex.findall(content)
+            for m in NOTE_REGEX.findall(content):
+                dt, pattern = _parse_note(m, frequency)
+
+                if func(f, dt, pattern, content):
+                    break
+
+
+class NoteFile:
+    def __init__(self, filename: str, mtime: float, content: str) -> None:
+        self._filename = filename
+        self._mtime = mtime
+        self._content = content
+
+        self._matches = NOTE_REGEX.findall(content)
+
+    def filename(self) -> str:
+        return self._filename
+
+    def mtime(self) -> float:
+        return self._mtime
+
+    def content(self) -> str:
+        return self._content
+
+    def matches(self) -> List[Tuple[str, ...]]:
+        return self._matches
+
+
+class NotesIndex:
+    _directories: Dict[str, Tuple[float, Dict[str, str]]] = {}
+    _indexes: Dict[str, "NotesIndex"] = {}
+
+    @classmethod
+    def notes_directory(cls, symbol: str, root: str) -> Optional[str]:
+        mtime = os.path.getmtime(root)
+
+        entry = cls._directories.get(root, None)
+        if entry is None or entry[0] != mtime:
+            directories: Dict[str, str] = {}
+
+            for r in os.listdir(root):
+                for target in re.split(r"[&_,|]", r):
+                    directories.setdefault(target.strip(), os.path.join(root, r))
+
+            entry = (mtime, directories)
+            cls._directories[root] = entry
+
+        return entry[1].get(symbol.lower(), None)
+
+    @classmethod
+    def for_symbol(cls, symbol: str, root: Optional[str] = None) -> Optional["NotesIndex"]:
+        if root is None:
+            root = os.path.join(
+                os.getenv("HOME"),
+                "Documents",
+                "TRADING_NOTES",
+                "notes",
+            )
+
+        path = cls.notes_directory(symbol, root)
+        if path is None or not os.path.exists(path):
+            return None
+
+        index = cls._indexes.get(path, None)
+        if index is None:
+            index = NotesIndex(path)
+            cls._indexes[path] = index
+
+        return index
+
+    def __init__(self, notes_root: str) -> None:
+        self._notes_root = notes_root
+
+        self._files: Dict[str, NoteFile] = {}
+        self._notes: Dict[FREQUENCY, Dict[datetime, List[Tuple[str, str]]]] = {}
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        files: Dict[str, NoteFile] = {}
+        changed = False
+
+        for f in sorted(os.listdir(self._notes_root)):
+            path = os.path.join(self._notes_root, f)
+            mtime = os.path.getmtime(path)
+
+            note = self._files.get(f, None)
+            if note is None or note.mtime() != mtime:
+                with open(path) as nf:
+                    note = NoteFile(f, mtime, nf.read())
+
+                changed = True
+
+            files[f] = note
+
+        if changed or len(files) != len(self._files):
+            self._notes = {}
+
+        self._files = files
+
+    def notes(self, frequency: FREQUENCY) -> Dict[datetime, List[Tuple[str, str]]]:
+        notes = self._notes.get(frequency, None)
+        if notes is None:
+            notes = {}
+
+            for f, note in self._files.items():
+                for m in note.matches():
+                    dt, pattern = _parse_note(m, frequency)
+                    notes.setdefault(dt, []).append((f, pattern))
+
+            self._notes[frequency] = notes
+
+        return notes
+
+    def content(self, filename: str) -> str:
+        return self._files[filename].content()
+
+
+# start date, start time, end date, end time, operation
+STUDY = Tuple[datetime, Optional[datetime], datetime, Optional[datetime], str]
+
+
+class StudyZones:
+    _instances: Dict[str, "StudyZones"] = {}
+
+    _regex = re.compile(r"^(\d{8})(?:[T\s](\d{2}:\d{2}))*$")
+
+    @classmethod
+    def for_symbol(cls, symbol: str, root: Optional[str] = None) -> Optional["StudyZones"]:
+        if root is None:
+            home = os.getenv("HOME")
+            assert home is not None
+
+            root = os.path.join(home, "Documents", "TRADING_NOTES", "study_zone")
+
+        path = NotesIndex.notes_directory(symbol, root)
+        if path is None:
+            return None
+
+        zones = cls._instances.get(path, None)
+        if zones is None:
+            zones = StudyZones(path)
+            cls._instances[path] = zones
+
+        return zones
+
+    def __init__(self, root: str) -> None:
+        self._root = root
+
+        self._files: Dict[str, Tuple[float, List[STUDY]]] = {}
+        self._zones: Dict[FREQUENCY, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+        self.refresh()
 
-            for m in match:
-                pattern = m[0].strip()
-                # op = m[1].strip()
-                date = m[2].strip().replace("-", "")
-                time = m[3].strip()
-                # price = m[5].strip()
-                leverage = m[6].strip()
+    def _parse(self, filename: str) -> List[STUDY]:
+        path = os.path.join(self._root, filename)
 
-                pattern = "&" if pattern == "" else pattern
-                if leverage != "":
+        with open(path, "r") as src:
+            try:
+                studies = json.load(src)
+            except json.JSONDecodeError:
+                pretty.color_print(
+                    colors.PAPER_RED_400,
+                    f"invalid json file for trading study zone: {path}",
+                )
+                return []
+
+        parsed: List[STUDY] = []
+        for study in studies:
+            start = self._regex.match(study["start"])
+            end = self._regex.match(study["end"])
+
+            if start is None or end is None:
+                pretty.color_print(
+                    colors.PAPER_RED_400,
+                    f"invalid trading study zone in {path}: {study}",
+                )
+                continue
+
+            parsed.append(
+                (
+                    self._date(start),
+                    self._time(start),
+                    self._date(end),
+                    self._time(end),
+                    study["operation"],
+                )
+            )
+
+        return parsed
+
+    @staticmethod
+    def _date(match: Match[str]) -> datetime:
+        return datetime.strptime(match.group(1), "%Y%m%d")
+
+    @staticmethod
+    def _time(match: Match[str]) -> Optional[datetime]:
+        if match.group(2) is None:
+            return None
+
+        return datetime.strptime(f"{match.group(1)}T{match.group(2)}", "%Y%m%dT%H:%M")
+
+    def refresh(self) -> None:
+        files = {}
+        changed = False
+
+        for f in sorted(os.listdir(self._root)):
+            mtime = os.path.getmtime(os.path.join(self._root, f))
+
+            entry = self._files.get(f, None)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, self._parse(f))
+                changed = True
+
+            files[f] = entry
+
+        if changed or len(files) != len(self._files):
+            self._zones = {}
+
+        self._files = files
+
+    def zones(self, frequency: FREQUENCY) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        zones = self._zones.get(frequency, None)
+        if zones is None:
+            starts = []
+            ends = []
+            operations = []
+
+            for _, studies in self._files.values():
+                for start, start_time, end, end_time, operation in studies:
                     if frequency == HOURLY:
-                        pattern = f"{leverage[:1]}\n{leverage[1:]}"
-                    else:
-                        pattern = "&"
+                        if start_time is None or end_time is None:
+                            continue
 
-                if time != "":
-                    dt = datetime.strptime(f"{date}T{time}", "%Y%m%dT%H:%M")
-                else:
-                    dt = datetime.strptime(date, "%Y%m%d")
+                        start = start_time
+                        end = end_time
 
-                if frequency == HOURLY:
-                    pass
+                    elif frequency == WEEKLY:
+                        start = start - timedelta(days=start.weekday())
+                        end = end - timedelta(days=end.weekday())
 
-                elif frequency == DAILY or frequency == WEEKLY:
-                    if dt.hour > 16:
-                        dt = dt + timedelta(days=1)
+                    starts.append(start)
+                    ends.append(end)
+                    operations.append(operation)
 
-                    dt = dt.replace(hour=0, minute=0, second=0)
+            order = np.argsort(np.array(starts, dtype="datetime64[ns]"), kind="stable")
 
-                    if frequency == WEEKLY:
-                        dt = dt - timedelta(days=dt.weekday())
+            zones = (
+                np.array(starts, dtype="datetime64[ns]")[order],
+                np.array(ends, dtype="datetime64[ns]")[order],
+                np.array(operations, dtype=object)[order],
+            )
 
-                if func(f, dt, pattern, content):
-                    break
+            self._zones[frequency] = zones
+
+        return zones
 
 
 class StudyZone(Plotter):
@@ -82,10 +342,6 @@ class StudyZone(Plotter):
     ) -> None:
         assert quotes is not None
 
-        root = os.path.join(
-            os.getenv("HOME"), "Documents", "TRADING_NOTES", "study_zone"
-        )
-
         self._symbol = symbol
         self._quotes = quotes
         self._frequency = frequency
@@ -98,31 +354,18 @@ class StudyZone(Plotter):
 
         self._alpha = alpha
 
-        self._studies = None
-
-        for r in os.listdir(root):
-            pattern = r"[&_,|]"
-            targets = re.split(pattern, r)
-            targets = list(map(lambda x: x.strip(), targets))
-
-            if self._symbol.lower() in targets:
-                path = os.path.join(root, r)
-                assert os.path.exists(path)
-                for f in os.listdir(path):
-                    with open(os.path.join(path, f), "r") as src:
-                        try:
-                            if self._studies is None:
-                                self._studies = json.load(src)
-                            else:
-                                self._studies.extend(json.load(src))
-                        except json.JSONDecodeError:
-                            pretty.color_print(
-                                colors.PAPER_RED_400,
-                                f"invalid json file for trading study zone: {path}",
-                            )
-                            self._studies = None
-
-                break
+        self._studies = StudyZones.for_symbol(self._symbol)
+        if self._studies is not None:
+            self._studies.refresh()
+
+    def _positions(self, dates: np.ndarray) -> np.ndarray:
+        index = self._quotes.index
+
+        positions = index.searchsorted(dates)
+        found = positions < len(index)
+        found[found] = index.to_numpy()[positions[found]] == dates[found]
+
+        return np.where(found, positions, -1)
 
     def plot(self, ax: axes.Axes) -> None:
         if self._studies is None:
@@ -135,75 +378,46 @@ class StudyZone(Plotter):
         ):
             return
 
-        mn, mx = ax.get_ylim()
-
-        regex = re.compile(r"^(\d{8})(?:[T\s](\d{2}:\d{2}))*$")
-
-        for study in self._studies:
-            match = regex.match(study["start"])
-            start = datetime.strptime(match.group(1), "%Y%m%d")
-
-            match = regex.match(study["end"])
-            end = datetime.strptime(match.group(1), "%Y%m%d")
-
-            if self._frequency == WEEKLY:
-                start = start - timedelta(days=start.weekday())
-                end = end - timedelta(days=end.weekday())
-
-            if self._frequency == HOURLY:
-                match = regex.match(study["start"])
-                if match.group(2) is not None:
-                    start = datetime.strptime(
-                        f"{match.group(1)}T{match.group(2)}", "%Y%m%dT%H:%M"
-                    )
-                else:
-                    continue
+        if len(self._quotes) == 0:
+            return
 
-                match = regex.match(study["end"])
-                if match.group(2) is not None:
-                    end = datetime.strptime(
-                        f"{match.group(1)}T{match.group(2)}", "%Y%m%dT%H:%M"
-                    )
-                else:
-                    continue
+        starts, ends, operations = self._studies.zones(self._frequency)
 
-            assert start is not None
-            assert end is not None
+        start_index = self._positions(starts)
+        end_index = self._positions(ends)
 
-            try:
+        visible = (start_index >= 0) & (end_index >= 0)
+        if not visible.any():
+            return
 
-                start_index = self._quotes.index.get_loc(
-                    start,
-                )
+        colors_map = {
+            "long": self._color_entry,
+            "short": self._color_entry,
+            "close": self._color_close,
+            "warning": self._color_warning,
+        }
 
-                end_index = self._quotes.index.get_loc(
-                    end,
-                )
+        for operation in operations[visible]:
+            if operation not in colors_map:
+                raise ValueError(f"invalid study operation: {operation}")
 
-            except KeyError:
-                continue
+        mn, mx = ax.get_ylim()
 
-            color = ""
-            if study["operation"] == "long":
-                color = self._color_entry
-            elif study["operation"] == "short":
-                color = self._color_entry
-            elif study["operation"] == "close":
-                color = self._color_close
-            elif study["operation"] == "warning":
-                color = self._color_warning
-            else:
-                raise ValueError(f"invalid study operation: {study['operation']}")
-
-            ax.bar(
-                start_index - (self._candlesticks_body_width / 2.0),
-                width=(end_index - start_index) + self._candlesticks_body_width,
-                bottom=mn,
-                height=mx - mn,
-                align="edge",
-                color=color,
+        ax.add_collection(
+            PatchCollection(
+                [
+                    patches.Rectangle(
+                        xy=(s - (self._candlesticks_body_width / 2.0), mn),
+                        width=(e - s) + self._candlesticks_body_width,
+                        height=mx - mn,
+                    )
+                    for s, e in zip(start_index[visible], end_index[visible])
+                ],
+                facecolors=[colors_map[o] for o in operations[visible]],
+                edgecolor="none",
                 alpha=self._alpha,
             )
+        )
 
 
 class NoteMarker(TextPlotter):
@@ -231,25 +445,7 @@ class NoteMarker(TextPlotter):
         self._quotes = quotes
         self._frequency = frequency
 
-        root = os.path.join(
-            os.getenv("HOME"),
-            "Documents",
-            "TRADING_NOTES",
-            "notes",
-        )
-
-        self._notes_root = None
-        for r in os.listdir(root):
-            pattern = r"[&_,|]"
-
-            targets = re.split(pattern, r)
-            targets = list(map(lambda x: x.strip(), targets))
-
-            if self._symbol.lower() in targets:
-                path = os.path.join(root, r)
-                if os.path.exists(path):
-                    self._notes_root = path
-                break
+        self._notes = NotesIndex.for_symbol(self._symbol)
 
     def _plot_text(self, ax, highs, lows, middle, offset, x, text):
         high = highs.iloc[x]
@@ -269,15 +465,7 @@ class NoteMarker(TextPlotter):
             va=va,
         )
 
-    def _append_note(self, notes, date, text):
-        try:
-            x = self._quotes.index.get_loc(
-                date,
-            )
-
-        except KeyError:
-            return
-
+    def _append_note(self, notes, x, text):
         if x not in notes:
             notes[x] = [text]
         else:
@@ -285,7 +473,7 @@ class NoteMarker(TextPlotter):
                 notes[x].append(text)
 
     def plot(self, ax: axes.Axes) -> None:
-        if self._notes_root is None:
+        if self._notes is None:
             return
 
         if len(self._quotes) == 0:
@@ -300,15 +488,22 @@ class NoteMarker(TextPlotter):
 
         assert ax is not None
 
+        self._notes.refresh()
+
+        indexed = self._notes.notes(self._frequency)
+        if len(indexed) == 0:
+            return
+
+        dates = list(indexed.keys())
+        positions = self._quotes.index.get_indexer(pd.DatetimeIndex(dates))
+
         notes = {}
+        for dt, x in zip(dates, positions):
+            if x < 0:
+                continue
 
-        read_notes(
-            self._notes_root,
-            self._frequency,
-            lambda filename, dt, pattern, content: self._append_note(
-                notes, dt, pattern
-            ),
-        )
+            for _, pattern in indexed[dt]:
+                self._append_note(notes, x, pattern)
 
         highs = self._quotes.loc[:, "high"]
         lows = self._quotes.loc[:, "low"]
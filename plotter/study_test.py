@@ -0,0 +1,168 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+from fun.data.source import DAILY, HOURLY, WEEKLY
+from fun.plotter.study import NotesIndex, StudyZones, read_notes
+from fun.utils.testing import parameterized
+
+
+class TestNotesIndex(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+        self._notes_root = os.path.join(self._root, "es_spx")
+        os.makedirs(self._notes_root)
+        os.makedirs(os.path.join(self._root, "nq"))
+
+        self._write("a.txt", "Entry: 2021-03-01\n$ Study 2021-03-03T18:00 ~ 19:00\n")
+        self._write("b.txt", "# Exit: 20210301 @ 3900.25 $ L2\n")
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _write(self, filename, content, mtime=None):
+        path = os.path.join(self._notes_root, filename)
+        with open(path, "w") as f:
+            f.write(content)
+
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    @parameterized(
+        [
+            {"symbol": "es", "found": True},
+            {"symbol": "spx", "found": True},
+            {"symbol": "ES", "found": True},
+            {"symbol": "nq", "found": False},
+            {"symbol": "cl", "found": False},
+        ]
+    )
+    def test_notes_directory(self, symbol, found):
+        path = NotesIndex.notes_directory(symbol, self._root)
+
+        if found:
+            self.assertEqual(path, self._notes_root)
+        else:
+            self.assertNotEqual(path, self._notes_root)
+
+    @parameterized([{"frequency": DAILY}, {"frequency": WEEKLY}, {"frequency": HOURLY}])
+    def test_notes(self, frequency):
+        expected = {}
+        read_notes(
+            self._notes_root,
+            frequency,
+            lambda filename, dt, pattern, content: expected.setdefault(
+                dt, []
+            ).append((filename, pattern)),
+        )
+
+        index = NotesIndex(self._notes_root)
+
+        self.assertEqual(index.notes(frequency), expected)
+
+    def test_refresh(self):
+        index = NotesIndex(self._notes_root)
+
+        self.assertEqual(
+            index.notes(DAILY)[datetime(2021, 3, 1)], [("a.txt", "&"), ("b.txt", "&")]
+        )
+
+        first = index.notes(DAILY)
+        index.refresh()
+        self.assertIs(index.notes(DAILY), first)
+
+        mtime = os.path.getmtime(os.path.join(self._notes_root, "b.txt")) + 10
+        self._write("b.txt", "% Entry: 2021-03-02\n", mtime=mtime)
+
+        index.refresh()
+
+        notes = index.notes(DAILY)
+        self.assertIsNot(notes, first)
+        self.assertEqual(notes[datetime(2021, 3, 1)], [("a.txt", "&")])
+        self.assertEqual(notes[datetime(2021, 3, 2)], [("b.txt", "%")])
+        self.assertEqual(index.content("b.txt"), "% Entry: 2021-03-02\n")
+
+
+class TestStudyZones(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+        self._write(
+            "a.json",
+            [
+                {"start": "20210310", "end": "20210312", "operation": "long"},
+                {"start": "20210301T10:00", "end": "20210302T12:00", "operation": "close"},
+            ],
+        )
+        self._write(
+            "b.json", [{"start": "20210305", "end": "20210309", "operation": "warning"}]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _write(self, filename, studies, mtime=None):
+        path = os.path.join(self._root, filename)
+        with open(path, "w") as f:
+            json.dump(studies, f)
+
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    @parameterized(
+        [
+            {
+                "frequency": DAILY,
+                "starts": ["2021-03-01", "2021-03-05", "2021-03-10"],
+                "ends": ["2021-03-02", "2021-03-09", "2021-03-12"],
+                "operations": ["close", "warning", "long"],
+            },
+            {
+                "frequency": WEEKLY,
+                "starts": ["2021-03-01", "2021-03-01", "2021-03-08"],
+                "ends": ["2021-03-01", "2021-03-08", "2021-03-08"],
+                "operations": ["close", "warning", "long"],
+            },
+            {
+                "frequency": HOURLY,
+                "starts": ["2021-03-01T10:00"],
+                "ends": ["2021-03-02T12:00"],
+                "operations": ["close"],
+            },
+        ]
+    )
+    def test_zones(self, frequency, starts, ends, operations):
+        starts_, ends_, operations_ = StudyZones(self._root).zones(frequency)
+
+        self.assertTrue(np.array_equal(starts_, np.array(starts, dtype="datetime64[ns]")))
+        self.assertTrue(np.array_equal(ends_, np.array(ends, dtype="datetime64[ns]")))
+        self.assertEqual(operations_.tolist(), operations)
+
+    def test_refresh(self):
+        zones = StudyZones(self._root)
+
+        first = zones.zones(DAILY)
+        zones.refresh()
+        self.assertIs(zones.zones(DAILY), first)
+
+        mtime = os.path.getmtime(os.path.join(self._root, "b.json")) + 10
+        self._write(
+            "b.json",
+            [{"start": "20210315", "end": "20210316", "operation": "short"}],
+            mtime=mtime,
+        )
+
+        zones.refresh()
+
+        _, _, operations = zones.zones(DAILY)
+        self.assertEqual(operations.tolist(), ["close", "long", "short"])
+
+
+if __name__ == "__main__":
+    unittest.main()
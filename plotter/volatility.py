@@ -1,8 +1,6 @@
-from datetime import datetime
+from typing import Optional
 
-# from typing import Optional
-
-# import numpy as np
+import numpy as np
 import pandas as pd
 from matplotlib import axes
 
@@ -10,6 +8,7 @@ from matplotlib import axes
 
 from fun.data.source import FREQUENCY, DataSource, InvestingCom, StockCharts, Yahoo
 from fun.plotter.plotter import LinePlotter
+from fun.plotter.reference import ReferenceSeries, ReferenceSeriesRegistry
 from fun.utils import colors
 
 
@@ -52,6 +51,25 @@ class VolatilitySource:
 
         self._src = src
 
+    def _read_vix(
+        self,
+        quotes: pd.DataFrame,
+        frequency: FREQUENCY,
+        references: Optional[ReferenceSeriesRegistry],
+    ) -> Optional[ReferenceSeries]:
+        if self._vix_symbol is None or self._src is None:
+            return None
+
+        if references is None:
+            references = ReferenceSeriesRegistry()
+
+        return references.series(
+            src=self._src,
+            symbol=self._vix_symbol,
+            frequency=frequency,
+            quotes=quotes,
+        )
+
 
 class VolatilitySummary(VolatilitySource, LinePlotter):
     def __init__(
@@ -63,6 +81,7 @@ class VolatilitySummary(VolatilitySource, LinePlotter):
         line_color: str = colors.PAPER_LIGHT_BLUE_A100,
         line_alpha: float = 0.5,
         line_width: float = 2.5,
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
 
         VolatilitySource.__init__(self, symbol=symbol)
@@ -77,40 +96,27 @@ class VolatilitySummary(VolatilitySource, LinePlotter):
 
         self._height_ratio = height_ratio
 
-        if self._vix_symbol is not None and self._src is not None:
-            self._vix_quotes = self._src.read(
-                start=datetime.strptime("19000101", "%Y%m%d"),
-                end=datetime.now(),
-                symbol=self._vix_symbol,
-                frequency=self._frequency,
-            ).loc[self._quotes.index[0] : self._quotes.index[-1]]
+        self._vix = self._read_vix(self._quotes, self._frequency, references)
 
     def plot(self, ax: axes.Axes) -> None:
-        if self._vix_symbol is None or self._vix_quotes is None:
+        if self._vix is None or self._vix.empty():
             return
 
         mn, mx = ax.get_ylim()
 
         top = ((mx - mn) * self._height_ratio) + mn
 
-        vix_max = self._vix_quotes.loc[:, "close"].max()
-        vix_min = self._vix_quotes.loc[:, "close"].min()
+        vix = self._vix.values("close")
 
-        self._vix_quotes -= vix_min
-        self._vix_quotes /= vix_max - vix_min
+        vix_max = vix.max()
+        vix_min = vix.min()
 
-        self._vix_quotes *= top - mn
-        self._vix_quotes += mn
+        vix = (vix - vix_min) / (vix_max - vix_min)
+        vix = vix * (top - mn) + mn
 
         ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._vix_quotes.index
-            ],
-            self._vix_quotes.loc[
-                [d for d in self._vix_quotes.index if d in self._quotes.index], "close"
-            ],
+            self._vix.positions(),
+            vix,
             color=self._line_color,
             alpha=self._line_alpha,
             linewidth=self._line_width,
@@ -127,6 +133,7 @@ class VolatilityRealBodyContraction(VolatilitySource, LinePlotter):
         line_color: str = colors.PAPER_PINK_A100,
         line_alpha: float = 0.5,
         line_width: float = 2.5,
+        references: Optional[ReferenceSeriesRegistry] = None,
     ) -> None:
 
         VolatilitySource.__init__(self, symbol=symbol)
@@ -141,16 +148,10 @@ class VolatilityRealBodyContraction(VolatilitySource, LinePlotter):
 
         self._height_ratio = height_ratio
 
-        if self._vix_symbol is not None and self._src is not None:
-            self._vix_quotes = self._src.read(
-                start=datetime.strptime("19000101", "%Y%m%d"),
-                end=datetime.now(),
-                symbol=self._vix_symbol,
-                frequency=self._frequency,
-            ).loc[self._quotes.index[0] : self._quotes.index[-1]]
+        self._vix = self._read_vix(self._quotes, self._frequency, references)
 
     def plot(self, ax: axes.Axes) -> None:
-        if self._vix_symbol is None or self._vix_quotes is None:
+        if self._vix is None or self._vix.empty():
             return
 
         mn, mx = ax.get_ylim()
@@ -158,8 +159,7 @@ class VolatilityRealBodyContraction(VolatilitySource, LinePlotter):
         top = ((mx - mn) * self._height_ratio) + mn
         # bottom = ((mx - mn) * self._height_ratio) + (mx + mn) / 2.0
 
-        rb = self._vix_quotes.loc[:, "open"] - self._vix_quotes.loc[:, "close"]
-        rb = rb.abs()
+        rb = np.abs(self._vix.values("open") - self._vix.values("close"))
 
         rb_max = rb.max()
         rb_min = rb.min()
@@ -167,22 +167,16 @@ class VolatilityRealBodyContraction(VolatilitySource, LinePlotter):
         # vix_max = self._vix_quotes.loc[:, "close"].max()
         # vix_min = self._vix_quotes.loc[:, "close"].min()
 
-        rb -= rb_min
-        rb /= rb_max - rb_min
+        rb = (rb - rb_min) / (rb_max - rb_min)
 
         # rb *= mx - bottom
         # rb += bottom
-        rb *= top - mn
-        rb += mn
+        rb = rb * (top - mn) + mn
 
-        mrb = rb.rolling(3).mean()
+        mrb = pd.Series(rb).rolling(3).mean().to_numpy()
 
         ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._vix_quotes.index
-            ],
+            self._vix.positions(),
             rb,
             color=self._line_color,
             alpha=self._line_alpha,
@@ -190,11 +184,7 @@ class VolatilityRealBodyContraction(VolatilitySource, LinePlotter):
         )
 
         ax.plot(
-            [
-                i
-                for i, d in enumerate(self._quotes.index)
-                if d in self._vix_quotes.index
-            ],
+            self._vix.positions(),
             mrb,
             color=colors.PAPER_AMBER_A100,
             alpha=self._line_alpha,
@@ -1,9 +1,9 @@
 import numpy as np
 import pandas as pd
-from fun.plotter.plotter import Plotter
+from fun.plotter.plotter import Plotter, quotes_range
 from matplotlib import axes, patches
 from matplotlib.collections import PatchCollection
-from typing import Optional
+from typing import Optional, Tuple
 
 
 class Volume(Plotter):
@@ -21,9 +21,13 @@ class Volume(Plotter):
         average_n: int = 20,
         line_width: float = 1.5,
         line_alpha: float = 0.025,
+        quotes_range: Optional[Tuple[float, float]] = None,
+        tail_quotes_range: Optional[Tuple[float, float]] = None,
     ):
 
         self._quotes = quotes
+        self._quotes_range = quotes_range
+        self._tail_quotes_range = tail_quotes_range
         self._body_width = body_width
 
         self._color_up = color_up
@@ -47,11 +51,17 @@ class Volume(Plotter):
 
         mn, mx = ax.get_ylim()
 
-        h = np.amax(self._quotes.loc[:, "high"])
-        l = np.amin(self._quotes.loc[:, "low"])
+        l, h = (
+            self._quotes_range
+            if self._quotes_range is not None
+            else quotes_range(self._quotes)
+        )
 
-        lh = np.amax(self._quotes.iloc[-30:].loc[:, "high"])
-        ll = np.amin(self._quotes.iloc[-30:].loc[:, "low"])
+        ll, lh = (
+            self._tail_quotes_range
+            if self._tail_quotes_range is not None
+            else quotes_range(self._quotes.iloc[-30:])
+        )
 
         pos_top = False
         if abs(l - ll) > abs(h - lh):
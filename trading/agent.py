@@ -1,16 +1,20 @@
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
 from functools import cmp_to_key
 
 import numpy as np
+
 from fun.trading.book import TradingBook
+from fun.trading.ledger import PositionLedger
 from fun.trading.order import TransactionOrder
 from fun.trading.statistic import Statistic
+from fun.trading.table import TradeTable, TransactionTable
 from fun.trading.trade import FuturesTrade
 from fun.trading.transaction import FuturesTransaction
 from fun.utils.helper import random_string
 from fun.utils.jsondb import JsonDB
+from fun.utils.sqlitedb import SqliteDB
 
 
 class OrderProcessor:
@@ -69,6 +73,12 @@ class TradingAgent:
 
     _COL_USER = "user"
 
+    _DB_INDEXES = {
+        _DB_ADMIN: ["name", "uid"],
+        _DB_TRADING_BOOKS: ["title", "index"],
+        _DB_TRADING_RECORDS: ["index"],
+    }
+
     _ORDER_PROCESSOR: OrderProcessor = OrderProcessor()
 
     @classmethod
@@ -94,7 +104,13 @@ class TradingAgent:
         return cls._ORDER_PROCESSOR.check_orders(price, symbol=symbol)
 
     def __init__(
-        self, root: str = "", user_name: str = "default", new_user: bool = False
+        self,
+        root: str = "",
+        user_name: str = "default",
+        new_user: bool = False,
+        sync: bool = True,
+        journal: bool = False,
+        sqlite: bool = False,
     ) -> None:
         home = os.getenv("HOME")
         assert home is not None
@@ -104,10 +120,35 @@ class TradingAgent:
 
         assert os.path.exists(root)
 
-        self._db = JsonDB(root)
+        self._db: Union[JsonDB, SqliteDB]
+        if sqlite:
+            self._db = SqliteDB(root, indexes=self._DB_INDEXES)
+        else:
+            self._db = JsonDB(
+                root, sync=sync, journal=journal, indexes=self._DB_INDEXES
+            )
 
         self._uid = self._login(user_name, new_user)
 
+        # books of the user sorted by last_modified and by title, rebuilt
+        # only when the version of the books collection moves
+        self._books: List[TradingBook] = []
+        self._titles: Dict[str, TradingBook] = {}
+        self._books_version: Optional[Hashable] = None
+
+        # positions of each book by index with the version of its records
+        # collection they were built from
+        self._ledgers: Dict[str, Tuple[Hashable, PositionLedger]] = {}
+
+    def __enter__(self) -> "TradingAgent":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        self._db.flush()
+
     def _login(self, user_name: str, new_user: bool) -> str:
         users = self._db.find(
             database=self._DB_ADMIN,
@@ -133,14 +174,51 @@ class TradingAgent:
             else:
                 raise ValueError("invalid user name")
 
+    def _read_books(self) -> List[TradingBook]:
+        version = self._db.version(self._DB_TRADING_BOOKS, self._uid)
+        if version == self._books_version:
+            return self._books
+
+        books = self._db.find(
+            database=self._DB_TRADING_BOOKS, collection=self._uid, query=None
+        )
+
+        bs = [TradingBook.from_entity(b) for b in books or []]
+        bs.sort(key=lambda b: b.last_modified())
+
+        titles: Dict[str, TradingBook] = {}
+        for b in bs:
+            titles.setdefault(b.title(), b)
+
+        self._books = bs
+        self._titles = titles
+        self._books_version = version
+
+        return bs
+
     def _find_book(self, title: str) -> Optional[TradingBook]:
-        books = self.books()
-        if books is not None:
-            for b in books:
-                if b.title() == title:
-                    return b
+        self._read_books()
+        return self._titles.get(title, None)
 
-        return None
+    def _ledger(self, title: str) -> Optional[PositionLedger]:
+        book = self._find_book(title)
+        if book is None:
+            return None
+
+        version = self._db.version(self._DB_TRADING_RECORDS, book.index())
+
+        cached = self._ledgers.get(book.index(), None)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        entities = self._db.find(self._DB_TRADING_RECORDS, book.index(), query=None)
+
+        ledger = PositionLedger(
+            [FuturesTransaction.from_entity(e) for e in entities or []]
+        )
+        self._ledgers[book.index()] = (version, ledger)
+
+        return ledger
 
     @staticmethod
     def _transaction_compare(x: FuturesTransaction, y: FuturesTransaction) -> int:
@@ -158,14 +236,10 @@ class TradingAgent:
                 return -1
 
     def books(self) -> Optional[List[TradingBook]]:
-        books = self._db.find(
-            database=self._DB_TRADING_BOOKS, collection=self._uid, query=None
-        )
+        bs = self._read_books()
 
-        if books is not None and len(books) > 0:
-            bs = [TradingBook.from_entity(b) for b in books]
-            bs.sort(key=lambda b: b.last_modified())
-            return bs
+        if len(bs) > 0:
+            return list(bs)
         else:
             return None
 
@@ -209,33 +283,65 @@ class TradingAgent:
         assert title != ""
 
         book = self._find_book(title)
+        if book is None and not new_book:
+            raise ValueError(f"book {title} does not exist")
+
+        t = FuturesTransaction.from_entity(entity)
+
+        created = book is None
         if book is None:
-            if new_book:
-                book = TradingBook(title=title)
+            book = TradingBook(title=title)
+
+        collections = [(self._DB_TRADING_RECORDS, book.index())]
+        if created:
+            collections.append((self._DB_TRADING_BOOKS, self._uid))
+
+        ledger = None
+
+        # a new book and its first record are written together
+        with self._db.transaction(collections):
+            if created:
                 self._db.insert(
                     self._DB_TRADING_BOOKS,
                     self._uid,
                     book.to_entity(),
                 )
             else:
-                raise ValueError(f"book {title} does not exist")
-
-        t = FuturesTransaction.from_entity(entity)
-        self._db.insert(self._DB_TRADING_RECORDS, book.index(), t.to_entity())
+                # checked with the records locked, so no other write can land
+                # between the check and the insert
+                cached = self._ledgers.get(book.index(), None)
+                if cached is not None and cached[0] == self._db.version(
+                    self._DB_TRADING_RECORDS, book.index()
+                ):
+                    ledger = cached[1]
+
+            self._db.insert(self._DB_TRADING_RECORDS, book.index(), t.to_entity())
+
+            version = self._db.version(self._DB_TRADING_RECORDS, book.index())
+
+        # a ledger that was current before the insert only needs the new
+        # record, unless another write came in after the transaction
+        if ledger is not None:
+            del self._ledgers[book.index()]
+
+            if self._db.version(self._DB_TRADING_RECORDS, book.index()) == version:
+                try:
+                    ledger.insert(t)
+                except ValueError:
+                    pass
+                else:
+                    self._ledgers[book.index()] = (version, ledger)
 
         return t
 
     def read_records(self, title: str) -> Optional[List[FuturesTransaction]]:
         assert title != ""
 
-        book = self._find_book(title)
-        if book is not None:
-            entities = self._db.find(self._DB_TRADING_RECORDS, book.index(), query=None)
-            if entities is not None and len(entities) != 0:
-                return sorted(
-                    [FuturesTransaction.from_entity(e) for e in entities],
-                    key=cmp_to_key(self._transaction_compare),
-                )
+        ledger = self._ledger(title)
+        if ledger is not None:
+            transactions = ledger.transactions()
+            if len(transactions) != 0:
+                return transactions
 
         return None
 
@@ -267,25 +373,39 @@ class TradingAgent:
         else:
             return self._process_trades(ts)
 
+    def read_trade_table(self, title: str) -> Optional[TradeTable]:
+        ledger = self._ledger(title)
+        if ledger is None:
+            return None
+
+        return TransactionTable(ledger.transactions()).trades()
+
     def read_statistic(
         self,
         titles: List[str],
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> Dict[str, str]:
-        trades = []
+        tables = []
 
         for title in titles:
-            ts = self.read_trades(title)
-            if ts is not None and len(ts) > 0:
-                trades.extend(ts)
+            table = self.read_trade_table(title)
+            if table is not None and len(table) > 0:
+                tables.append(table)
+
+        if len(tables) == 0:
+            return {}
+
+        trades = TradeTable.concatenate(tables)
 
         if start_date is not None and end_date is not None:
 
-            s = datetime.strptime(start_date, "%Y%m%d")
-            e = datetime.strptime(end_date, "%Y%m%d")
+            s = np.datetime64(datetime.strptime(start_date, "%Y%m%d"), "us")
+            e = np.datetime64(datetime.strptime(end_date, "%Y%m%d"), "us")
 
-            trades = [t for t in trades if t.open_time() >= s and t.close_time() <= e]
+            trades = trades.select(
+                (trades.open_times() >= s) & (trades.close_times() <= e)
+            )
 
         if len(trades) > 0:
             return Statistic(trades).to_entity()
@@ -295,57 +415,11 @@ class TradingAgent:
     def open_positions(
         self, title: str, dtime: Optional[datetime] = None
     ) -> Optional[List[FuturesTransaction]]:
-        transactions = self.read_records(title)
-        if transactions is None:
+        ledger = self._ledger(title)
+        if ledger is None:
             return None
 
-        if dtime is not None:
-            transactions = [t for t in transactions if t.datetime() <= dtime]
-
-        last_time_stamp = 0.0
-
-        trades = self._process_trades(transactions)
-        if trades is not None:
-            last_date = trades[-1].close_time()
-            last_time_stamp = trades[-1].close_time_stamp()
-
-            if dtime is None:
-                op = []
-                for t in transactions:
-                    if t.datetime() > last_date:
-                        op.append(t)
-                    elif t.datetime() == last_date:
-                        if t.time_stamp() > last_time_stamp:
-                            op.append(t)
-                    else:
-                        continue
-            else:
-                op = []
-                for t in transactions:
-                    if t.datetime() > last_date:
-                        if t.datetime() < dtime:
-                            op.append(t)
-                    elif t.datetime() == last_date:
-                        if t.time_stamp() > last_time_stamp:
-                            if t.datetime() < dtime:
-                                op.append(t)
-                    else:
-                        continue
-
-            if len(op) > 0:
-                return op
-            else:
-                return None
-
-        else:
-            if dtime is None:
-                return transactions
-            else:
-                op = [t for t in transactions if t.datetime() <= dtime]
-                if len(op) > 0:
-                    return op
-                else:
-                    return None
+        return ledger.open_positions(dtime=dtime)
 
     def open_positions_virtual_pl(
         self, title: str, dtime: datetime, virtual_close: float
@@ -375,51 +449,38 @@ class TradingAgent:
     def open_positions_operation(
         self, title: str, dtime: Optional[datetime] = None
     ) -> Optional[str]:
-        op = self.open_positions(title, dtime=dtime)
-
-        if op is None:
+        ledger = self._ledger(title)
+        if ledger is None:
             return None
 
-        return op[0].operation()
+        return ledger.operation(dtime=dtime)
 
     def open_positions_leverage(
         self, title: str, dtime: Optional[datetime] = None
     ) -> Optional[float]:
-        op = self.open_positions(title, dtime=dtime)
-
-        if op is None:
+        ledger = self._ledger(title)
+        if ledger is None:
             return None
 
-        else:
-            return abs(sum([float(f"{t.operation()}{t.leverage()}") for t in op]))
+        return ledger.leverage(dtime=dtime)
 
     def open_positions_nominal_average_opening(
         self, title: str, dtime: Optional[datetime] = None
     ) -> Optional[float]:
-        ts = self.open_positions(title, dtime=dtime)
-        if ts is None:
+        ledger = self._ledger(title)
+        if ledger is None:
             return None
 
-        else:
-            return sum(
-                [t.price() for t in ts if t.operation() == ts[0].operation()]
-            ) / len([t for t in ts if t.operation() == ts[0].operation()])
+        return ledger.nominal_average_opening(dtime=dtime)
 
     def open_positions_leverage_average_opening(
         self, title: str, dtime: Optional[datetime] = None
     ) -> Optional[float]:
-        ts = self.open_positions(title, dtime=dtime)
-        if ts is None:
+        ledger = self._ledger(title)
+        if ledger is None:
             return None
 
-        else:
-            return sum(
-                [
-                    t.price() * t.leverage()
-                    for t in ts
-                    if t.operation() == ts[0].operation()
-                ]
-            ) / sum([t.leverage() for t in ts if t.operation() == ts[0].operation()])
+        return ledger.leverage_average_opening(dtime=dtime)
 
     def _process_trades(
         self, transactions: List[FuturesTransaction]
@@ -429,19 +490,9 @@ class TradingAgent:
             key=cmp_to_key(self._transaction_compare),
         )
 
-        ops = np.add.accumulate(
-            [float(f"{t.operation()}{t.leverage()}") for t in transactions]
-        )
-
-        where = np.argwhere(ops == 0).flatten()
-
-        trades: List[FuturesTrade] = []
-
-        for i, w in enumerate(where):
-            s = 0 if i == 0 else where[i - 1] + 1
-            e = w + 1
+        starts, ends = TransactionTable(transactions).segments()
 
-            trades.append(FuturesTrade(transactions[s:e]))
+        trades = [FuturesTrade(transactions[s:e]) for s, e in zip(starts, ends)]
 
         if len(trades) > 0:
             return trades
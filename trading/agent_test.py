@@ -2142,6 +2142,89 @@ class TestTradingAgent(unittest.TestCase):
 
         self._clean_root(root)
 
+    def test_books_cache(self):
+        root = os.path.join(
+            cast(str, os.getenv("HOME")),
+            "Documents",
+            "database",
+            "testing",
+            "json",
+            "books_cache",
+        )
+
+        self._check_root(root)
+
+        order = {
+            "datetime": "20190308",
+            "symbol": "ty",
+            "operation": "+",
+            "leverage": "1",
+            "price": "10000",
+        }
+
+        agent = TradingAgent(root, new_user=True)
+        agent.new_record("a", order, new_book=True)
+
+        books = agent.books()
+        self.assertEqual([b.title() for b in books], ["a"])
+        self.assertIs(agent.books()[0], books[0])
+
+        # books created by another agent on the same files are picked up
+        other = TradingAgent(root)
+        other.new_record("b", order, new_book=True)
+
+        path = next(
+            os.path.join(root, f) for f in os.listdir(root) if f.startswith("books_")
+        )
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertEqual([b.title() for b in agent.books()], ["a", "b"])
+        self.assertEqual(len(agent.read_records("b")), 1)
+
+        with self.assertRaises(ValueError):
+            agent.new_record("c", order)
+
+        self._clean_root(root)
+
+    def test_ledger_external_records(self):
+        root = os.path.join(
+            cast(str, os.getenv("HOME")),
+            "Documents",
+            "database",
+            "testing",
+            "json",
+            "ledger_external",
+        )
+
+        self._check_root(root)
+
+        order = {
+            "datetime": "20190308",
+            "symbol": "ty",
+            "operation": "+",
+            "leverage": "1",
+            "price": "10000",
+        }
+
+        agent = TradingAgent(root, new_user=True)
+        agent.new_record("a", order, new_book=True)
+        self.assertEqual(agent.open_positions_leverage("a"), 1.0)
+
+        # a record written by another agent before the next insert
+        TradingAgent(root).new_record("a", order)
+
+        path = os.path.join(root, f"records_{agent.books()[0].index()}.json")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        agent.new_record("a", order)
+
+        self.assertEqual(agent.open_positions_leverage("a"), 3.0)
+        self.assertEqual(len(agent.read_records("a")), 3)
+
+        self._clean_root(root)
+
 
 if __name__ == "__main__":
     unittest.main()
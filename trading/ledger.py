@@ -0,0 +1,188 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from fun.trading.transaction import FuturesTransaction
+
+
+def _signed(t: FuturesTransaction) -> float:
+    return t.leverage() if t.operation() == "+" else -t.leverage()
+
+
+def _order_time(t: FuturesTransaction) -> datetime:
+    return t.datetime() + timedelta(seconds=t.time_stamp())
+
+
+class PositionLedger:
+    def __init__(self, transactions: List[FuturesTransaction]) -> None:
+        # transactions ordered by datetime and then time stamp like in
+        # TradingAgent, everything below is kept per position in that order
+        self._transactions = sorted(
+            transactions, key=lambda t: (t.datetime(), t.time_stamp())
+        )
+        self._keys = [(t.datetime(), t.time_stamp()) for t in self._transactions]
+
+        for i in range(1, len(self._keys)):
+            if self._keys[i] == self._keys[i - 1]:
+                raise ValueError("find identical time stamp")
+
+        self._datetimes = [k[0] for k in self._keys]
+
+        # running signed leverage, a position with zero closes a trade
+        self._net: List[float] = []
+        self._flats: List[int] = []
+
+        # first position of the trade each position belongs to
+        self._starts: List[int] = []
+
+        # last position of the trade so far in the order of FuturesTrade, by
+        # datetime plus time stamp, the open positions come after it
+        self._lasts: List[int] = []
+
+        # running count, price, leverage and price * leverage of the
+        # transactions on the opening side of the trade
+        self._sums: List[Tuple[int, float, float, float]] = []
+
+        self._update(0)
+
+    def _update(self, start: int) -> None:
+        # positions before start are untouched, the rest is derived again
+        del self._net[start:]
+        del self._starts[start:]
+        del self._lasts[start:]
+        del self._sums[start:]
+        del self._flats[bisect_left(self._flats, start):]
+
+        for i in range(start, len(self._transactions)):
+            t = self._transactions[i]
+
+            if i == 0 or self._net[i - 1] == 0:
+                net = _signed(t)
+                s = i
+                last = i
+                sums = (0, 0.0, 0.0, 0.0)
+            else:
+                net = self._net[i - 1] + _signed(t)
+                s = self._starts[i - 1]
+                last = self._lasts[i - 1]
+                if _order_time(t) >= _order_time(self._transactions[last]):
+                    last = i
+                sums = self._sums[i - 1]
+
+            if t.operation() == self._transactions[s].operation():
+                count, price, leverage, weighted = sums
+                sums = (
+                    count + 1,
+                    price + t.price(),
+                    leverage + t.leverage(),
+                    weighted + t.price() * t.leverage(),
+                )
+
+            self._net.append(net)
+            self._starts.append(s)
+            self._lasts.append(last)
+            self._sums.append(sums)
+
+            if net == 0:
+                self._flats.append(i)
+
+    def insert(self, transaction: FuturesTransaction) -> None:
+        key = (transaction.datetime(), transaction.time_stamp())
+
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            raise ValueError("find identical time stamp")
+
+        self._transactions.insert(i, transaction)
+        self._keys.insert(i, key)
+        self._datetimes.insert(i, key[0])
+
+        self._update(i)
+
+    def transactions(self) -> List[FuturesTransaction]:
+        return list(self._transactions)
+
+    def _open(self, dtime: Optional[datetime]) -> Optional[Tuple[int, int]]:
+        # the transactions after the last closed trade, as of dtime they are
+        # the ones before dtime or, without any closed trade, up to dtime, a
+        # back-dated trade may leave some of its own transactions among them
+        if dtime is None:
+            end = len(self._transactions)
+            flats = len(self._flats)
+        else:
+            end = bisect_right(self._datetimes, dtime)
+            flats = bisect_left(self._flats, end)
+
+        if flats == 0:
+            start = 0
+        else:
+            start = self._lasts[self._flats[flats - 1]] + 1
+            if dtime is not None:
+                end = bisect_left(self._datetimes, dtime)
+
+        if start >= end:
+            return None
+
+        return start, end
+
+    def open_positions(
+        self, dtime: Optional[datetime] = None
+    ) -> Optional[List[FuturesTransaction]]:
+        bounds = self._open(dtime)
+        if bounds is None:
+            return None
+
+        start, end = bounds
+        return self._transactions[start:end]
+
+    def operation(self, dtime: Optional[datetime] = None) -> Optional[str]:
+        bounds = self._open(dtime)
+        if bounds is None:
+            return None
+
+        return self._transactions[bounds[0]].operation()
+
+    def leverage(self, dtime: Optional[datetime] = None) -> Optional[float]:
+        bounds = self._open(dtime)
+        if bounds is None:
+            return None
+
+        start, end = bounds
+        return abs(self._net[end - 1] - (self._net[start - 1] if start > 0 else 0.0))
+
+    def _opening(self, start: int, end: int) -> Tuple[int, float, float, float]:
+        if self._starts[end - 1] == start:
+            return self._sums[end - 1]
+
+        # the positions start inside a closed trade, sum them on their own
+        operation = self._transactions[start].operation()
+
+        count, price, leverage, weighted = 0, 0.0, 0.0, 0.0
+        for t in self._transactions[start:end]:
+            if t.operation() == operation:
+                count += 1
+                price += t.price()
+                leverage += t.leverage()
+                weighted += t.price() * t.leverage()
+
+        return count, price, leverage, weighted
+
+    def nominal_average_opening(
+        self, dtime: Optional[datetime] = None
+    ) -> Optional[float]:
+        bounds = self._open(dtime)
+        if bounds is None:
+            return None
+
+        count, price, _, _ = self._opening(*bounds)
+        return price / count
+
+    def leverage_average_opening(
+        self, dtime: Optional[datetime] = None
+    ) -> Optional[float]:
+        bounds = self._open(dtime)
+        if bounds is None:
+            return None
+
+        _, _, leverage, weighted = self._opening(*bounds)
+        return weighted / leverage
@@ -0,0 +1,155 @@
+import unittest
+from datetime import datetime
+
+from fun.trading.ledger import PositionLedger
+from fun.trading.transaction import FuturesTransaction
+from fun.utils.testing import parameterized
+
+
+def _transaction(date, operation, leverage, price, time_stamp):
+    return FuturesTransaction(
+        dtime=datetime.strptime(date, "%Y%m%d"),
+        symbol="ty",
+        operation=operation,
+        leverage=leverage,
+        price=price,
+        time_stamp=time_stamp,
+    )
+
+
+class TestPositionLedger(unittest.TestCase):
+    @parameterized(
+        [
+            {
+                "dtime": None,
+                "expected": {
+                    "length": 2,
+                    "operation": "-",
+                    "leverage": 1.0,
+                    "nominal": 140.0,
+                    "weighted": 140.0,
+                },
+            },
+            {
+                "dtime": "20190309",
+                "expected": {
+                    "length": 2,
+                    "operation": "-",
+                    "leverage": 1.0,
+                    "nominal": 140.0,
+                    "weighted": 140.0,
+                },
+            },
+            {
+                "dtime": "20190305",
+                "expected": {
+                    "length": 3,
+                    "operation": "+",
+                    "leverage": 2.0,
+                    "nominal": 110.0,
+                    "weighted": 340.0 / 3.0,
+                },
+            },
+            {"dtime": "20190306", "expected": None},
+            {"dtime": "20190308", "expected": None},
+            {"dtime": "20190301", "expected": None},
+        ]
+    )
+    def test_open_positions(self, dtime, expected):
+        transactions = [
+            _transaction("20190308", "+", 1, 160, 8),
+            _transaction("20190304", "+", 1, 100, 1),
+            _transaction("20190305", "+", 2, 120, 2),
+            _transaction("20190306", "-", 2, 130, 3),
+            _transaction("20190305", "-", 1, 90, 4),
+            _transaction("20190308", "-", 2, 140, 7),
+        ]
+
+        ledger = PositionLedger(transactions[:4])
+        for t in transactions[4:]:
+            ledger.insert(t)
+
+        self.assertEqual(
+            [t.time_stamp() for t in ledger.transactions()], [1, 2, 4, 3, 7, 8]
+        )
+
+        d = None if dtime is None else datetime.strptime(dtime, "%Y%m%d")
+
+        if expected is None:
+            self.assertIsNone(ledger.open_positions(d))
+            self.assertIsNone(ledger.operation(d))
+            self.assertIsNone(ledger.leverage(d))
+            return
+
+        self.assertEqual(len(ledger.open_positions(d)), expected["length"])
+        self.assertEqual(ledger.operation(d), expected["operation"])
+        self.assertEqual(ledger.leverage(d), expected["leverage"])
+        self.assertEqual(ledger.nominal_average_opening(d), expected["nominal"])
+        self.assertEqual(ledger.leverage_average_opening(d), expected["weighted"])
+
+    @parameterized(
+        [
+            {
+                "dtime": None,
+                "expected": {
+                    "length": 3,
+                    "operation": "-",
+                    "leverage": 1.0,
+                    "nominal": 110.0,
+                    "weighted": 110.0,
+                },
+            },
+            {
+                "dtime": "20190307",
+                "expected": {
+                    "length": 2,
+                    "operation": "-",
+                    "leverage": 0.0,
+                    "nominal": 110.0,
+                    "weighted": 110.0,
+                },
+            },
+            {"dtime": "20190305", "expected": None},
+        ]
+    )
+    def test_back_dated_trade(self, dtime, expected):
+        # the opening transaction is entered days after its date, in the order
+        # of FuturesTrade it is the last one of the trade and the closing one
+        # stays among the open positions like before the ledger
+        ledger = PositionLedger(
+            [
+                _transaction("20190304", "+", 1, 100, 5 * 86400),
+                _transaction("20190305", "-", 1, 110, 2),
+                _transaction("20190306", "+", 1, 120, 3),
+                _transaction("20190307", "+", 1, 130, 4),
+            ]
+        )
+
+        d = None if dtime is None else datetime.strptime(dtime, "%Y%m%d")
+
+        if expected is None:
+            self.assertIsNone(ledger.open_positions(d))
+            return
+
+        self.assertEqual(len(ledger.open_positions(d)), expected["length"])
+        self.assertEqual(ledger.operation(d), expected["operation"])
+        self.assertEqual(ledger.leverage(d), expected["leverage"])
+        self.assertEqual(ledger.nominal_average_opening(d), expected["nominal"])
+        self.assertEqual(ledger.leverage_average_opening(d), expected["weighted"])
+
+    def test_identical_time_stamp(self):
+        with self.assertRaises(ValueError):
+            PositionLedger(
+                [
+                    _transaction("20190304", "+", 1, 100, 1),
+                    _transaction("20190304", "-", 1, 100, 1),
+                ]
+            )
+
+        ledger = PositionLedger([_transaction("20190304", "+", 1, 100, 1)])
+        with self.assertRaises(ValueError):
+            ledger.insert(_transaction("20190304", "-", 1, 100, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
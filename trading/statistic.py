@@ -2,341 +2,186 @@ from __future__ import annotations
 
 import math
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Union
 
+import numpy as np
+from fun.trading.table import TradeTable
 from fun.trading.trade import FuturesTrade
 
 
 class Statistic:
     _float_decimals = 2
 
-    def __init__(self, trades: List[FuturesTrade]) -> None:
+    def __init__(self, trades: Union[List[FuturesTrade], TradeTable]) -> None:
 
         if len(trades) == 0:
             raise ValueError("empty statistic trades")
 
-        self._trades = trades
-
-        self._winners: List[FuturesTrade] = []
-        self._losers: List[FuturesTrade] = []
-
-        self._long: List[FuturesTrade] = []
-        self._short: List[FuturesTrade] = []
-
-        self._long_winners: List[FuturesTrade] = []
-        self._long_losers: List[FuturesTrade] = []
-
-        self._short_winners: List[FuturesTrade] = []
-        self._short_losers: List[FuturesTrade] = []
-
-        for trade in self._trades:
-            if trade.nominal_pl() > 0:
-                self._winners.append(trade)
-            elif trade.nominal_pl() < 0:
-                self._losers.append(trade)
-
-            if trade.operation() == "+":
-                self._long.append(trade)
-            elif trade.operation() == "-":
-                self._short.append(trade)
-
-            if trade.operation() == "+" and trade.nominal_pl() > 0:
-                self._long_winners.append(trade)
-            elif trade.operation() == "+" and trade.nominal_pl() < 0:
-                self._long_losers.append(trade)
+        # every trade is read once into columns, each metric below is a masked
+        # reduction over them computed here
+        if isinstance(trades, TradeTable):
+            nominal = trades.nominal_pls()
+            leveraged = trades.leveraged_pls()
+            signs = trades.signs()
+            open_times = trades.open_times()
+            close_times = trades.close_times()
+        else:
+            nominal = np.array([t.nominal_pl() for t in trades], dtype=np.float64)
+            leveraged = nominal * np.array(
+                [t.leverage() for t in trades], dtype=np.float64
+            )
+            signs = np.array(
+                [1 if t.operation() == "+" else -1 for t in trades], dtype=np.int8
+            )
+            open_times = np.array(
+                [t.open_time() for t in trades], dtype="datetime64[us]"
+            )
+            close_times = np.array(
+                [t.close_time() for t in trades], dtype="datetime64[us]"
+            )
+
+        start: datetime = open_times.min().item()
+        end: datetime = close_times.max().item()
+
+        self._start = start
+        self._end = end
+
+        holding = (close_times - open_times) // np.timedelta64(1, "D")
+
+        sides = {
+            "all": np.ones(len(signs), dtype=bool),
+            "long": signs > 0,
+            "short": signs < 0,
+        }
+        results = {"winners": nominal > 0, "losers": nominal < 0}
+
+        self._totals: Dict[str, int] = {}
+        self._counts: Dict[str, int] = {}
+        self._means: Dict[str, float] = {}
+
+        for side, on_side in sides.items():
+            self._totals[side] = int(np.count_nonzero(on_side))
+
+            for result, won in results.items():
+                mask = on_side & won
+                count = int(np.count_nonzero(mask))
+
+                key = f"{result}_{side}"
+                self._counts[key] = count
+
+                for name, values in (
+                    ("holding", holding),
+                    ("nominal", nominal),
+                    ("leveraged", leveraged),
+                ):
+                    self._means[f"{key}_{name}"] = (
+                        float(np.sum(values[mask])) / float(count)
+                        if count > 0
+                        else math.nan
+                    )
+
+    def _batting_average(self, side: str) -> float:
+        length = self._totals[side]
+        if length == 0:
+            return math.nan
 
-            if trade.operation() == "-" and trade.nominal_pl() > 0:
-                self._short_winners.append(trade)
-            elif trade.operation() == "-" and trade.nominal_pl() < 0:
-                self._short_losers.append(trade)
+        return float(self._counts[f"winners_{side}"]) / float(length)
 
     def statistic_start(self) -> datetime:
-        return sorted([t.open_time() for t in self._trades])[0]
+        return self._start
 
     def statistic_end(self) -> datetime:
-        return sorted([t.close_time() for t in self._trades])[-1]
+        return self._end
 
     def total_trades(self) -> int:
-        return len(self._trades)
+        return self._totals["all"]
 
     def total_long_trades(self) -> int:
-        return len(self._long)
+        return self._totals["long"]
 
     def total_short_trades(self) -> int:
-        return len(self._short)
+        return self._totals["short"]
 
     def number_of_winners(self) -> int:
-        return len(self._winners)
+        return self._counts["winners_all"]
 
     def number_of_long_winners(self) -> int:
-        return len(self._long_winners)
+        return self._counts["winners_long"]
 
     def number_of_short_winners(self) -> int:
-        return len(self._short_winners)
+        return self._counts["winners_short"]
 
     def number_of_losers(self) -> int:
-        return len(self._losers)
+        return self._counts["losers_all"]
 
     def number_of_long_losers(self) -> int:
-        return len(self._long_losers)
+        return self._counts["losers_long"]
 
     def number_of_short_losers(self) -> int:
-        return len(self._short_losers)
+        return self._counts["losers_short"]
 
     def batting_average(self) -> float:
-        length = self.total_trades()
-        if length == 0:
-            return math.nan
-
-        return float(self.number_of_winners()) / float(length)
+        return self._batting_average("all")
 
     def batting_average_long(self) -> float:
-        length = self.total_long_trades()
-        if length == 0:
-            return math.nan
-
-        return float(self.number_of_long_winners()) / float(length)
+        return self._batting_average("long")
 
     def batting_average_short(self) -> float:
-        length = self.total_short_trades()
-        if length == 0:
-            return math.nan
-
-        return float(self.number_of_short_winners()) / float(length)
+        return self._batting_average("short")
 
     def winners_holding_mean(self) -> float:
-        length = self.number_of_winners()
-        trades = self._winners
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["winners_all_holding"]
 
     def winners_holding_mean_long(self) -> float:
-        length = self.number_of_long_winners()
-        trades = self._long_winners
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["winners_long_holding"]
 
     def winners_holding_mean_short(self) -> float:
-        length = self.number_of_short_winners()
-        trades = self._short_winners
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["winners_short_holding"]
 
     def losers_holding_mean(self) -> float:
-        length = self.number_of_losers()
-        trades = self._losers
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["losers_all_holding"]
 
     def losers_holding_mean_long(self) -> float:
-        length = self.number_of_long_losers()
-        trades = self._long_losers
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["losers_long_holding"]
 
     def losers_holding_mean_short(self) -> float:
-        length = self.number_of_short_losers()
-        trades = self._short_losers
-
-        if length == 0:
-            return math.nan
-
-        days = 0
-        for t in trades:
-            days += (t.close_time() - t.open_time()).days
-
-        return float(days) / float(length)
+        return self._means["losers_short_holding"]
 
     def winners_nominal_pl_mean(self) -> float:
-        length = self.number_of_winners()
-        trades = self._winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["winners_all_nominal"]
 
     def winners_nominal_pl_mean_long(self) -> float:
-        length = self.number_of_long_winners()
-        trades = self._long_winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["winners_long_nominal"]
 
     def winners_nominal_pl_mean_short(self) -> float:
-        length = self.number_of_short_winners()
-        trades = self._short_winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["winners_short_nominal"]
 
     def winners_leveraged_pl_mean(self) -> float:
-        length = self.number_of_winners()
-        trades = self._winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["winners_all_leveraged"]
 
     def winners_leveraged_pl_mean_long(self) -> float:
-        length = self.number_of_long_winners()
-        trades = self._long_winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["winners_long_leveraged"]
 
     def winners_leveraged_pl_mean_short(self) -> float:
-        length = self.number_of_short_winners()
-        trades = self._short_winners
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["winners_short_leveraged"]
 
     def losers_nominal_pl_mean(self) -> float:
-        length = self.number_of_losers()
-        trades = self._losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["losers_all_nominal"]
 
     def losers_nominal_pl_mean_long(self) -> float:
-        length = self.number_of_long_losers()
-        trades = self._long_losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["losers_long_nominal"]
 
     def losers_nominal_pl_mean_short(self) -> float:
-        length = self.number_of_short_losers()
-        trades = self._short_losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.nominal_pl()
-
-        return s / float(length)
+        return self._means["losers_short_nominal"]
 
     def losers_leveraged_pl_mean(self) -> float:
-        length = self.number_of_losers()
-        trades = self._losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["losers_all_leveraged"]
 
     def losers_leveraged_pl_mean_long(self) -> float:
-        length = self.number_of_long_losers()
-        trades = self._long_losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["losers_long_leveraged"]
 
     def losers_leveraged_pl_mean_short(self) -> float:
-        length = self.number_of_short_losers()
-        trades = self._short_losers
-
-        if length == 0:
-            return math.nan
-
-        s = 0.0
-        for o in trades:
-            s += o.leveraged_pl()
-
-        return s / float(length)
+        return self._means["losers_short_leveraged"]
 
     def nominal_win_loss_ratio(self) -> float:
         return self.winners_nominal_pl_mean() / abs(self.losers_nominal_pl_mean())
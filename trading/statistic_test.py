@@ -3,6 +3,7 @@ import unittest
 from datetime import datetime
 
 from fun.trading.statistic import Statistic
+from fun.trading.table import TransactionTable
 from fun.trading.trade import FuturesTrade
 from fun.trading.transaction import FuturesTransaction
 from fun.utils.testing import parameterized
@@ -653,6 +654,40 @@ class TestStatistic(unittest.TestCase):
             expect["losers_leveraged_pl_mean_short"],
         )
 
+    def test_trade_table(self):
+        orders = [
+            ("20190104", "+", 1, 100),
+            ("20190107", "-", 1, 99),
+            ("20190204", "-", 2, 100),
+            ("20190205", "+", 1, 95),
+            ("20190211", "+", 1, 97),
+            ("20190301", "+", 1, 100),
+            ("20190305", "-", 1, 110),
+        ]
+
+        transactions = [
+            FuturesTransaction(
+                dtime=datetime.strptime(o[0], "%Y%m%d"),
+                symbol="es",
+                operation=o[1],
+                leverage=o[2],
+                price=o[3],
+                time_stamp=i + 1,
+            )
+            for i, o in enumerate(orders)
+        ]
+
+        trades = [
+            FuturesTrade(transactions[0:2]),
+            FuturesTrade(transactions[2:5]),
+            FuturesTrade(transactions[5:7]),
+        ]
+
+        self.assertEqual(
+            Statistic(TransactionTable(transactions).trades()).to_entity(),
+            Statistic(trades).to_entity(),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
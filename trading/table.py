@@ -0,0 +1,213 @@
+from datetime import timedelta
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from fun.trading.transaction import FuturesTransaction
+
+
+class TradeTable:
+    def __init__(
+        self,
+        symbols: np.ndarray,
+        signs: np.ndarray,
+        leverages: np.ndarray,
+        open_times: np.ndarray,
+        close_times: np.ndarray,
+        average_opens: np.ndarray,
+        average_closes: np.ndarray,
+    ) -> None:
+        # one row per trade, average open and close carry the same signs as
+        # in FuturesTrade so their sum is the gain of the trade
+        self._symbols = symbols
+        self._signs = signs
+        self._leverages = leverages
+        self._open_times = open_times
+        self._close_times = close_times
+        self._average_opens = average_opens
+        self._average_closes = average_closes
+
+        self._nominal_pls: np.ndarray = (average_closes + average_opens) / np.abs(
+            average_opens
+        )
+
+    @classmethod
+    def concatenate(cls, tables: Sequence["TradeTable"]) -> "TradeTable":
+        return cls(
+            np.concatenate([t._symbols for t in tables]),
+            np.concatenate([t._signs for t in tables]),
+            np.concatenate([t._leverages for t in tables]),
+            np.concatenate([t._open_times for t in tables]),
+            np.concatenate([t._close_times for t in tables]),
+            np.concatenate([t._average_opens for t in tables]),
+            np.concatenate([t._average_closes for t in tables]),
+        )
+
+    def __len__(self) -> int:
+        return len(self._signs)
+
+    def select(self, mask: np.ndarray) -> "TradeTable":
+        return TradeTable(
+            self._symbols[mask],
+            self._signs[mask],
+            self._leverages[mask],
+            self._open_times[mask],
+            self._close_times[mask],
+            self._average_opens[mask],
+            self._average_closes[mask],
+        )
+
+    def symbols(self) -> np.ndarray:
+        return self._symbols
+
+    def signs(self) -> np.ndarray:
+        return self._signs
+
+    def leverages(self) -> np.ndarray:
+        return self._leverages
+
+    def open_times(self) -> np.ndarray:
+        return self._open_times
+
+    def close_times(self) -> np.ndarray:
+        return self._close_times
+
+    def average_opens(self) -> np.ndarray:
+        return self._average_opens
+
+    def average_closes(self) -> np.ndarray:
+        return self._average_closes
+
+    def nominal_pls(self) -> np.ndarray:
+        return self._nominal_pls
+
+    def leveraged_pls(self) -> np.ndarray:
+        leveraged: np.ndarray = self._nominal_pls * self._leverages
+        return leveraged
+
+
+class TransactionTable:
+    def __init__(self, transactions: List[FuturesTransaction]) -> None:
+        # columns of the transactions in the order they are given, callers
+        # sort them like TradingAgent does before trades are segmented
+        self._datetimes = np.array(
+            [t.datetime() for t in transactions], dtype="datetime64[us]"
+        )
+        self._time_stamps = np.array(
+            [t.time_stamp() for t in transactions], dtype=np.float64
+        )
+        self._signs = np.array(
+            [1 if t.operation() == "+" else -1 for t in transactions], dtype=np.int8
+        )
+        self._leverages = np.array(
+            [t.leverage() for t in transactions], dtype=np.float64
+        )
+        self._prices = np.array([t.price() for t in transactions], dtype=np.float64)
+
+        # FuturesTrade orders its transactions by datetime plus time stamp,
+        # which decides the side and the times of each trade
+        self._order_times = np.array(
+            [t.datetime() + timedelta(seconds=t.time_stamp()) for t in transactions],
+            dtype="datetime64[us]",
+        )
+
+        names, codes = np.unique(
+            np.array([t.symbol() for t in transactions], dtype=str),
+            return_inverse=True,
+        )
+        self._names = names
+        self._codes = codes
+
+    def __len__(self) -> int:
+        return len(self._signs)
+
+    def datetimes(self) -> np.ndarray:
+        return self._datetimes
+
+    def time_stamps(self) -> np.ndarray:
+        return self._time_stamps
+
+    def signs(self) -> np.ndarray:
+        return self._signs
+
+    def leverages(self) -> np.ndarray:
+        return self._leverages
+
+    def prices(self) -> np.ndarray:
+        return self._prices
+
+    def symbols(self) -> np.ndarray:
+        return self._names[self._codes]
+
+    def net(self) -> np.ndarray:
+        return np.add.accumulate(self._signs * self._leverages)
+
+    def segments(self) -> Tuple[np.ndarray, np.ndarray]:
+        # a trade ends wherever the position is flat again, transactions after
+        # the last flat position are still open and belong to no trade
+        ends = np.flatnonzero(self.net() == 0) + 1
+        starts = np.zeros_like(ends)
+        starts[1:] = ends[:-1]
+
+        return starts, ends
+
+    def trades(self) -> TradeTable:
+        starts, ends = self.segments()
+
+        if len(starts) == 0:
+            empty = np.array([], dtype=np.float64)
+            times = np.array([], dtype="datetime64[us]")
+
+            return TradeTable(
+                np.array([], dtype=str),
+                np.array([], dtype=np.int8),
+                empty,
+                times,
+                times,
+                empty,
+                empty,
+            )
+
+        covered = ends[-1]
+
+        codes = self._codes[:covered]
+        if np.any(
+            np.minimum.reduceat(codes, starts) != np.maximum.reduceat(codes, starts)
+        ):
+            raise ValueError("mismatch symbol in orders")
+
+        trade = np.repeat(np.arange(len(starts)), ends - starts)
+
+        # first and last transaction of each trade in the order of FuturesTrade,
+        # they differ from starts and ends only for back-dated transactions
+        order = np.lexsort((self._order_times[:covered], trade))
+        firsts = order[starts]
+        lasts = order[ends - 1]
+
+        signs = self._signs[firsts]
+        opening = self._signs[:covered] == signs[trade]
+
+        leverages = self._leverages[:covered]
+        values = self._prices[:covered] * leverages
+
+        open_leverages = np.add.reduceat(np.where(opening, leverages, 0.0), starts)
+        close_leverages = np.add.reduceat(np.where(opening, 0.0, leverages), starts)
+
+        average_opens = (
+            np.add.reduceat(np.where(opening, values, 0.0), starts) / open_leverages
+        )
+        average_closes = (
+            np.add.reduceat(np.where(opening, 0.0, values), starts) / close_leverages
+        )
+
+        average_opens = np.where(signs > 0, -average_opens, average_opens)
+        average_closes = np.where(signs < 0, -average_closes, average_closes)
+
+        return TradeTable(
+            self._names[codes[starts]],
+            signs,
+            open_leverages,
+            self._datetimes[firsts],
+            self._datetimes[lasts],
+            average_opens,
+            average_closes,
+        )
@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime
+
+import numpy as np
+from fun.trading.table import TransactionTable
+from fun.trading.trade import FuturesTrade
+from fun.trading.transaction import FuturesTransaction
+from fun.utils.testing import parameterized
+
+
+def _transactions(orders):
+    return [
+        FuturesTransaction(
+            dtime=datetime.strptime(o[0], "%Y%m%d"),
+            symbol=o[1],
+            operation=o[2],
+            leverage=o[3],
+            price=o[4],
+            time_stamp=o[5] if len(o) > 5 else i + 1,
+        )
+        for i, o in enumerate(orders)
+    ]
+
+
+class TestTransactionTable(unittest.TestCase):
+    @parameterized(
+        [
+            {"orders": [], "segments": []},
+            {
+                "orders": [
+                    ("20190304", "ty", "+", 1, 100),
+                    ("20190305", "ty", "+", 2, 110),
+                    ("20190306", "ty", "-", 3, 120),
+                    ("20190307", "es", "-", 1.5, 3000),
+                    ("20190308", "es", "+", 0.5, 2900),
+                    ("20190311", "es", "+", 1, 2950),
+                    ("20190312", "ty", "+", 1, 130),
+                ],
+                "segments": [(0, 3), (3, 6)],
+            },
+            {
+                # the first transaction is entered days after its date, so
+                # FuturesTrade opens the trade with the second one
+                "orders": [
+                    ("20190304", "ty", "+", 1, 100, 5 * 86400),
+                    ("20190305", "ty", "-", 1, 110),
+                    ("20190306", "ty", "+", 2, 120),
+                    ("20190307", "ty", "-", 2, 130),
+                ],
+                "segments": [(0, 2), (2, 4)],
+            },
+        ]
+    )
+    def test_trades(self, orders, segments):
+        transactions = _transactions(orders)
+        table = TransactionTable(transactions)
+
+        self.assertEqual(len(table), len(orders))
+
+        starts, ends = table.segments()
+        self.assertEqual(list(zip(starts, ends)), segments)
+
+        trades = table.trades()
+        self.assertEqual(len(trades), len(segments))
+
+        for i, (s, e) in enumerate(segments):
+            trade = FuturesTrade(transactions[s:e])
+
+            self.assertEqual(trades.symbols()[i], trade.symbol())
+            self.assertEqual("+" if trades.signs()[i] > 0 else "-", trade.operation())
+            self.assertEqual(trades.leverages()[i], trade.leverage())
+            self.assertEqual(
+                trades.open_times()[i], np.datetime64(trade.open_time(), "us")
+            )
+            self.assertEqual(
+                trades.close_times()[i], np.datetime64(trade.close_time(), "us")
+            )
+            self.assertAlmostEqual(trades.average_opens()[i], trade.average_open())
+            self.assertAlmostEqual(trades.average_closes()[i], trade.average_close())
+            self.assertAlmostEqual(trades.nominal_pls()[i], trade.nominal_pl())
+            self.assertAlmostEqual(trades.leveraged_pls()[i], trade.leveraged_pl())
+
+    def test_mismatch_symbol(self):
+        table = TransactionTable(
+            _transactions(
+                [("20190304", "ty", "+", 1, 100), ("20190305", "es", "-", 1, 110)]
+            )
+        )
+
+        with self.assertRaises(ValueError):
+            table.trades()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,47 +1,643 @@
+import hashlib
 import json
 import os
-from typing import Dict, List, Optional
+import time
+from contextlib import contextmanager, nullcontext
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from fun.utils import colors, pretty
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
+
+_KEY = Tuple[str, str]
+_STAT = Tuple[int, int, int]
+_SIGNATURE = Tuple[Optional[_STAT], Optional[_STAT]]
+
+# journals smaller than this are never compacted, whatever the snapshot size
+_MIN_COMPACT_SIZE = 64 * 1024
+
+
+def _digest(content: bytes) -> str:
+    return hashlib.sha1(content).hexdigest()
+
+
+def _match(entity: Dict[str, str], query: Dict[str, str]) -> bool:
+    for k, v in query.items():
+        if entity.get(k, None) != v:
+            return False
+
+    return True
+
+
+class _Collection:
+    def __init__(
+        self,
+        entities: List[Dict[str, str]],
+        signature: _SIGNATURE,
+        snapshot: str,
+        fields: Sequence[str] = (),
+    ) -> None:
+        # rows are keyed by an increasing id, a dict keeps them in insertion
+        # order and replacing a row keeps its place
+        self._rows: Dict[int, Dict[str, str]] = {}
+        self._next = 0
+
+        # field -> value -> ids of the rows holding that value
+        self._indexes: Dict[str, Dict[str, Set[int]]] = {f: {} for f in fields}
+
+        for entity in entities:
+            self._add(entity)
+
+        # (inode, mtime, size) of the snapshot and the journal the entities
+        # were read from or last written to, None for a file that does not exist
+        self.signature = signature
+
+        # moves on every load and mutation of the resident collection
+        self.version = 0
+
+        # digest of the snapshot a journal on top of it has to start from
+        self.snapshot = snapshot
+
+    def _index(self, rid: int, entity: Dict[str, str]) -> None:
+        for field, index in self._indexes.items():
+            value = entity.get(field, None)
+            if value is not None:
+                index.setdefault(value, set()).add(rid)
+
+    def _unindex(self, rid: int, entity: Dict[str, str]) -> None:
+        for field, index in self._indexes.items():
+            value = entity.get(field, None)
+            if value is None:
+                continue
+
+            rids = index[value]
+            rids.discard(rid)
+            if len(rids) == 0:
+                del index[value]
+
+    def _add(self, entity: Dict[str, str]) -> None:
+        rid = self._next
+        self._next += 1
+
+        self._rows[rid] = entity
+        self._index(rid, entity)
+
+    def _candidates(self, query: Dict[str, str]) -> Optional[List[int]]:
+        candidates: Optional[Set[int]] = None
+
+        for field, value in query.items():
+            index = self._indexes.get(field, None)
+            if index is None or value is None:
+                continue
+
+            rids = index.get(value, set())
+            if candidates is None or len(rids) < len(candidates):
+                candidates = rids
+
+        if candidates is None:
+            return None
+
+        return sorted(candidates)
+
+    def _find(self, query: Dict[str, str]) -> Iterator[int]:
+        candidates = self._candidates(query)
+        if candidates is None:
+            return (rid for rid, e in self._rows.items() if _match(e, query))
+
+        return (rid for rid in candidates if _match(self._rows[rid], query))
+
+    def entities(self) -> List[Dict[str, str]]:
+        return list(self._rows.values())
+
+    def find(self, query: Dict[str, str]) -> List[Dict[str, str]]:
+        return [self._rows[rid] for rid in self._find(query)]
+
+    def apply(self, record: Dict[str, Any]) -> None:
+        op = record["op"]
+
+        if op == "insert":
+            for entity in record["entities"]:
+                self._add(dict(entity))
+            return
+
+        if op not in ("replace", "delete"):
+            raise ValueError(f"invalid journal operation: {op}")
+
+        rid = next(self._find(record["query"]), None)
+        if rid is None:
+            return
+
+        self._unindex(rid, self._rows[rid])
+
+        if op == "replace":
+            entity = dict(record["entity"])
+            self._rows[rid] = entity
+            self._index(rid, entity)
+        else:
+            del self._rows[rid]
+
+
+class _FileLock:
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+        self._fd: Optional[int] = None
+        self._exclusive = False
+        self._count = 0
+
+    def acquire(self, exclusive: bool, timeout: float) -> None:
+        # held locks are reentrant, a shared lock can be taken under an
+        # exclusive one but not the other way around
+        if self._count > 0:
+            if exclusive and not self._exclusive:
+                raise ValueError(f"can not upgrade the shared lock on {self._path}")
+
+            self._count += 1
+            return
+
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"timed out waiting for the lock on {self._path}")
+
+                time.sleep(0.005)
+
+        self._fd = fd
+        self._exclusive = exclusive
+        self._count = 1
+
+    def release(self) -> None:
+        assert self._count > 0
+        assert self._fd is not None
+
+        self._count -= 1
+        if self._count > 0:
+            return
+
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+
+        self._fd = None
+
 
 class JsonDB:
-    def __init__(self, database_root: str) -> None:
+    def __init__(
+        self,
+        database_root: str,
+        sync: bool = True,
+        flush_every: int = 100,
+        journal: bool = False,
+        compact_ratio: float = 1.0,
+        indexes: Optional[Mapping[str, Sequence[str]]] = None,
+        locking: bool = True,
+        lock_timeout: float = 10.0,
+    ) -> None:
 
         assert database_root != ""
         assert os.path.exists(database_root)
+        assert flush_every > 0
+        assert compact_ratio > 0
+        assert lock_timeout >= 0
 
         self._database_root = database_root
 
-        self._database: List[Dict[str, str]] = []
+        # with sync every mutation is written through, otherwise mutated
+        # collections are only marked dirty and written in batches, on flush
+        # or when leaving the context
+        self._sync = sync
+        self._flush_every = flush_every
+
+        # in journal mode mutations are appended to <database>_<collection>.ndjson
+        # and folded into the json snapshot once the journal outgrows it by
+        # compact_ratio, a journal left behind is replayed in either mode
+        self._journal = journal
+        self._compact_ratio = compact_ratio
+
+        # fields to keep hash indexes on, keyed by "<database>" for every
+        # collection of a database or by "<database>_<collection>"
+        self._indexes: Mapping[str, Sequence[str]] = (
+            indexes if indexes is not None else {}
+        )
+
+        self._collections: Dict[_KEY, _Collection] = {}
+        self._dirty: Set[_KEY] = set()
+        self._pending = 0
+
+        self._depth = 0
+        self._staged: Set[_KEY] = set()
+
+        self._records: Dict[_KEY, List[Dict[str, Any]]] = {}
+
+        # advisory locks on .<database>_<collection>.lock guard other
+        # processes sharing the root, reads take a shared lock and writes an
+        # exclusive one that is held from re-reading the files to writing
+        # them back, so concurrent writers can not lose each other's updates
+        self._locking = locking and fcntl is not None
+        self._lock_timeout = lock_timeout
+
+        self._locks: Dict[_KEY, _FileLock] = {}
+        self._held: List[_KEY] = []
+
+        self._versions = 0
+
+    def __enter__(self) -> "JsonDB":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.flush()
 
     def _path(self, database: str, collection: str) -> str:
         return os.path.join(self._database_root, f"{database}_{collection}.json")
 
-    def _read(self, database: str, collection: str) -> None:
-        path = self._path(database, collection)
+    def _journal_path(self, database: str, collection: str) -> str:
+        return os.path.join(self._database_root, f"{database}_{collection}.ndjson")
 
-        if os.path.exists(path):
-            with open(path, "r") as f:
-                self._database = json.load(f)
-        else:
-            self._database = []
-            # raise ValueError(
-            # f"database: {database} and collection: {collection} do not exist"
-            # )
+    def _lock_path(self, database: str, collection: str) -> str:
+        return os.path.join(self._database_root, f".{database}_{collection}.lock")
 
-    def _write(self, database: str, collection: str) -> None:
-        path = self._path(database, collection)
+    def _stat(self, path: str) -> Optional[_STAT]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        # snapshots are swapped in with os.replace, so the inode changes on
+        # every rewrite even when mtime and size do not
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _signature(self, key: _KEY) -> _SIGNATURE:
+        return (self._stat(self._path(*key)), self._stat(self._journal_path(*key)))
+
+    def _acquire(
+        self, key: _KEY, exclusive: bool, timeout: Optional[float] = None
+    ) -> None:
+        lock = self._locks.get(key, None)
+        if lock is None:
+            lock = _FileLock(self._lock_path(*key))
+            self._locks[key] = lock
+
+        lock.acquire(exclusive, self._lock_timeout if timeout is None else timeout)
+
+    def _release(self, key: _KEY) -> None:
+        self._locks[key].release()
+
+    @contextmanager
+    def _locked_keys(self, keys: List[_KEY], exclusive: bool) -> Iterator[None]:
+        # always taken in sorted order so writers of the same collections
+        # can not deadlock each other
+        acquired: List[_KEY] = []
+
+        try:
+            for key in sorted(keys):
+                self._acquire(key, exclusive)
+                acquired.append(key)
+
+            yield
+        finally:
+            for key in reversed(acquired):
+                self._release(key)
+
+    def _locked(self, keys: List[_KEY], exclusive: bool) -> ContextManager[None]:
+        if not self._locking:
+            return nullcontext()
+
+        return self._locked_keys(keys, exclusive)
+
+    def _fields(self, key: _KEY) -> Sequence[str]:
+        database, collection = key
+
+        fields = self._indexes.get(f"{database}_{collection}", None)
+        if fields is None:
+            fields = self._indexes.get(database, ())
+
+        return fields
+
+    def _load(self, key: _KEY, signature: _SIGNATURE) -> _Collection:
+        entities: List[Dict[str, str]] = []
+        snapshot = _digest(b"")
+
+        if signature[0] is not None:
+            with open(self._path(*key), "rb") as f:
+                content = f.read()
+
+            entities = json.loads(content)
+            snapshot = _digest(content)
+
+        cached = _Collection(entities, signature, snapshot, self._fields(key))
+
+        if signature[1] is not None:
+            with open(self._journal_path(*key), "r") as f:
+                lines = f.read().split("\n")
+
+            # a header without its newline was torn like any last line
+            header = json.loads(lines[0]) if len(lines) > 1 else {}
+
+            # a journal of an older snapshot has already been compacted
+            if header.get("snapshot", None) == snapshot:
+                for i, line in enumerate(lines[1:]):
+                    if line == "":
+                        continue
+
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # only the last append can be torn by a crash
+                        if i == len(lines) - 2:
+                            break
+                        raise
+
+                    cached.apply(record)
+
+        return cached
+
+    def _read(self, database: str, collection: str) -> _Collection:
+        key = (database, collection)
+
+        cached = self._collections.get(key, None)
+
+        # unflushed changes win over the files
+        if cached is not None and (key in self._dirty or key in self._staged):
+            return cached
+
+        signature = self._signature(key)
+
+        if cached is not None and cached.signature == signature:
+            return cached
+
+        with self._locked([key], False):
+            signature = self._signature(key)
+
+            cached = self._load(key, signature)
+            self._collections[key] = cached
+
+        self._versions += 1
+        cached.version = self._versions
+
+        return cached
+
+    def _prepare_snapshot(self, key: _KEY) -> Tuple[str, str]:
+        path = self._path(*key)
 
         pretty.color_print(colors.PAPER_YELLOW_400, f"writing database to {path}")
 
-        with open(path, "w") as f:
-            json.dump(self._database, f, indent=2)
+        content = json.dumps(self._collections[key].entities(), indent=2).encode(
+            "utf-8"
+        )
+
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+
+        return tmp, _digest(content)
+
+    def _commit_snapshot(self, key: _KEY, tmp: str, digest: str) -> None:
+        os.replace(tmp, self._path(*key))
+
+        journal = self._journal_path(*key)
+        if os.path.exists(journal):
+            os.remove(journal)
+
+        cached = self._collections[key]
+        cached.snapshot = digest
+        cached.signature = self._signature(key)
+
+    def _write_snapshot(self, key: _KEY) -> None:
+        self._commit_snapshot(key, *self._prepare_snapshot(key))
+
+    def _trim_journal(self, path: str) -> int:
+        # the torn last line of a crashed append is skipped by _load, it is
+        # cut off here so the next records do not get glued onto it
+        try:
+            f = open(path, "rb+")
+        except FileNotFoundError:
+            return 0
+
+        with f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return 0
+
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return size
+
+            f.seek(0)
+            size = f.read().rfind(b"\n") + 1
+
+            f.truncate(size)
+
+        return size
+
+    def _append_journal(self, key: _KEY) -> None:
+        records = self._records.pop(key, [])
+        if len(records) == 0:
+            return
+
+        cached = self._collections[key]
+
+        path = self._journal_path(*key)
+
+        lines = [json.dumps(r) for r in records]
+        if self._trim_journal(path) == 0:
+            lines.insert(0, json.dumps({"snapshot": cached.snapshot}))
+
+        with open(path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+        cached.signature = self._signature(key)
+
+        snapshot, journal = cached.signature
+        assert journal is not None
+
+        limit = max(
+            (snapshot[2] if snapshot is not None else 0) * self._compact_ratio,
+            _MIN_COMPACT_SIZE,
+        )
+
+        if journal[2] > limit:
+            self._write_snapshot(key)
+
+    def _persist(self, keys: List[_KEY]) -> None:
+        if self._journal:
+            for key in keys:
+                self._append_journal(key)
+            return
+
+        # every file is written out before any is swapped in, so a failure
+        # while writing leaves all of them untouched
+        prepared = [(key, self._prepare_snapshot(key)) for key in keys]
+
+        for key, (tmp, digest) in prepared:
+            self._commit_snapshot(key, tmp, digest)
+
+    def _apply(self, key: _KEY, record: Dict[str, Any]) -> None:
+        cached = self._read(*key)
+        cached.apply(record)
+
+        self._versions += 1
+        cached.version = self._versions
+
+        if self._journal:
+            self._records.setdefault(key, []).append(record)
+
+    def _mutate(self, database: str, collection: str, record: Dict[str, Any]) -> None:
+        key = (database, collection)
+
+        if self._depth > 0:
+            self._hold([key])
+
+            self._apply(key, record)
+            self._staged.add(key)
+            return
+
+        with self._locked([key], True):
+            self._apply(key, record)
+
+            if self._sync:
+                try:
+                    self._persist([key])
+                except BaseException:
+                    self._discard([key])
+                    raise
+
+        if self._sync:
+            return
+
+        self._dirty.add(key)
+        self._pending += 1
+
+        if self._pending >= self._flush_every:
+            self.flush()
+
+    def _discard(self, keys: Iterable[_KEY]) -> None:
+        # the collections are read again from their files
+        for key in keys:
+            self._collections.pop(key, None)
+            self._records.pop(key, None)
+
+    def _rollback(self) -> None:
+        self._discard(self._staged)
+        self._staged = set()
+
+    def _hold(self, keys: Sequence[_KEY]) -> None:
+        # locks are kept until the transaction ends so no other process can
+        # write a collection between staging and persisting it
+        if not self._locking:
+            return
+
+        for key in sorted(set(keys)):
+            if key in self._held:
+                continue
+
+            # keys are taken in sorted order like in _locked_keys, a key below
+            # one already held is only tried without waiting, two transactions
+            # locking in opposite orders would otherwise block each other
+            timeout = None
+            if any(held > key for held in self._held):
+                timeout = 0.0
+
+            self._acquire(key, True, timeout=timeout)
+            self._held.append(key)
+
+    def _release_held(self) -> None:
+        for key in reversed(self._held):
+            self._release(key)
+
+        self._held = []
+
+    @contextmanager
+    def transaction(
+        self, collections: Sequence[Tuple[str, str]] = ()
+    ) -> Iterator["JsonDB"]:
+        # mutations inside the block are only applied to the resident
+        # collections, on success every touched collection is written once,
+        # on failure they are all discarded, nested blocks join the outer one,
+        # the (database, collection) pairs in collections are locked up front
+        if self._depth == 0:
+            self.flush()
+
+        self._depth += 1
+
+        try:
+            self._hold(collections)
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._rollback()
+                self._release_held()
+            raise
+
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._persist(sorted(self._staged))
+            except BaseException:
+                # the resident collections hold changes the files may not
+                self._rollback()
+                raise
+            finally:
+                self._release_held()
+
+            self._staged = set()
+
+    def flush(self) -> None:
+        dirty = sorted(self._dirty)
+
+        with self._locked(dirty, True):
+            self._persist(dirty)
+
+        self._dirty = set()
+        self._pending = 0
+
+    def dirty(self) -> bool:
+        return len(self._dirty) > 0
+
+    def compact(self, database: str, collection: str) -> None:
+        key = (database, collection)
+
+        with self._locked([key], True):
+            self._read(database, collection)
+
+            self._records.pop(key, None)
+            self._dirty.discard(key)
+
+            self._write_snapshot(key)
+
+    def version(self, database: str, collection: str) -> Hashable:
+        # changes whenever the collection is changed here or in its files,
+        # anything derived from its entities can be kept while it holds
+        return self._read(database, collection).version
 
     def insert(self, database: str, collection: str, *entities: Dict[str, str]) -> None:
-        self._read(database, collection)
-        self._database.extend(entities)
-        self._write(database, collection)
+        self._mutate(
+            database, collection, {"op": "insert", "entities": [dict(e) for e in entities]}
+        )
 
     def replace(
             self,
@@ -57,41 +653,29 @@ class JsonDB:
         assert new_entity is not None
         assert len(new_entity.keys()) != 0
 
-        self._read(database, collection)
-
-        for i, entity in enumerate(self._database):
-            found = True
-            for k, v in query.items():
-                found = found and (entity.get(k, None) == v)
-            if found:
-                self._database[i] = new_entity
-                break
-
-        self._write(database, collection)
+        self._mutate(
+            database,
+            collection,
+            {"op": "replace", "query": dict(query), "entity": dict(new_entity)},
+        )
 
     def find(
             self, database: str, collection: str, query: Optional[Dict[str, str]]
     ) -> Optional[List[Dict[str, str]]]:
 
-        self._read(database, collection)
+        cached = self._read(database, collection)
 
+        # callers get copies so they can not alter the resident collection
         if query is None:
-            return self._database
+            return [dict(e) for e in cached.entities()]
 
         assert query is not None
         assert len(query.keys()) != 0
 
-        entities = []
+        found = [dict(e) for e in cached.find(query)]
 
-        for entity in self._database:
-            found = True
-            for k, v in query.items():
-                found = found and (entity.get(k, None) == v)
-            if found:
-                entities.append(entity)
-
-        if len(entities) > 0:
-            return entities
+        if len(found) > 0:
+            return found
         else:
             return None
 
@@ -100,21 +684,28 @@ class JsonDB:
         assert query is not None
         assert len(query.keys()) is not None
 
-        self._read(database, collection)
-
-        for i, entity in enumerate(self._database):
-            found = True
-            for k, v in query.items():
-                found = found and (entity.get(k, None) == v)
-
-            if found:
-                del self._database[i]
-                break
-
-        self._write(database, collection)
+        self._mutate(database, collection, {"op": "delete", "query": dict(query)})
 
     def drop(self, database: str, collection: str) -> None:
+        key = (database, collection)
+
         path = self._path(database, collection)
         pretty.color_print(colors.PAPER_YELLOW_400, f"deleting database at {path}")
 
-        os.remove(path)
+        self._collections.pop(key, None)
+        self._records.pop(key, None)
+        self._staged.discard(key)
+
+        journal = self._journal_path(database, collection)
+
+        with self._locked([key], True):
+            if key in self._dirty or os.path.exists(journal):
+                self._dirty.discard(key)
+
+                if os.path.exists(journal):
+                    os.remove(journal)
+
+                if not os.path.exists(path):
+                    return
+
+            os.remove(path)
@@ -1,4 +1,11 @@
+import fcntl
+import json
+import multiprocessing
 import os
+import random
+import shutil
+import tempfile
+import time
 import unittest
 from typing import cast
 
@@ -318,5 +325,403 @@ class TestJsonDB(unittest.TestCase):
         self._clean_root(root)
 
 
+class TestJsonDBCache(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _path(self, db, col):
+        return os.path.join(self._root, f"{db}_{col}.json")
+
+    @parameterized(
+        [
+            {"count": 10, "flush_every": 100, "flushed": 0},
+            {"count": 10, "flush_every": 4, "flushed": 8},
+            {"count": 12, "flush_every": 4, "flushed": 12},
+        ]
+    )
+    def test_write_behind(self, count, flush_every, flushed):
+        col = f"test{count}_{flush_every}"
+
+        with JsonDB(self._root, sync=False, flush_every=flush_every) as database:
+            for i in range(count):
+                database.insert("test", col, {"index": f"{i}"})
+
+            self.assertEqual(len(database.find("test", col, None)), count)
+
+            if flushed == 0:
+                self.assertFalse(os.path.exists(self._path("test", col)))
+            else:
+                with open(self._path("test", col), "r") as f:
+                    self.assertEqual(len(json.load(f)), flushed)
+
+        with open(self._path("test", col), "r") as f:
+            self.assertEqual(len(json.load(f)), count)
+
+    def test_external_changes(self):
+        database = JsonDB(self._root)
+        database.insert("test", "test", {"a": "1"}, {"a": "2"})
+
+        found = database.find("test", "test", {"a": "1"})
+        found[0]["a"] = "3"
+        self.assertIsNone(database.find("test", "test", {"a": "3"}))
+
+        version = database.version("test", "test")
+        self.assertEqual(database.version("test", "test"), version)
+
+        other = JsonDB(self._root)
+        other.replace("test", "test", {"a": "2"}, {"a": "4", "b": "5"})
+
+        # make sure the change is visible even on coarse mtime resolution
+        stat = os.stat(self._path("test", "test"))
+        os.utime(self._path("test", "test"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertNotEqual(database.version("test", "test"), version)
+
+        self.assertEqual(
+            database.find("test", "test", None), [{"a": "1"}, {"a": "4", "b": "5"}]
+        )
+
+        database.drop("test", "test")
+        self.assertIsNone(database.find("test", "test", {"a": "1"}))
+
+    def test_failed_write(self):
+        database = JsonDB(self._root)
+        database.insert("test", "test", {"a": "1"})
+
+        # a directory in place of the temporary file fails the write
+        os.mkdir(f"{self._path('test', 'test')}.tmp")
+
+        with self.assertRaises(OSError):
+            database.insert("test", "test", {"a": "2"})
+
+        self.assertEqual(database.find("test", "test", None), [{"a": "1"}])
+
+
+class TestJsonDBJournal(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _path(self, extension):
+        return os.path.join(self._root, f"test_test.{extension}")
+
+    def _mutate(self, database):
+        database.insert("test", "test", {"a": "1"}, {"a": "2"}, {"a": "3"})
+        database.replace("test", "test", {"a": "2"}, {"a": "4"})
+        database.delete("test", "test", {"a": "1"})
+        database.insert("test", "test", {"a": "5"})
+
+    @parameterized([{"sync": True}, {"sync": False}])
+    def test_replay(self, sync):
+        with JsonDB(self._root, sync=sync, journal=True) as database:
+            database.insert("test", "test", {"a": "0"})
+            database.compact("test", "test")
+
+            self._mutate(database)
+
+        self.assertTrue(os.path.exists(self._path("ndjson")))
+
+        with open(self._path("json"), "r") as f:
+            self.assertEqual(json.load(f), [{"a": "0"}])
+
+        expected = [{"a": "0"}, {"a": "4"}, {"a": "3"}, {"a": "5"}]
+
+        self.assertEqual(JsonDB(self._root).find("test", "test", None), expected)
+        self.assertEqual(
+            JsonDB(self._root, journal=True).find("test", "test", None), expected
+        )
+
+        # migrating back to the plain format folds the journal in
+        database = JsonDB(self._root)
+        database.insert("test", "test", {"a": "6"})
+
+        self.assertFalse(os.path.exists(self._path("ndjson")))
+
+        with open(self._path("json"), "r") as f:
+            self.assertEqual(json.load(f), expected + [{"a": "6"}])
+
+        database.drop("test", "test")
+
+    def test_compaction(self):
+        database = JsonDB(self._root, journal=True, compact_ratio=2.0)
+
+        entity = {"a": "x" * 1024}
+
+        count = 0
+        for ratio in (0, 2):
+            # the first journal is compacted at the minimum size, the next
+            # one once it is twice the size of the snapshot
+            snapshot = 0
+            if os.path.exists(self._path("json")):
+                snapshot = os.path.getsize(self._path("json"))
+
+            while True:
+                database.insert("test", "test", entity)
+                count += 1
+
+                if not os.path.exists(self._path("ndjson")):
+                    break
+
+                size = os.path.getsize(self._path("ndjson"))
+
+            self.assertLess(size, max(snapshot * ratio, 64 * 1024))
+            self.assertGreater(size + 2 * 1024, max(snapshot * ratio, 64 * 1024))
+
+            with open(self._path("json"), "r") as f:
+                self.assertEqual(len(json.load(f)), count)
+
+    def test_recovery(self):
+        database = JsonDB(self._root, journal=True)
+        self._mutate(database)
+
+        with open(self._path("ndjson"), "a") as f:
+            f.write('{"op": "insert", "entit')
+
+        expected = [{"a": "4"}, {"a": "3"}, {"a": "5"}]
+        self.assertEqual(JsonDB(self._root).find("test", "test", None), expected)
+
+        # the torn line is cut off before the next append
+        recovered = JsonDB(self._root, journal=True)
+        recovered.insert("test", "test", {"a": "6"})
+
+        expected = expected + [{"a": "6"}]
+        self.assertEqual(JsonDB(self._root).find("test", "test", None), expected)
+
+        recovered.compact("test", "test")
+
+        # a torn header leaves nothing to replay
+        with open(self._path("ndjson"), "w") as f:
+            f.write('{"snap')
+
+        recovered.insert("test", "test", {"a": "7"})
+
+        expected = expected + [{"a": "7"}]
+        self.assertEqual(JsonDB(self._root).find("test", "test", None), expected)
+
+        # a snapshot written without removing its journal afterwards
+        with open(self._path("json"), "w") as f:
+            json.dump(expected, f)
+
+        self.assertEqual(JsonDB(self._root).find("test", "test", None), expected)
+
+
+class TestJsonDBIndexes(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    @parameterized(
+        [
+            {"indexes": {"test": ["a"]}},
+            {"indexes": {"test_test": ["a", "b"]}},
+            {"indexes": {"test": ["b", "c"]}},
+        ]
+    )
+    def test_indexes(self, indexes):
+        rng = random.Random(0)
+
+        plain = JsonDB(self._root, sync=False, flush_every=10 ** 6)
+        indexed = JsonDB(self._root, sync=False, flush_every=10 ** 6, indexes=indexes)
+
+        def entity():
+            return {k: f"{rng.randint(0, 5)}" for k in ("a", "b") if rng.random() < 0.8}
+
+        for _ in range(500):
+            op = rng.random()
+            query = entity() or {"a": "0"}
+
+            for database in (plain, indexed):
+                state = rng.getstate()
+
+                if op < 0.5:
+                    database.insert("test", "test", entity(), entity())
+                elif op < 0.75:
+                    database.replace("test", "test", query, entity() or {"c": "0"})
+                else:
+                    database.delete("test", "test", query)
+
+                if database is plain:
+                    rng.setstate(state)
+
+            self.assertEqual(
+                plain.find("test", "test", query), indexed.find("test", "test", query)
+            )
+
+        self.assertEqual(plain.find("test", "test", None), indexed.find("test", "test", None))
+
+        for query in ({"a": "1"}, {"a": "2", "b": "3"}, {"c": "0"}, {"a": "9"}):
+            self.assertEqual(
+                plain.find("test", "test", query), indexed.find("test", "test", query)
+            )
+
+
+class TestJsonDBTransaction(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    def _content(self, col):
+        path = os.path.join(self._root, f"test_{col}.json")
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r") as f:
+            return json.load(f)
+
+    @parameterized([{"journal": False}, {"journal": True}])
+    def test_transaction(self, journal):
+        database = JsonDB(self._root, journal=journal)
+        database.insert("test", "a", {"a": "1"})
+        database.compact("test", "a")
+
+        with database.transaction():
+            database.insert("test", "a", {"a": "2"})
+            with database.transaction():
+                database.insert("test", "b", {"b": "1"})
+                database.replace("test", "a", {"a": "1"}, {"a": "3"})
+
+            self.assertEqual(database.find("test", "a", None), [{"a": "3"}, {"a": "2"}])
+            self.assertEqual(self._content("a"), [{"a": "1"}])
+            self.assertFalse(os.path.exists(os.path.join(self._root, "test_b.ndjson")))
+
+        other = JsonDB(self._root)
+        self.assertEqual(other.find("test", "a", None), [{"a": "3"}, {"a": "2"}])
+        self.assertEqual(other.find("test", "b", None), [{"b": "1"}])
+
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.delete("test", "a", {"a": "3"})
+                database.insert("test", "b", {"b": "2"})
+                raise RuntimeError("abort")
+
+        self.assertEqual(database.find("test", "a", None), [{"a": "3"}, {"a": "2"}])
+        self.assertEqual(database.find("test", "b", None), [{"b": "1"}])
+
+        database.drop("test", "a")
+        database.drop("test", "b")
+
+    def test_write_behind(self):
+        database = JsonDB(self._root, sync=False)
+        database.insert("test", "a", {"a": "1"})
+
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.insert("test", "a", {"a": "2"})
+                raise RuntimeError("abort")
+
+        # changes made before the transaction were flushed when it began
+        self.assertEqual(self._content("a"), [{"a": "1"}])
+        self.assertEqual(database.find("test", "a", None), [{"a": "1"}])
+
+    def test_failed_persist(self):
+        database = JsonDB(self._root)
+        database.insert("test", "a", {"a": "1"})
+
+        # a directory in place of the temporary file fails the write
+        os.mkdir(os.path.join(self._root, "test_a.json.tmp"))
+
+        with self.assertRaises(OSError):
+            with database.transaction():
+                database.insert("test", "a", {"a": "2"})
+
+        self.assertEqual(database.find("test", "a", None), [{"a": "1"}])
+        self.assertEqual(self._content("a"), [{"a": "1"}])
+
+
+def _insert_from(root, worker, count, journal):
+    database = JsonDB(root, journal=journal)
+    for i in range(count):
+        database.insert("test", "shared", {"worker": str(worker), "i": str(i)})
+
+
+class TestJsonDBLocking(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    @parameterized([{"journal": False}, {"journal": True}])
+    def test_processes(self, journal):
+        context = multiprocessing.get_context("fork")
+
+        processes = [
+            context.Process(target=_insert_from, args=(self._root, w, 50, journal))
+            for w in range(4)
+        ]
+
+        for p in processes:
+            p.start()
+
+        for p in processes:
+            p.join()
+            self.assertEqual(p.exitcode, 0)
+
+        database = JsonDB(self._root, journal=journal)
+        self.assertEqual(len(database.find("test", "shared", None)), 200)
+
+        database.drop("test", "shared")
+
+    def test_timeout(self):
+        database = JsonDB(self._root, lock_timeout=0.1)
+        database.insert("test", "a", {"a": "1"})
+
+        fd = os.open(os.path.join(self._root, ".test_a.lock"), os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        try:
+            with self.assertRaises(TimeoutError):
+                database.insert("test", "a", {"a": "2"})
+
+            # the resident collection is still current, reads do not block
+            self.assertEqual(database.find("test", "a", None), [{"a": "1"}])
+        finally:
+            os.close(fd)
+
+        database.insert("test", "a", {"a": "2"})
+        self.assertEqual(JsonDB(self._root).find("test", "a", None), [{"a": "1"}, {"a": "2"}])
+
+    def test_transaction_order(self):
+        database = JsonDB(self._root, lock_timeout=5.0)
+
+        with database.transaction([("test", "b"), ("test", "a")]):
+            fd = os.open(os.path.join(self._root, ".test_a.lock"), os.O_RDWR)
+            try:
+                with self.assertRaises(BlockingIOError):
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            finally:
+                os.close(fd)
+
+            database.insert("test", "b", {"b": "1"})
+            database.insert("test", "a", {"a": "1"})
+
+        fd = os.open(os.path.join(self._root, ".test_a.lock"), os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+        try:
+            # a key below one already held is not waited for
+            start = time.monotonic()
+            with self.assertRaises(TimeoutError):
+                with database.transaction():
+                    database.insert("test", "b", {"b": "2"})
+                    database.insert("test", "a", {"a": "2"})
+
+            self.assertLess(time.monotonic() - start, 1.0)
+        finally:
+            os.close(fd)
+
+        self.assertEqual(database.find("test", "b", None), [{"b": "1"}])
+        self.assertEqual(JsonDB(self._root).find("test", "a", None), [{"a": "1"}])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,349 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from fun.utils import colors, pretty
+
+_KEY = Tuple[str, str]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _column(field: str) -> str:
+    return _quote(f"f_{field}")
+
+
+def _match(entity: Dict[str, str], query: Dict[str, str]) -> bool:
+    for k, v in query.items():
+        if entity.get(k, None) != v:
+            return False
+
+    return True
+
+
+class SqliteDB:
+    def __init__(
+        self,
+        database_root: str,
+        filename: str = "jsondb.sqlite3",
+        indexes: Optional[Mapping[str, Sequence[str]]] = None,
+        timeout: float = 30.0,
+    ) -> None:
+
+        assert database_root != ""
+        assert os.path.exists(database_root)
+
+        self._path = os.path.join(database_root, filename)
+
+        # every (database, collection) is a table of entity json, fields named
+        # in indexes are also kept in their own indexed columns, keyed like in
+        # JsonDB by "<database>" or "<database>_<collection>"
+        self._indexes: Mapping[str, Sequence[str]] = (
+            indexes if indexes is not None else {}
+        )
+
+        self._conn = sqlite3.connect(
+            self._path,
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+
+        # readers in other processes keep going while a write is in progress
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+        self._lock = threading.RLock()
+        self._depth = 0
+
+        # writes made through this connection, per table
+        self._writes: Dict[_KEY, int] = {}
+
+        # columns of each table, None for a missing one, as of data_version
+        self._columns: Dict[_KEY, Optional[Set[str]]] = {}
+        self._data_version: Optional[int] = None
+
+    def __enter__(self) -> "SqliteDB":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def flush(self) -> None:
+        # every write is committed when its statement or transaction ends
+        pass
+
+    def _table(self, database: str, collection: str) -> str:
+        return _quote(f"{database}_{collection}")
+
+    def _fields(self, key: _KEY) -> Sequence[str]:
+        database, collection = key
+
+        fields = self._indexes.get(f"{database}_{collection}", None)
+        if fields is None:
+            fields = self._indexes.get(database, ())
+
+        return fields
+
+    def _existing(self, key: _KEY) -> Optional[Set[str]]:
+        # other connections may create, alter or drop the table, which moves
+        # data_version, the columns are only read again after that
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._columns = {}
+            self._data_version = data_version
+
+        if key not in self._columns:
+            rows = self._conn.execute(
+                f"PRAGMA table_info({self._table(*key)})"
+            ).fetchall()
+
+            self._columns[key] = {r[1] for r in rows} if len(rows) > 0 else None
+
+        return self._columns[key]
+
+    def _create(self, key: _KEY) -> Set[str]:
+        table = self._table(*key)
+
+        columns = self._existing(key)
+        if columns is None:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(rid INTEGER PRIMARY KEY AUTOINCREMENT, entity TEXT NOT NULL)"
+            )
+            columns = {"rid", "entity"}
+            self._columns[key] = columns
+
+        for field in self._fields(key):
+            if f"f_{field}" in columns:
+                continue
+
+            # a field indexed after the table was created is filled from the
+            # stored entities
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {_column(field)}")
+            self._conn.executemany(
+                f"UPDATE {table} SET {_column(field)} = ? WHERE rid = ?",
+                [
+                    (json.loads(entity).get(field, None), rid)
+                    for rid, entity in self._conn.execute(
+                        f"SELECT rid, entity FROM {table}"
+                    )
+                ],
+            )
+
+            index = _quote(f"{key[0]}_{key[1]}_{field}")
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({_column(field)})"
+            )
+
+            columns.add(f"f_{field}")
+
+        return columns
+
+    def _values(self, key: _KEY, entity: Dict[str, str]) -> List[Any]:
+        return [json.dumps(entity)] + [
+            entity.get(field, None) for field in self._fields(key)
+        ]
+
+    def _select(
+        self, key: _KEY, query: Optional[Dict[str, str]]
+    ) -> Iterator[Tuple[int, Dict[str, str]]]:
+        columns = self._existing(key)
+        if columns is None:
+            return iter(())
+
+        sql = f"SELECT rid, entity FROM {self._table(*key)}"
+        params: List[Any] = []
+
+        if query is not None:
+            conditions = []
+            for field, value in query.items():
+                if value is not None and f"f_{field}" in columns:
+                    conditions.append(f"{_column(field)} = ?")
+                    params.append(value)
+
+            if len(conditions) > 0:
+                sql += " WHERE " + " AND ".join(conditions)
+
+        sql += " ORDER BY rid"
+
+        rows = (
+            (rid, json.loads(entity))
+            for rid, entity in self._conn.execute(sql, params).fetchall()
+        )
+
+        if query is None:
+            return rows
+
+        return ((rid, e) for rid, e in rows if _match(e, query))
+
+    @contextmanager
+    def transaction(
+        self, collections: Sequence[Tuple[str, str]] = ()
+    ) -> Iterator["SqliteDB"]:
+        # writes inside the block are committed together or not at all,
+        # nested blocks join the outermost one, collections is accepted for
+        # JsonDB compatibility, BEGIN IMMEDIATE already locks every table
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN IMMEDIATE")
+
+            self._depth += 1
+
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("ROLLBACK")
+
+                    # tables created or altered in the block are gone again
+                    self._columns = {}
+                raise
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._conn.execute("COMMIT")
+
+    def _written(self, key: _KEY) -> None:
+        self._writes[key] = self._writes.get(key, 0) + 1
+
+    def version(self, database: str, collection: str) -> Hashable:
+        # data_version only moves on commits of other connections, so a write
+        # from another process invalidates every table
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return (data_version, self._writes.get((database, collection), 0))
+
+    def insert(self, database: str, collection: str, *entities: Dict[str, str]) -> None:
+        self.insert_many(database, collection, entities)
+
+    def insert_many(
+        self, database: str, collection: str, entities: Iterable[Dict[str, str]]
+    ) -> None:
+        key = (database, collection)
+
+        with self.transaction():
+            self._create(key)
+
+            fields = self._fields(key)
+            columns = ", ".join(["entity"] + [_column(f) for f in fields])
+            marks = ", ".join(["?"] * (len(fields) + 1))
+
+            self._conn.executemany(
+                f"INSERT INTO {self._table(*key)} ({columns}) VALUES ({marks})",
+                (self._values(key, e) for e in entities),
+            )
+
+            self._written(key)
+
+    def replace(
+            self,
+            database: str,
+            collection: str,
+            query: Dict[str, str],
+            new_entity: Dict[str, str],
+    ) -> None:
+
+        assert query is not None
+        assert len(query.keys()) != 0
+
+        assert new_entity is not None
+        assert len(new_entity.keys()) != 0
+
+        key = (database, collection)
+
+        with self.transaction():
+            found = next(self._select(key, query), None)
+            if found is None:
+                return
+
+            self._create(key)
+
+            fields = self._fields(key)
+            columns = ", ".join(f"{c} = ?" for c in ["entity"] + [_column(f) for f in fields])
+
+            self._conn.execute(
+                f"UPDATE {self._table(*key)} SET {columns} WHERE rid = ?",
+                self._values(key, new_entity) + [found[0]],
+            )
+
+            self._written(key)
+
+    def find(
+            self, database: str, collection: str, query: Optional[Dict[str, str]]
+    ) -> Optional[List[Dict[str, str]]]:
+
+        key = (database, collection)
+
+        with self._lock:
+            if query is None:
+                return [e for _, e in self._select(key, None)]
+
+            assert query is not None
+            assert len(query.keys()) != 0
+
+            found = [e for _, e in self._select(key, query)]
+
+        if len(found) > 0:
+            return found
+        else:
+            return None
+
+    def delete(self, database: str, collection: str, query: Dict[str, str]) -> None:
+
+        assert query is not None
+        assert len(query.keys()) is not None
+
+        key = (database, collection)
+
+        with self.transaction():
+            found = next(self._select(key, query), None)
+            if found is None:
+                return
+
+            self._conn.execute(
+                f"DELETE FROM {self._table(*key)} WHERE rid = ?", (found[0],)
+            )
+
+            self._written(key)
+
+    def drop(self, database: str, collection: str) -> None:
+        key = (database, collection)
+
+        pretty.color_print(
+            colors.PAPER_YELLOW_400,
+            f"deleting database {database}_{collection} at {self._path}",
+        )
+
+        with self.transaction():
+            if self._existing(key) is None:
+                raise FileNotFoundError(
+                    f"database: {database} and collection: {collection} do not exist"
+                )
+
+            self._conn.execute(f"DROP TABLE {self._table(*key)}")
+            self._columns[key] = None
+
+            self._written(key)
@@ -0,0 +1,161 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from fun.utils.jsondb import JsonDB
+from fun.utils.sqlitedb import SqliteDB
+from fun.utils.testing import parameterized
+
+
+class TestSqliteDB(unittest.TestCase):
+    def setUp(self):
+        self._root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._root)
+
+    @parameterized(
+        [
+            {"collection": "a", "indexes": None},
+            {"collection": "b", "indexes": {"test": ["a"]}},
+            {"collection": "c", "indexes": {"test_c": ["a", "b"]}},
+        ]
+    )
+    def test_compatibility(self, collection, indexes):
+        rng = random.Random(0)
+
+        json_db = JsonDB(self._root, sync=False, flush_every=10 ** 6)
+        sqlite_db = SqliteDB(self._root, indexes=indexes)
+
+        def entity():
+            return {k: f"{rng.randint(0, 5)}" for k in ("a", "b") if rng.random() < 0.8}
+
+        self.assertEqual(sqlite_db.find("test", collection, None), [])
+        self.assertIsNone(sqlite_db.find("test", collection, {"a": "1"}))
+
+        for _ in range(300):
+            op = rng.random()
+            query = entity() or {"a": "0"}
+
+            for database in (json_db, sqlite_db):
+                state = rng.getstate()
+
+                if op < 0.5:
+                    database.insert("test", collection, entity(), entity())
+                elif op < 0.75:
+                    database.replace("test", collection, query, entity() or {"c": "0"})
+                else:
+                    database.delete("test", collection, query)
+
+                if database is json_db:
+                    rng.setstate(state)
+
+            self.assertEqual(
+                json_db.find("test", collection, query),
+                sqlite_db.find("test", collection, query),
+            )
+
+        self.assertEqual(
+            json_db.find("test", collection, None),
+            sqlite_db.find("test", collection, None),
+        )
+
+        for database in (json_db, sqlite_db):
+            database.drop("test", collection)
+
+        self.assertEqual(sqlite_db.find("test", collection, None), [])
+
+        for database in (json_db, sqlite_db):
+            with self.assertRaises(FileNotFoundError):
+                database.drop("test", collection)
+
+        sqlite_db.close()
+
+    def test_columns(self):
+        database = SqliteDB(self._root, indexes={"test": ["a"]})
+        database.insert("test", "a", {"a": "1"})
+
+        # the table is dropped by another connection after its columns were read
+        other = SqliteDB(self._root)
+        other.drop("test", "a")
+
+        database.insert("test", "a", {"a": "2"})
+        self.assertEqual(other.find("test", "a", None), [{"a": "2"}])
+        self.assertEqual(database.find("test", "a", {"a": "2"}), [{"a": "2"}])
+
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.insert("test", "b", {"a": "1"})
+                raise RuntimeError("abort")
+
+        database.insert("test", "b", {"a": "2"})
+        self.assertEqual(database.find("test", "b", None), [{"a": "2"}])
+
+        other.close()
+        database.close()
+
+    def test_transaction(self):
+        database = SqliteDB(self._root, indexes={"test": ["a"]})
+
+        with database.transaction():
+            database.insert("test", "a", {"a": "1"})
+            database.insert("test", "b", {"a": "2"})
+
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.insert("test", "a", {"a": "3"})
+                database.replace("test", "b", {"a": "2"}, {"a": "4"})
+                raise RuntimeError("abort")
+
+        self.assertEqual(database.find("test", "a", None), [{"a": "1"}])
+        self.assertEqual(database.find("test", "b", None), [{"a": "2"}])
+
+        database.insert_many("test", "a", ({"a": f"{i}", "b": "x"} for i in range(1000)))
+        self.assertEqual(len(database.find("test", "a", None)), 1001)
+        self.assertEqual(database.find("test", "a", {"a": "1"}), [{"a": "1"}, {"a": "1", "b": "x"}])
+
+        database.close()
+
+        # a field indexed later is filled from the stored entities
+        database = SqliteDB(self._root, indexes={"test": ["a", "b"]})
+        database.insert("test", "a", {"a": "x", "b": "y"})
+
+        self.assertEqual(len(database.find("test", "a", {"b": "x"})), 1000)
+
+        conn = sqlite3.connect(os.path.join(self._root, "jsondb.sqlite3"))
+        self.assertEqual(
+            conn.execute('SELECT COUNT(*) FROM "test_a" WHERE "f_b" = ?', ("x",)).fetchone()[0],
+            1000,
+        )
+        conn.close()
+
+        database.close()
+
+    def test_version(self):
+        database = SqliteDB(self._root)
+        other = SqliteDB(self._root)
+
+        database.insert("test", "a", {"a": "1"})
+
+        version = database.version("test", "a")
+        self.assertEqual(database.version("test", "a"), version)
+
+        database.insert("test", "b", {"a": "1"})
+        self.assertEqual(database.version("test", "a"), version)
+
+        database.insert("test", "a", {"a": "2"})
+        self.assertNotEqual(database.version("test", "a"), version)
+
+        version = database.version("test", "a")
+        other.replace("test", "a", {"a": "2"}, {"a": "3"})
+        self.assertNotEqual(database.version("test", "a"), version)
+
+        other.close()
+        database.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
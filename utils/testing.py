@@ -1,6 +1,9 @@
 import functools
 from typing import Any, Dict, List
 
+import numpy as np
+import pandas as pd
+
 from fun.utils import colors, pretty
 
 
@@ -27,3 +30,22 @@ def parameterized(sets: List[Dict[str, Any]]):
         return wrapper_testing
 
     return testing
+
+
+def random_quotes(start: str, periods: int, freq: str = "B") -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+
+    close = 100.0 + np.cumsum(rng.normal(size=periods))
+    spread = rng.uniform(0.1, 1.0, size=periods)
+
+    return pd.DataFrame(
+        {
+            "open": close + rng.uniform(-0.5, 0.5, size=periods),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(1000, 10000, size=periods).astype(float),
+            "open interest": rng.integers(1000, 10000, size=periods).astype(float),
+        },
+        index=pd.date_range(start, periods=periods, freq=freq),
+    )